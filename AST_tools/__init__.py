@@ -34,39 +34,51 @@ _project_root = Path(__file__).parent
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
-# Imports principaux du projet (optionnels)
-try:
-    # Importer les modules principaux si disponibles
-    from core.transformation_loader import TransformationLoader
+# Imports principaux du projet, charges a la demande (PEP 562) : importer le
+# paquet (par exemple pour `python -m AST_tools.run_plan`) reste instantane.
+_LAZY_EXPORTS = {
+    "OrchestrateurAST": "modificateur_interactif",
+    "TransformationLoader": "core.transformation_loader",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Fonction utilitaire pour accès rapide
+def get_orchestrator():
+    """Retourne une instance de l'orchestrateur AST."""
     from modificateur_interactif import OrchestrateurAST
 
-    # Fonction utilitaire pour accès rapide
-    def get_orchestrator():
-        """Retourne une instance de l'orchestrateur AST."""
-        return OrchestrateurAST()
-
-    def get_loader():
-        """Retourne une instance du chargeur de transformations."""
-        return TransformationLoader()
-
-    def list_transformations():
-        """Liste toutes les transformations disponibles."""
-        loader = get_loader()
-        return loader.list_transformations()
-
-    # Exports publics
-    __all__ = [
-        "OrchestrateurAST",
-        "TransformationLoader",
-        "get_loader",
-        "get_orchestrator",
-        "list_transformations",
-    ]
-
-except ImportError as e:
-    # En cas d'erreur, on continue sans crash
-    print(f"Avertissement __init__: Certains modules ne sont pas disponibles ({e})")
-    __all__ = []
+    return OrchestrateurAST()
+
+
+def get_loader():
+    """Retourne une instance du chargeur de transformations."""
+    from core.transformation_loader import TransformationLoader
+
+    return TransformationLoader()
+
+
+def list_transformations():
+    """Liste toutes les transformations disponibles."""
+    loader = get_loader()
+    return loader.list_transformations()
+
+
+# Exports publics
+__all__ = [
+    "OrchestrateurAST",
+    "TransformationLoader",
+    "get_loader",
+    "get_orchestrator",
+    "list_transformations",
+]
 
 
 # Informations pour les développeurs
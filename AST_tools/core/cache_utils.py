@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Utilitaires de cache disque pour AST_tools
+Centralise l'emplacement des caches persistants (manifeste des plugins, etc.)
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# Variable d'environnement permettant de deplacer le cache (CI, tests, ...)
+CACHE_DIR_ENV = "AST_TOOLS_CACHE_DIR"
+_DEFAULT_CACHE_DIR = Path(__file__).parent.parent / ".ast_cache"
+
+
+def get_cache_dir(subdir: Optional[str] = None) -> Path:
+    """
+    Retourne le repertoire de cache (cree si necessaire).
+
+    Args:
+        subdir (str): Sous-repertoire optionnel dans le cache
+
+    Returns:
+        Path: Chemin du repertoire de cache
+    """
+    base = os.environ.get(CACHE_DIR_ENV)
+    cache_dir = Path(base) if base else _DEFAULT_CACHE_DIR
+    if subdir:
+        cache_dir = cache_dir / subdir
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def load_json_cache(path: Path) -> Optional[Any]:
+    """Charge un fichier de cache JSON, retourne None s'il est absent ou corrompu."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json_cache(path: Path, data: Any) -> bool:
+    """
+    Ecrit un fichier de cache JSON de maniere atomique.
+
+    Le contenu est ecrit dans un fichier temporaire du meme repertoire puis
+    renomme, pour qu'un lecteur concurrent ne voie jamais un fichier tronque.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(tmp_path)
+        except (OSError, UnboundLocalError):
+            pass
+        return False
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Moteur de diff pour le mode dry-run
+Produit des diffs unifies et des statistiques de lignes ajoutees/supprimees,
+calcules a la demande pour ne jamais garder tous les diffs d'un plan en memoire.
+"""
+
+import difflib
+import itertools
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class FileDiff:
+    """
+    Difference entre le contenu original et transforme d'un fichier.
+
+    Les statistiques et le texte du diff ne sont calcules qu'au premier acces ;
+    l'objet ne garde que les deux versions du fichier.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        original: str,
+        transformed: str,
+        error: Optional[str] = None,
+        context_lines: int = 3,
+    ):
+        self.path = path
+        self.original = original
+        self.transformed = transformed
+        self.error = error
+        self.context_lines = context_lines
+        self._stats = None
+
+    @property
+    def changed(self) -> bool:
+        """True si la transformation modifie le fichier."""
+        return self.original != self.transformed
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Nombre de lignes ajoutees et supprimees."""
+        if self._stats is None:
+            self._stats = self._count_changes()
+        return self._stats
+
+    @property
+    def added(self) -> int:
+        return self.stats["added"]
+
+    @property
+    def removed(self) -> int:
+        return self.stats["removed"]
+
+    def iter_lines(self) -> Iterator[str]:
+        """Genere les lignes du diff unifie (avec fins de ligne)."""
+        if not self.changed:
+            return iter(())
+        return difflib.unified_diff(
+            self._split(self.original),
+            self._split(self.transformed),
+            fromfile=f"a/{self.path}",
+            tofile=f"b/{self.path}",
+            n=self.context_lines,
+        )
+
+    @property
+    def diff_text(self) -> str:
+        """Diff unifie complet sous forme de texte."""
+        return "".join(self.iter_lines())
+
+    def to_dict(self, include_diff: bool = False) -> Dict[str, Any]:
+        """Representation serialisable (sans le diff par defaut)."""
+        data = {
+            "path": self.path,
+            "changed": self.changed,
+            "added": self.added,
+            "removed": self.removed,
+            "error": self.error,
+        }
+        if include_diff:
+            data["diff"] = self.diff_text
+        return data
+
+    def _count_changes(self) -> Dict[str, int]:
+        """Compte les lignes +/- du diff unifie (memes chiffres que le diff affiche)."""
+        added = removed = 0
+        lines = self.iter_lines()
+        # En-tetes "---" / "+++" : les deux premieres lignes du diff
+        for line in itertools.islice(lines, 2, None):
+            if line[0] == "+":
+                added += 1
+            elif line[0] == "-":
+                removed += 1
+        return {"added": added, "removed": removed}
+
+    @staticmethod
+    def _split(text: str) -> List[str]:
+        """Decoupe en lignes en garantissant une fin de ligne sur la derniere."""
+        lines = text.splitlines(keepends=True)
+        if lines and not lines[-1].endswith(("\n", "\r")):
+            lines[-1] += "\n"
+        return lines
+
+
+def summarize_diffs(diffs) -> Dict[str, int]:
+    """
+    Agrege les statistiques d'un iterable de FileDiff.
+
+    L'iterable est consomme au fur et a mesure : aucun diff n'est conserve.
+    """
+    summary = {"files": 0, "changed": 0, "added": 0, "removed": 0, "errors": 0}
+    for file_diff in diffs:
+        summary["files"] += 1
+        if file_diff.error:
+            summary["errors"] += 1
+        if file_diff.changed:
+            summary["changed"] += 1
+            summary["added"] += file_diff.added
+            summary["removed"] += file_diff.removed
+    return summary
@@ -29,6 +29,10 @@ AVAILABLE_GENERATORS = {"file_creator", "module_generator", "test_generator"}
 
 AVAILABLE_PLUGINS = AVAILABLE_WRAPPERS | AVAILABLE_ARTISANS | AVAILABLE_GENERATORS
 
+# Parametre reserve d'une instruction : liste des fichiers auxquels elle s'applique
+# (absent : tous les fichiers du plan). Il n'est pas transmis au plugin.
+TARGET_FILES_PARAM = "_files"
+
 
 class TransformationModel(BaseModel):
     """
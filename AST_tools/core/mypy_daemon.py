@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Demons dmypy par racine de projet
+=================================
+
+Un appel `mypy` a froid re-analyse tout le graphe d'imports. Le demon dmypy
+garde cet etat en memoire : apres le premier appel, une verification ne traite
+que les fichiers modifies. Un demon est lance par racine de projet (et par jeu
+d'options), la selection entiere lui est envoyee en une seule requete, et
+shutdown_all() arrete tous les demons (fermeture de l'onglet).
+
+Les demons oublies (crash de l'interface) s'arretent seuls apres
+DAEMON_IDLE_TIMEOUT secondes d'inactivite.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+from core.cache_utils import get_cache_dir
+from core.subprocess_executor import get_executor
+from core.tool_probe import resolve_tool
+
+# Fichiers qui marquent la racine d'un projet Python
+PROJECT_MARKERS = ("pyproject.toml", "setup.cfg", "setup.py", "mypy.ini", ".mypy.ini", ".git")
+
+# Options communes : une ligne par diagnostic, analysable
+MYPY_OUTPUT_FLAGS = (
+    "--no-error-summary",
+    "--show-column-numbers",
+    "--no-pretty",
+    "--show-error-codes",
+)
+
+# Arret automatique d'un demon inactif (secondes)
+DAEMON_IDLE_TIMEOUT = 1800
+
+# Delai d'une requete (le premier appel analyse tout le projet)
+REQUEST_TIMEOUT = 600
+
+# fichier:ligne[:colonne]: severite: message
+_DIAGNOSTIC_PATTERN = re.compile(r"^(?P<path>.+?):\d+(?::\d+)?: (?P<severity>error|warning|note):")
+
+
+def find_project_root(path: str) -> str:
+    """Premier repertoire parent contenant un marqueur de projet (sinon celui du fichier)."""
+    start = os.path.dirname(os.path.abspath(path))
+    directory = start
+    while True:
+        if any(os.path.exists(os.path.join(directory, marker)) for marker in PROJECT_MARKERS):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return start
+        directory = parent
+
+
+def group_by_root(files: Sequence[str]) -> Dict[str, List[str]]:
+    """Regroupe les fichiers par racine de projet, dans l'ordre de la selection."""
+    groups = defaultdict(list)
+    for file in files:
+        groups[find_project_root(file)].append(file)
+    return dict(groups)
+
+
+def split_output(stdout: str, files: Sequence[str], cwd: str) -> Dict[str, Dict]:
+    """
+    Redistribue la sortie mypy par fichier de la selection.
+
+    Returns:
+        {fichier: {"output": str, "errors": int, "warnings": int, "notes": int}}
+        Les diagnostics d'autres fichiers (modules importes) sont ignores.
+    """
+    index = {os.path.normcase(os.path.abspath(file)): file for file in files}
+    lines = defaultdict(list)
+    counts = {file: {"errors": 0, "warnings": 0, "notes": 0} for file in files}
+    for line in stdout.splitlines():
+        match = _DIAGNOSTIC_PATTERN.match(line)
+        if not match:
+            continue
+        path = os.path.normcase(os.path.abspath(os.path.join(cwd, match.group("path"))))
+        file = index.get(path)
+        if file is None:
+            continue
+        lines[file].append(line)
+        counts[file][match.group("severity") + "s"] += 1
+    return {file: {"output": "\n".join(lines[file]), **counts[file]} for file in files}
+
+
+class DmypyDaemon:
+    """Un demon dmypy pour une racine de projet et un jeu d'options mypy."""
+
+    def __init__(self, root: str, flags: Sequence[str] = ()):
+        self.root = root
+        self.flags = [*MYPY_OUTPUT_FLAGS, *flags]
+        key = hashlib.sha1("\0".join([root, *self.flags]).encode("utf-8")).hexdigest()[:16]
+        self.status_file = str(get_cache_dir("dmypy") / f"{key}.json")
+        self.started = False
+
+    def _command(self, *args: str) -> List[str]:
+        info = resolve_tool("dmypy", required=True)
+        return [info["path"], "--status-file", self.status_file, *args]
+
+    def check(self, files: Sequence[str]):
+        """
+        Verifie la selection en une requete (le demon est lance si besoin).
+
+        `dmypy run` redemarre le demon si les options ont change et ne
+        re-analyse que les fichiers modifies depuis la requete precedente.
+        """
+        cmd = self._command("run", "--timeout", str(DAEMON_IDLE_TIMEOUT), "--", *self.flags, *files)
+        result = get_executor().run(cmd, timeout=REQUEST_TIMEOUT, cwd=self.root, errors="replace")
+        self.started = True
+        return result
+
+    def stop(self) -> None:
+        """Arrete le demon (sans erreur s'il ne tourne plus)."""
+        if not self.started:
+            return
+        try:
+            get_executor().run(self._command("stop"), timeout=30, cwd=self.root)
+        except Exception as e:
+            print(f"[WARNING] Arret dmypy ({self.root}) impossible: {e}")
+        self.started = False
+
+
+_daemons: Dict[tuple, DmypyDaemon] = {}
+_daemons_lock = threading.Lock()
+
+
+def dmypy_available() -> bool:
+    """Indique si dmypy est installe."""
+    return resolve_tool("dmypy") is not None
+
+
+def get_daemon(root: str, flags: Sequence[str] = ()) -> DmypyDaemon:
+    """Demon partage pour cette racine et ces options (cree au premier appel)."""
+    key = (root, tuple(flags))
+    with _daemons_lock:
+        daemon = _daemons.get(key)
+        if daemon is None:
+            daemon = _daemons[key] = DmypyDaemon(root, flags)
+        return daemon
+
+
+def shutdown_all() -> None:
+    """Arrete tous les demons lances par ce processus."""
+    with _daemons_lock:
+        daemons = list(_daemons.values())
+        _daemons.clear()
+    for daemon in daemons:
+        daemon.stop()
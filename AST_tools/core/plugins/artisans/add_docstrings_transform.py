@@ -12,11 +12,16 @@ parent_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from core.plugins.base.base_transformer import BaseTransformer
+from core.plugins.base.prefilter import Prefilter
+from core.plugins.base.rule_dispatch import Rule, apply_rules
 
 
 class AddDocstringsTransform(BaseTransformer):
     """Ajoute des docstrings aux fonctions et classes."""
 
+    reusable = True
+    prefilter = Prefilter(tokens=["def", "class"])
+
     def __init__(self):
         super().__init__()
         self.name = "Add Docstrings"
@@ -33,22 +38,34 @@ class AddDocstringsTransform(BaseTransformer):
         }
 
     def transform(self, code_source):
-        """Ajoute des docstrings au code."""
+        """Ajoute des docstrings au code (insertion d'une ligne par definition)."""
         try:
-            tree = ast.parse(code_source)
-            self._add_docstrings(tree)
-            return ast.unparse(tree)
+            return apply_rules(code_source, [self])
         except Exception as e:
             print(f"Erreur transformation: {e}")
             return code_source
 
-    def _add_docstrings(self, node):
-        """Ajoute recursivement des docstrings."""
-        for child in ast.walk(node):
-            if isinstance(child, ast.FunctionDef):
-                if not ast.get_docstring(child):
-                    docstring = f'"""Fonction {child.name}."""'
-                    child.body.insert(0, ast.Expr(value=ast.Constant(value=docstring)))
-            elif isinstance(child, ast.ClassDef) and not ast.get_docstring(child):
-                docstring = f'"""Classe {child.name}."""'
-                child.body.insert(0, ast.Expr(value=ast.Constant(value=docstring)))
+    def make_rule(self, context):
+        """Regle du parcours partage : docstring pour chaque fonction et classe qui n'en a pas."""
+
+        def visit_definition(node):
+            self._add_docstring(context.rewriter, node)
+
+        return Rule({(ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef): visit_definition})
+
+    def _add_docstring(self, rewriter, node):
+        """Ajoute une docstring a une fonction ou une classe qui n'en a pas."""
+        if ast.get_docstring(node):
+            return
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            docstring = f'"""Fonction {node.name}."""'
+        else:
+            docstring = f'"""Classe {node.name}."""'
+
+        first = node.body[0]
+        start = rewriter.span(first)[0]
+        if rewriter.source[rewriter.line_start(first.lineno) : start].strip():
+            # Corps sur la ligne de la definition : def f(): pass
+            rewriter.insert_before(first, f"{docstring}; ")
+        else:
+            rewriter.insert_lines_before(first, [docstring])
@@ -12,11 +12,21 @@ parent_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from core.plugins.base.base_transformer import BaseTransformer
+from core.plugins.base.source_buffer import SourceBuffer
+
+# Lignes ajoutees en tete du programme
+INTERACTION = [
+    "# === Interaction utilisateur ajoutee par AST_tools ===",
+    'nom_utilisateur = input("Quel est votre nom ? ")',
+    'print(f"Hello {nom_utilisateur}!")',
+]
 
 
 class HelloUserTransform(BaseTransformer):
     """Transformateur qui ajoute une interaction Hello User"""
 
+    reusable = True
+
     def __init__(self):
         super().__init__()
         self.name = "Hello User Transform"
@@ -46,87 +56,41 @@ class HelloUserTransform(BaseTransformer):
         try:
             print("Application Hello User Transform...")
 
-            # Separer le code en lignes
-            lignes = code_source.split("\n")
-            nouvelles_lignes = []
-
-            # Variables pour tracker ou on est dans le code
-            imports_done = False
+            # Les modifications sont enregistrees sur le tampon puis appliquees en une passe
+            buffer = SourceBuffer(code_source)
             interaction_added = False
 
-            for _i, ligne in enumerate(lignes):
+            for lineno, ligne in buffer.lines():
                 # Garder tous les imports et commentaires du debut
-                if not imports_done:
+                if not interaction_added:
                     if ligne.strip().startswith("#") or "import" in ligne or ligne.strip() == "":
-                        nouvelles_lignes.append(ligne)
-                    else:
-                        # On a fini les imports, ajouter l'interaction
-                        imports_done = True
-
-                        if not interaction_added:
-                            # Ajouter l'interaction utilisateur
-                            nouvelles_lignes.append("")
-                            nouvelles_lignes.append(
-                                "# === Interaction utilisateur ajoutee par AST_tools ==="
-                            )
-                            nouvelles_lignes.append(
-                                'nom_utilisateur = input("Quel est votre nom ? ")'
-                            )
-                            nouvelles_lignes.append('print(f"Hello {nom_utilisateur}!")')
-                            nouvelles_lignes.append('print("-" * 50)')
-                            nouvelles_lignes.append("")
-                            interaction_added = True
-
-                        # Ajouter la ligne courante
-                        nouvelles_lignes.append(ligne)
-                else:
+                        continue
+                    # On a fini les imports, ajouter l'interaction avant la ligne courante
+                    buffer.insert_lines(lineno, ["", *INTERACTION, 'print("-" * 50)', ""])
+                    interaction_added = True
+                elif "print(" in ligne:
                     # Modifier les print existants pour inclure le nom
-                    if "print(" in ligne:
-                        # Si c'est un print simple, le personnaliser
-                        if "Script starting" in ligne:
-                            ligne = ligne.replace(
-                                "Script starting...", "Script starting for {nom_utilisateur}..."
-                            )
-                            # Corriger le formatage
-                            ligne = ligne.replace('print("', 'print(f"')
-                        elif "Fin du programme" in ligne:
-                            ligne = ligne.replace(
-                                "Fin du programme", "Au revoir {nom_utilisateur}!"
-                            )
-                            ligne = ligne.replace('print("', 'print(f"')
-
-                    nouvelles_lignes.append(ligne)
+                    nouvelle = self._personnaliser_print(ligne)
+                    if nouvelle != ligne:
+                        buffer.replace_line(lineno, nouvelle)
 
             # Si on n'a jamais ajoute l'interaction (fichier vide ou que des imports)
             if not interaction_added:
-                nouvelles_lignes.append("")
-                nouvelles_lignes.append("# === Interaction utilisateur ajoutee par AST_tools ===")
-                nouvelles_lignes.append('nom_utilisateur = input("Quel est votre nom ? ")')
-                nouvelles_lignes.append('print(f"Hello {nom_utilisateur}!")')
-                nouvelles_lignes.append("")
-
-            # Ajouter un message de fin si on a un bloc __main__
-            code_transforme = "\n".join(nouvelles_lignes)
-
-            if '__name__ == "__main__"' in code_transforme:
-                # Ajouter un au revoir a la fin du main
-                lignes_finales = code_transforme.split("\n")
-                resultat = []
-                in_main = False
-
-                for ligne in lignes_finales:
-                    resultat.append(ligne)
-                    if '__name__ == "__main__"' in ligne:
-                        in_main = True
-
-                # Ajouter le message de fin avant la derniere ligne si on est dans main
-                if in_main:
-                    message_fin = (
-                        '    print(f"Merci {nom_utilisateur} pour avoir utilise ce programme!")'
-                    )
-                    resultat.insert(-1, message_fin)
-
-                code_transforme = "\n".join(resultat)
+                buffer.insert(
+                    len(code_source), "\n" + "".join(f"\n{ligne}" for ligne in INTERACTION) + "\n"
+                )
+
+            # Ajouter un au revoir avant la derniere ligne si on a un bloc __main__
+            if '__name__ == "__main__"' in code_source:
+                message_fin = (
+                    '    print(f"Merci {nom_utilisateur} pour avoir utilise ce programme!")'
+                )
+                if interaction_added:
+                    buffer.insert(buffer.line_start(buffer.line_count), message_fin + "\n")
+                else:
+                    buffer.insert(len(code_source), message_fin + "\n")
+
+            code_transforme = buffer.apply()
 
             print("  [OK] Interaction utilisateur ajoutee")
             print("  [OK] Messages personnalises avec le nom")
@@ -137,6 +101,18 @@ class HelloUserTransform(BaseTransformer):
             print(f"Erreur Hello User Transform: {e}")
             return code_source
 
+    @staticmethod
+    def _personnaliser_print(ligne):
+        """Personnalise les messages de debut et de fin avec le nom de l'utilisateur."""
+        if "Script starting" in ligne:
+            ligne = ligne.replace("Script starting...", "Script starting for {nom_utilisateur}...")
+            # Corriger le formatage
+            return ligne.replace('print("', 'print(f"')
+        if "Fin du programme" in ligne:
+            ligne = ligne.replace("Fin du programme", "Au revoir {nom_utilisateur}!")
+            return ligne.replace('print("', 'print(f"')
+        return ligne
+
     def can_transform(self, code_source):
         """Verifie si la transformation peut s'appliquer"""
         # On peut toujours ajouter une interaction utilisateur
@@ -1,21 +1,88 @@
 #!/usr/bin/env python3
 """
 Transformation pour convertir os.path vers pathlib
+
+Les appels os.path.* sont reperes dans l'arbre ast (jamais dans les chaines
+ni les commentaires) et reecrits en une seule passe par le moteur de
+reecriture : seul le texte de chaque appel change. Le module doit bien
+designer os.path (`import os`, `import os.path as osp`, `from os import path`,
+`from os.path import join`) ; `from pathlib import Path` est ajoute si besoin.
+
+Seuls les appels dont le resultat n'est pas un chemin sont reecrits (tests,
+stat, basename) : os.path.join / dirname au premier niveau renvoient une
+chaine, les remplacer par str(Path(...)) n'apporterait rien. A l'interieur
+d'un appel converti, ils deviennent le Path intermediaire :
+os.path.exists(os.path.join(BASE, "a.txt")) -> Path(BASE, "a.txt").exists().
+
+Path normalise son argument ("" devient ".", "a/" devient "a") et refuse les
+bytes et les descripteurs de fichier. Quand l'argument est connu a la lecture
+du code (litteraux chaine, __file__ absolu, join / dirname de ces valeurs),
+les resultats de os.path et de pathlib sont calcules pour POSIX et pour
+Windows : l'appel n'est reecrit que s'ils sont identiques (os.path.exists("")
+reste tel quel).
+
+Quand l'argument depend de l'execution (variable, attribut, appel), seuls
+exists, isfile, isdir et basename sont convertis, avec Path(expression). Le
+resultat ne differe que pour des arguments atypiques : chaine vide
+(isdir / exists vrais), separateur ou "." final ("f.txt/" designe f.txt,
+basename("a/") vaut "a"), bytes ou descripteur de fichier (TypeError). Les
+autres fonctions (isabs, getsize...) ne sont converties que sur des valeurs
+connues.
 """
 
+import ast
+import ntpath
+import posixpath
 import sys
-from pathlib import Path
+from pathlib import Path, PurePosixPath, PureWindowsPath
 
 # Import depuis le dossier parent
 parent_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from core.plugins.base.base_transformer import BaseTransformer
+from core.plugins.base.prefilter import Prefilter
+from core.plugins.base.rule_dispatch import Rule, apply_rules
+
+# Fonctions a un argument dont le resultat n'est pas un chemin : suffixe Path
+VALUE_METHODS = {
+    "exists": ".exists()",
+    "isfile": ".is_file()",
+    "isdir": ".is_dir()",
+    "islink": ".is_symlink()",
+    "isabs": ".is_absolute()",
+    "getsize": ".stat().st_size",
+    "getmtime": ".stat().st_mtime",
+    "getatime": ".stat().st_atime",
+    "getctime": ".stat().st_ctime",
+    "basename": ".name",
+}
+
+# Fonctions converties meme quand leur argument n'est connu qu'a l'execution
+VARIABLE_METHODS = ("exists", "isfile", "isdir", "basename")
+
+# Fonctions a un argument qui renvoient un chemin : suffixe Path
+# (pas expanduser : Path.expanduser() leve une exception sans dossier personnel)
+PATH_METHODS = {
+    "dirname": ".parent",
+}
+
+# os.path.join renvoie aussi un chemin (Path(a, b, ...))
+JOIN = "join"
+
+# Pour chaque systeme : module os.path, classe Path et valeur representative de __file__
+FLAVOURS = (
+    (posixpath, PurePosixPath, "/projet/paquet/module.py"),
+    (ntpath, PureWindowsPath, "C:\\projet\\paquet\\module.py"),
+)
 
 
 class PathlibTransformer(BaseTransformer):
     """Convertit os.path vers pathlib."""
 
+    reusable = True
+    prefilter = Prefilter(substrings=["os.path", "from os import"])
+
     def __init__(self):
         super().__init__()
         self.name = "Pathlib Transformer"
@@ -32,34 +99,225 @@ class PathlibTransformer(BaseTransformer):
         }
 
     def transform(self, code_source):
-        """Transforme os.path en pathlib."""
+        """Transforme os.path en pathlib (seuls les appels os.path sont reecrits)."""
         try:
-            # Remplacements simples
-            code = code_source
-            replacements = [
-                ("os.path.join(", "Path("),
-                ("os.path.exists(", "Path("),
-                ("os.path.isfile(", "Path("),
-                ("os.path.isdir(", "Path("),
-                ("os.path.dirname(", "Path("),
-                ("os.path.basename(", "Path("),
-                ("os.path.abspath(", "Path("),
+            return apply_rules(code_source, [self])
+        except Exception as e:
+            print(f"Erreur transformation: {e}")
+            return code_source
+
+    def make_rule(self, context):
+        """Regle du parcours partage : reecrit chaque appel os.path convertible."""
+        handled = set()
+        state = {"path_free": None}
+
+        def visit_call(node):
+            if id(node) in handled or _call_shape(node) is None:
+                return
+            function = self._os_path_function(node, context.symbols)
+            if function not in VALUE_METHODS:
+                # join / dirname : seulement dans un appel converti
+                return
+            if state["path_free"] is None:
+                state["path_free"] = _path_name_free(context.symbols)
+            if not state["path_free"]:
+                # Path designe deja autre chose dans le fichier
+                return
+            text = context.rewriter.text(node)
+            if "#" in text:
+                # Commentaire dans un appel sur plusieurs lignes : on n'y touche pas
+                return
+            renderer = _Renderer(self, context, handled)
+            if not renderer.convertible(node):
+                return
+            context.rewriter.replace(node, renderer.render(node))
+            context.require_import("Path", "from pathlib import Path")
+
+        return Rule({ast.Call: visit_call})
+
+    def _os_path_function(self, node, symbols):
+        """Nom de la fonction os.path appelee (None si l'appel ne vise pas os.path)."""
+        shape = _call_shape(node)
+        if shape is None:
+            return None
+        root, attributes = shape
+        binding = symbols.binding_at(root)
+        if binding is None or binding.kind != "import":
+            return None
+        alias, statement = binding.node, binding.statement
+
+        if isinstance(statement, ast.Import):
+            if attributes[:1] == ["path"] and len(attributes) == 2 and alias.name == "os":
+                function = attributes[1]  # import os / os.path.join
+            elif (
+                attributes[:1] == ["path"]
+                and len(attributes) == 2
+                and alias.name == "os.path"
+                and alias.asname is None
+            ):
+                function = attributes[1]  # import os.path / os.path.join
+            elif len(attributes) == 1 and alias.name == "os.path" and alias.asname:
+                function = attributes[0]  # import os.path as osp / osp.join
+            else:
+                return None
+        elif statement.level == 0 and statement.module == "os" and alias.name == "path":
+            if len(attributes) != 1:
+                return None
+            function = attributes[0]  # from os import path / path.join
+        elif statement.level == 0 and statement.module == "os.path" and not attributes:
+            function = alias.name  # from os.path import join / join(...)
+        else:
+            return None
+
+        if function not in VALUE_METHODS and function not in PATH_METHODS and function != JOIN:
+            return None
+        if node.keywords:
+            return None
+        if function == JOIN:
+            return function if node.args else None
+        if len(node.args) != 1 or isinstance(node.args[0], ast.Starred):
+            return None
+        return function
+
+
+class _Renderer:
+    """Construit le texte de remplacement d'un appel (et de ses appels imbriques)."""
+
+    def __init__(self, transformer, context, handled):
+        self.transformer = transformer
+        self.context = context
+        self.handled = handled
+
+    def _function(self, node):
+        if not isinstance(node, ast.Call):
+            return None
+        return self.transformer._os_path_function(node, self.context.symbols)
+
+    def _values(self, node):
+        """
+        Par systeme (FLAVOURS) : (chaine os.path, Path) d'une expression connue
+        a la lecture du code, ou None.
+        """
+        if isinstance(node, ast.Constant) and type(node.value) is str:
+            return [(node.value, path_class(node.value)) for _, path_class, _ in FLAVOURS]
+        if isinstance(node, ast.Name) and node.id == "__file__":
+            if self.context.symbols.binding_at(node) is not None:
+                return None
+            return [(file, path_class(file)) for _, path_class, file in FLAVOURS]
+        function = self._function(node)
+        if function == JOIN:
+            if any(isinstance(arg, ast.Starred) for arg in node.args):
+                return None
+            parts = [self._values(arg) for arg in node.args]
+            if None in parts:
+                return None
+            return [
+                (
+                    module.join(*(part[i][0] for part in parts)),
+                    path_class(*(part[i][1] for part in parts)),
+                )
+                for i, (module, path_class, _) in enumerate(FLAVOURS)
             ]
+        if function == "dirname":
+            values = self._values(node.args[0])
+            if values is None:
+                return None
+            return [
+                (module.dirname(value), path.parent)
+                for (module, _, _), (value, path) in zip(FLAVOURS, values)
+            ]
+        return None
 
-            for old, new in replacements:
-                if old in code:
-                    code = code.replace(old, new)
-                    # Corriger les parentheses
-                    code = code.replace(new + ")", new.rstrip("(") + ").exists()")
+    def _non_text(self, node):
+        """Vrai si l'expression contient un litteral qui n'est pas une chaine (bytes, int)."""
+        if isinstance(node, ast.Constant):
+            return type(node.value) is not str
+        if self._function(node) in (JOIN, "dirname"):
+            return any(self._non_text(arg) for arg in node.args)
+        return False
 
-            # Ajouter import si necessaire
-            if "Path(" in code and "from pathlib import Path" not in code:
-                lines = code.split("\n")
-                lines.insert(0, "from pathlib import Path")
-                code = "\n".join(lines)
+    def convertible(self, node):
+        """
+        Vrai si l'appel peut etre reecrit : meme resultat que os.path sur tout
+        systeme pour un argument connu, fonction de VARIABLE_METHODS sinon.
+        """
+        function = self._function(node)
+        if self._non_text(node.args[0]):
+            return False
+        values = self._values(node.args[0])
+        if values is None:
+            return function in VARIABLE_METHODS
+        for (module, _, _), (value, path) in zip(FLAVOURS, values):
+            if function == "isabs":
+                same = module.isabs(value) == path.is_absolute()
+            elif function == "basename":
+                same = module.basename(value) == path.name
+            else:
+                # Tests et stat : meme chemin designe
+                same = module.normcase(value) == module.normcase(str(path))
+            if not same:
+                return False
+        return True
 
-            return code
+    def _text(self, node):
+        function = self._function(node)
+        if function is None:
+            # Texte repris tel quel : les appels qu'il contient ne sont pas reecrits
+            for child in ast.walk(node):
+                self.handled.add(id(child))
+            return self.context.rewriter.text(node)
+        return self.render(node)
 
-        except Exception as e:
-            print(f"Erreur transformation: {e}")
-            return code_source
+    def path_expression(self, node):
+        """Expression Path equivalente a un appel qui renvoie un chemin."""
+        self.handled.add(id(node))
+        function = self._function(node)
+        if function == JOIN:
+            parts = []
+            for arg in node.args:
+                inner = self._function(arg)
+                if inner == JOIN or inner in PATH_METHODS:
+                    parts.append(self.path_expression(arg))
+                else:
+                    parts.append(self._text(arg))
+            return f"Path({', '.join(parts)})"
+        return self.base(node.args[0]) + PATH_METHODS[function]
+
+    def base(self, arg):
+        """Path(arg), sans Path supplementaire si arg produit deja un chemin."""
+        inner = self._function(arg)
+        if inner == JOIN or inner in PATH_METHODS:
+            return self.path_expression(arg)
+        return f"Path({self._text(arg)})"
+
+    def render(self, node):
+        """Texte de remplacement d'un appel os.path de VALUE_METHODS."""
+        self.handled.add(id(node))
+        return self.base(node.args[0]) + VALUE_METHODS[self._function(node)]
+
+
+def _call_shape(node):
+    """(Name racine, [attributs]) pour f(...), a.f(...) ou a.b.f(...) ; None sinon."""
+    attributes = []
+    func = node.func
+    while isinstance(func, ast.Attribute) and len(attributes) < 2:
+        attributes.append(func.attr)
+        func = func.value
+    if not isinstance(func, ast.Name):
+        return None
+    return func, attributes[::-1]
+
+
+def _path_name_free(symbols):
+    """Vrai si `Path` n'est lie qu'a pathlib.Path (ou a rien) dans tout le fichier."""
+    for scope in symbols.scopes:
+        for binding in scope.bindings.get("Path", ()):
+            statement = binding.statement
+            if not (
+                binding.kind == "import"
+                and isinstance(statement, ast.ImportFrom)
+                and statement.module == "pathlib"
+                and binding.node.name == "Path"
+            ):
+                return False
+    return True
@@ -12,11 +12,16 @@ parent_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from core.plugins.base.base_transformer import BaseTransformer
+from core.plugins.base.prefilter import Prefilter
+from core.plugins.base.rule_dispatch import Rule, apply_rules
 
 
 class PrintToLoggingTransform(BaseTransformer):
     """Convertit print() en logging.info()."""
 
+    reusable = True
+    prefilter = Prefilter(tokens=["print"])
+
     def __init__(self):
         super().__init__()
         self.name = "Print to Logging"
@@ -33,35 +38,40 @@ class PrintToLoggingTransform(BaseTransformer):
         }
 
     def transform(self, code_source):
-        """Transforme print en logging."""
+        """Transforme print en logging (seuls les appels print sont reecrits)."""
         try:
-            tree = ast.parse(code_source)
-            transformer = PrintToLoggingTransformer()
-            new_tree = transformer.visit(tree)
-
-            # Ajouter import logging si necessaire
-            code = ast.unparse(new_tree)
-            if "logging." in code and "import logging" not in code:
-                code = "import logging\n" + code
-
-            return code
-
+            return apply_rules(code_source, [self])
         except Exception as e:
             print(f"Erreur transformation: {e}")
             return code_source
 
+    def make_rule(self, context):
+        """Regle du parcours partage : reecrit chaque appel print rencontre."""
+
+        def visit_call(node):
+            if (
+                isinstance(node.func, ast.Name)
+                and node.func.id == "print"
+                # Un print redefini dans le fichier n'est pas le builtin
+                and context.symbols.is_builtin_use(node.func)
+            ):
+                self._rewrite_print(context.rewriter, node)
+                # Ajouter import logging si necessaire
+                context.require_import("logging", "import logging")
+
+        return Rule({ast.Call: visit_call})
 
-class PrintToLoggingTransformer(ast.NodeTransformer):
-    """Transformateur AST pour print vers logging."""
+    def _rewrite_print(self, rewriter, node):
+        """print(...) -> logging.info(...) ; les arguments nommes (sep, end, file) sont retires."""
+        rewriter.replace(node.func, "logging.info")
+        if not node.keywords:
+            return
 
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name) and node.func.id == "print":
-            # Remplacer print par logging.info
-            return ast.Call(
-                func=ast.Attribute(
-                    value=ast.Name(id="logging", ctx=ast.Load()), attr="info", ctx=ast.Load()
-                ),
-                args=node.args,
-                keywords=[],
-            )
-        return node
+        first_keyword = rewriter.span(node.keywords[0])[0]
+        last_keyword = rewriter.span(node.keywords[-1])[1]
+        if any(rewriter.span(arg)[1] > first_keyword for arg in node.args):
+            # Argument positionnel apres un argument nomme : on ne touche qu'au nom
+            return
+        # Retirer aussi la virgule qui separe le dernier argument positionnel
+        start = rewriter.span(node.args[-1])[1] if node.args else first_keyword
+        rewriter.replace_span(start, last_keyword, "")
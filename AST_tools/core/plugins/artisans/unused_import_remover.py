@@ -4,6 +4,7 @@ Transformation pour supprimer les imports inutilises
 """
 
 import ast
+import copy
 import sys
 from pathlib import Path
 
@@ -12,11 +13,17 @@ parent_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from core.plugins.base.base_transformer import BaseTransformer
+from core.plugins.base.prefilter import Prefilter
+from core.plugins.base.rule_dispatch import Rule, apply_rules
 
 
 class UnusedImportRemover(BaseTransformer):
     """Supprime les imports non utilises."""
 
+    reusable = True
+    sees_prior_edits = True
+    prefilter = Prefilter(tokens=["import"])
+
     def __init__(self):
         super().__init__()
         self.name = "Unused Import Remover"
@@ -33,45 +40,68 @@ class UnusedImportRemover(BaseTransformer):
         }
 
     def transform(self, code_source):
-        """Supprime les imports non utilises."""
+        """Supprime les imports non utilises (seules les lignes d'import changent)."""
         try:
-            tree = ast.parse(code_source)
-
-            # Collecter tous les noms utilises
-            used_names = set()
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Name):
-                    used_names.add(node.id)
-
-            # Filtrer les imports
-            new_body = []
-            for node in tree.body:
-                if isinstance(node, ast.Import):
-                    # Garder seulement les imports utilises
-                    new_names = []
-                    for alias in node.names:
-                        name = alias.asname if alias.asname else alias.name
-                        if name in used_names:
-                            new_names.append(alias)
-                    if new_names:
-                        node.names = new_names
-                        new_body.append(node)
-                elif isinstance(node, ast.ImportFrom):
-                    # Garder seulement les imports from utilises
-                    new_names = []
-                    for alias in node.names:
-                        name = alias.asname if alias.asname else alias.name
-                        if name in used_names:
-                            new_names.append(alias)
-                    if new_names:
-                        node.names = new_names
-                        new_body.append(node)
-                else:
-                    new_body.append(node)
-
-            tree.body = new_body
-            return ast.unparse(tree)
-
+            return apply_rules(code_source, [self])
         except Exception as e:
             print(f"Erreur transformation: {e}")
             return code_source
+
+    def make_rule(self, context):
+        """
+        Regle du parcours partage : les imports inutilises sont lus dans la
+        table des symboles du fichier (portees, __all__, annotations en chaine)
+        une fois le parcours termine. Les imports retires sont notes dans le
+        contexte : si une autre regle du parcours a besoin du nom
+        (require_import), l'import est rajoute en tete comme il l'aurait ete
+        apres une suppression en passe separee.
+        """
+
+        def finish():
+            context.removed_imports.update(self._remove_unused(context.rewriter, context.symbols))
+
+        return Rule({}, finish)
+
+    def _removable(self, binding):
+        """Import inutilise qu'on peut retirer sans changer le comportement."""
+        alias, statement = binding.node, binding.statement
+        if binding.guarded:
+            # Import optionnel (try/except ImportError) : sa presence est testee
+            return False
+        if isinstance(statement, ast.ImportFrom) and statement.module == "__future__":
+            return False
+        # `import x as x` : re-export explicite
+        return alias.asname is None or alias.asname != alias.name
+
+    def _remove_unused(self, rewriter, symbols):
+        """
+        Retire les imports inutilises, a tous les niveaux (module, fonctions,
+        blocs). Retourne les id des alias retires.
+        """
+        removed = {}
+        for binding in symbols.unused_imports():
+            if self._removable(binding):
+                removed.setdefault(id(binding.statement), (binding.statement, set()))[1].add(
+                    id(binding.node)
+                )
+
+        emptied = {}
+        for statement, aliases in removed.values():
+            kept = [alias for alias in statement.names if id(alias) not in aliases]
+            if kept:
+                # Seule l'instruction d'import concernee est regeneree (l'arbre,
+                # partage avec les autres regles, n'est pas modifie)
+                partial = copy.copy(statement)
+                partial.names = kept
+                rewriter.replace(statement, ast.unparse(partial))
+            else:
+                emptied[id(statement)] = statement
+
+        for statement in emptied.values():
+            block = symbols.block_of(statement) or []
+            if block and block[0] is statement and all(id(s) in emptied for s in block):
+                # Un bloc ne peut pas etre vide : le premier import devient pass
+                rewriter.replace(statement, "pass")
+            else:
+                rewriter.remove_statement(statement)
+        return {alias for _, aliases in removed.values() for alias in aliases}
@@ -6,7 +6,9 @@ Utilise ABC pour garantir l'implementation des methodes essentielles
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from core.plugins.base.prefilter import Prefilter, prefilter_matches
 
 
 class BaseTransformer(ABC):
@@ -16,6 +18,33 @@ class BaseTransformer(ABC):
     les methodes abstraites.
     """
 
+    # Une instance reutilisable ne garde aucun etat entre deux appels a
+    # transform() : le TransformationLoader peut alors la partager (une instance
+    # par thread de travail) au lieu d'en construire une par fichier.
+    reusable = False
+
+    # Criteres textuels qu'un fichier doit remplir pour que transform() puisse
+    # le modifier (voir core/plugins/base/prefilter.py). L'orchestrateur les
+    # evalue sur le code brut, avant toute analyse, et saute les fichiers qui
+    # ne correspondent pas. None : le plugin s'applique a tous les fichiers.
+    prefilter: Optional[Prefilter] = None
+
+    # Un artisan base sur ast peut exposer sa logique sous forme de regle :
+    # methode make_rule(context) -> Rule (voir core/plugins/base/rule_dispatch.py).
+    # Les regles de plusieurs plugins consecutifs d'un plan sont alors appliquees
+    # en un seul parcours de l'arbre. None : transform() uniquement.
+    make_rule = None
+
+    # Regle dont le resultat depend des modifications des regles precedentes
+    # (imports devenus inutiles) : elle est appliquee dans un nouveau parcours,
+    # sur le code deja modifie, au lieu de voir le code d'origine.
+    sees_prior_edits = False
+
+    # Un generateur cree des fichiers au lieu d'en transformer : methode
+    # render(params) -> str, appelee pour chaque element d'une instruction
+    # `generator` (voir core/plugins/base/generation.py). None : pas un generateur.
+    render = None
+
     def __init__(self):
         # Valeurs par defaut (peuvent etre surchargees)
         self.name = "Base Transformer"
@@ -59,10 +88,24 @@ class BaseTransformer(ABC):
         """
         pass
 
+    def setup(self) -> None:
+        """
+        Hook de cycle de vie appele une fois apres l'instanciation.
+        Lieu prevu pour les initialisations couteuses (compilation de motifs,
+        tables de correspondance, ...). Par defaut, ne fait rien.
+        """
+
+    def teardown(self) -> None:
+        """
+        Hook de cycle de vie appele quand l'instance n'est plus utilisee
+        (fin d'execution ou fermeture du pool). Par defaut, ne fait rien.
+        """
+
     def can_transform(self, code_source: str) -> bool:
         """
         Verifie si cette transformation peut s'appliquer au code.
-        Par defaut, retourne True (peut etre surchargee).
+        Par defaut, evalue le prefiltre declare (True en l'absence de
+        prefiltre) ; peut etre surchargee.
 
         Args:
             code_source (str): Code source Python a analyser
@@ -70,7 +113,7 @@ class BaseTransformer(ABC):
         Returns:
             bool: True si la transformation est applicable
         """
-        return True
+        return prefilter_matches(self.prefilter, code_source)
 
     def get_imports_required(self) -> List[str]:
         """
@@ -95,16 +138,36 @@ class BaseTransformer(ABC):
     def preview_changes(self, code_source: str) -> Dict[str, Any]:
         """
         Previsualise les changements sans les appliquer.
-        Methode optionnelle pour l'interface utilisateur.
+        La transformation est executee en memoire et comparee a l'original.
 
         Args:
             code_source (str): Code source original
 
         Returns:
-            dict: Informations sur les changements prevus
+            dict: Informations sur les changements prevus (lignes ajoutees,
+            supprimees et diff unifie)
         """
-        return {
+        from core.diff_engine import FileDiff
+
+        preview = {
             "applicable": self.can_transform(code_source),
             "description": self.get_metadata()["description"],
             "estimated_changes": 0,
+            "added": 0,
+            "removed": 0,
+            "diff": "",
         }
+        if not preview["applicable"]:
+            return preview
+
+        try:
+            file_diff = FileDiff("<source>", code_source, self.transform(code_source))
+        except Exception as e:
+            preview["error"] = str(e)
+            return preview
+
+        preview["added"] = file_diff.added
+        preview["removed"] = file_diff.removed
+        preview["estimated_changes"] = file_diff.added + file_diff.removed
+        preview["diff"] = file_diff.diff_text
+        return preview
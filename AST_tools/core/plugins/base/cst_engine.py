@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Moteur de reecriture preservant le format
+=========================================
+
+Les artisans analysent le code avec `ast`, mais au lieu de regenerer tout le
+fichier avec ast.unparse (qui perd commentaires, lignes vides et mise en
+forme), ils enregistrent des modifications sur les positions des noeuds :
+remplacer le texte d'un noeud, inserer avant/apres, supprimer une
+instruction. apply() les applique comme des collages de texte minimaux ;
+tout ce qui n'est pas touche reste identique a l'octet pres.
+
+SourceRewriter s'appuie sur SourceBuffer (index des lignes, modifications par
+lots) et y ajoute la conversion des positions ast (ligne, colonne en octets
+UTF-8) en indices dans la chaine source. Deux modifications qui se
+chevauchent levent EditConflictError.
+"""
+
+import ast
+from typing import List, Optional, Tuple
+
+from core.plugins.base.source_buffer import EditConflictError, SourceBuffer
+
+__all__ = ["EditConflictError", "SourceRewriter"]
+
+
+class SourceRewriter(SourceBuffer):
+    """
+    Modifications positionnelles d'un code source.
+
+    Usage:
+        rewriter = SourceRewriter(code)
+        for node in ast.walk(rewriter.tree):
+            ...
+            rewriter.replace(node.func, "logging.info")
+        code = rewriter.apply()
+    """
+
+    def __init__(self, source: str, tree: Optional[ast.Module] = None):
+        super().__init__(source)
+        self._tree = tree
+
+    @property
+    def tree(self) -> ast.Module:
+        """Arbre ast du code (analyse a la demande)."""
+        if self._tree is None:
+            self._tree = ast.parse(self.source)
+        return self._tree
+
+    # --- Positions ---
+
+    def line_text(self, lineno: int) -> str:
+        """Texte de la ligne (1-indexee), sans fin de ligne."""
+        return self.line(lineno).rstrip("\r")
+
+    def offset(self, lineno: int, col_offset: int) -> int:
+        """Indice dans la source d'une position ast (colonne en octets UTF-8)."""
+        start = self._line_starts[lineno - 1]
+        line = self.line_text(lineno)
+        if line.isascii():
+            return start + col_offset
+        return start + len(line.encode("utf-8")[:col_offset].decode("utf-8", errors="ignore"))
+
+    def span(self, node: ast.AST) -> Tuple[int, int]:
+        """(debut, fin) du texte d'un noeud."""
+        return (
+            self.offset(node.lineno, node.col_offset),
+            self.offset(node.end_lineno, node.end_col_offset),
+        )
+
+    def text(self, node: ast.AST) -> str:
+        start, end = self.span(node)
+        return self.source[start:end]
+
+    def indentation(self, node: ast.AST) -> str:
+        """Indentation de la ligne ou commence le noeud."""
+        line = self.line_text(node.lineno)
+        return line[: len(line) - len(line.lstrip())]
+
+    # --- Modifications ---
+
+    def replace(self, node: ast.AST, text: str) -> None:
+        """Remplace le texte d'un noeud."""
+        self.replace_span(*self.span(node), text)
+
+    def insert_before(self, node: ast.AST, text: str) -> None:
+        self.insert(self.span(node)[0], text)
+
+    def insert_after(self, node: ast.AST, text: str) -> None:
+        self.insert(self.span(node)[1], text)
+
+    def insert_lines_before(self, node: ast.AST, lines: List[str]) -> None:
+        """Insere des lignes completes avant l'instruction, a son indentation."""
+        indent = self.indentation(node)
+        self.insert(self.line_start(node.lineno), "".join(f"{indent}{line}\n" for line in lines))
+
+    def remove_statement(self, node: ast.stmt) -> None:
+        """
+        Supprime une instruction.
+
+        Seule sur ses lignes, les lignes entieres disparaissent (commentaire de
+        fin de ligne compris) ; partagee avec d'autres via `;`, seule
+        l'instruction et son separateur sont retires.
+        """
+        start, end = self.span(node)
+        line_start = self.line_start(node.lineno)
+        line_end = self.line_end(node.end_lineno)
+        before = self.source[line_start:start]
+        after = self.source[end:line_end].lstrip(" \t")
+
+        if not before.strip() and (not after.strip() or after.startswith("#")):
+            self.replace_span(line_start, self.line_end(node.end_lineno, keep_newline=True), "")
+        elif after.startswith(";"):
+            separator = self.source.index(";", end) + 1
+            while separator < line_end and self.source[separator] in " \t":
+                separator += 1
+            self.replace_span(start, separator, "")
+        elif before.rstrip().endswith(";"):
+            self.replace_span(line_start + before.rstrip().rindex(";"), end, "")
+        else:
+            self.replace_span(start, end, "")
+
+    def module_insert_offset(self) -> int:
+        """Indice ou inserer un import : apres la docstring et les imports __future__."""
+        lineno = 0
+        for index, node in enumerate(self.tree.body):
+            is_docstring = (
+                index == 0
+                and isinstance(node, ast.Expr)
+                and isinstance(node.value, ast.Constant)
+                and isinstance(node.value.value, str)
+            )
+            is_future = isinstance(node, ast.ImportFrom) and node.module == "__future__"
+            if not (is_docstring or is_future):
+                break
+            lineno = node.end_lineno
+        if lineno == 0:
+            # Garder le shebang et la declaration d'encodage en tete
+            while lineno < min(2, len(self._line_starts)) and self.line_text(lineno + 1).startswith(
+                ("#!", "# -*-", "# coding")
+            ):
+                lineno += 1
+        return self.line_end(lineno, keep_newline=True) if lineno else 0
+
+    def add_import(self, statement: str) -> None:
+        """Ajoute une ligne d'import en tete de module."""
+        offset = self.module_insert_offset()
+        prefix = "" if offset == 0 or self.source[offset - 1] == "\n" else "\n"
+        self.insert(offset, f"{prefix}{statement}\n")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Generation de fichiers par lot
+==============================
+
+Une instruction `generator` d'un plan produit de nouveaux fichiers au lieu de
+transformer des fichiers existants. Ses parametres decrivent tout le lot :
+
+    {
+        "output_dir": "services",              # racine des fichiers generes
+        "filename": "${name}/service.py",      # optionnel, chemin relatif
+        "overwrite": false,                    # optionnel
+        "items": [{"name": "billing"}, ...]    # un fichier par element
+    }
+
+Sans "items", les autres parametres forment un element unique. Chaque element
+est passe a generator.render(params) ; le chemin de sortie est le modele
+"filename" (ou filename_template du generateur) complete par les parametres
+de l'element et les valeurs par defaut du generateur.
+
+Avant toute ecriture, check_collisions() verifie l'ensemble du lot : deux
+elements qui visent le meme fichier, un chemin qui sort de output_dir ou un
+fichier deja present (sauf overwrite) sont des erreurs. L'orchestrateur
+n'ecrit rien si une erreur est detectee.
+"""
+
+import os
+import time
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+# Parametres d'une instruction generator qui ne sont pas transmis au generateur
+OUTPUT_DIR_PARAM = "output_dir"
+FILENAME_PARAM = "filename"
+OVERWRITE_PARAM = "overwrite"
+ITEMS_PARAM = "items"
+RESERVED_PARAMS = (OUTPUT_DIR_PARAM, FILENAME_PARAM, OVERWRITE_PARAM, ITEMS_PARAM)
+
+
+class GeneratedFile(NamedTuple):
+    """Fichier a creer : chemin absolu, contenu, element d'origine et duree du rendu."""
+
+    path: Path
+    content: str
+    overwrite: bool
+    source: str
+    step: str = ""
+    elapsed: float = 0.0
+
+
+def supports_generation(transformer) -> bool:
+    """Indique si un plugin sait generer un fichier a partir de parametres."""
+    return callable(getattr(transformer, "render", None))
+
+
+def generation_items(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Elements a generer d'une instruction (parametres reserves retires)."""
+    if ITEMS_PARAM in params:
+        items = params[ITEMS_PARAM]
+        if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+            raise ValueError(f"'{ITEMS_PARAM}' doit etre une liste d'objets")
+        return items
+    return [{k: v for k, v in params.items() if k not in RESERVED_PARAMS}]
+
+
+def render_items(
+    generator, params: Dict[str, Any], label: str = "", step: str = ""
+) -> Tuple[List[GeneratedFile], List[str]]:
+    """
+    Genere le contenu de chaque element d'une instruction.
+
+    `label` prefixe les messages d'erreur ; `step` (nom du generateur) est
+    repris dans chaque GeneratedFile pour le rapport du run.
+
+    Returns:
+        (fichiers, erreurs) : une erreur par element en echec
+    """
+    output_dir = Path(params.get(OUTPUT_DIR_PARAM) or ".").resolve()
+    filename = params.get(FILENAME_PARAM)
+    template = Template(filename) if filename else generator.filename_template
+    overwrite = bool(params.get(OVERWRITE_PARAM, False))
+    defaults = getattr(generator, "defaults", {})
+
+    files, errors = [], []
+    for index, item in enumerate(generation_items(params)):
+        source = f"{label}[{index}]"
+        start = time.perf_counter()
+        try:
+            relative = template.substitute({**defaults, **item})
+            content = generator.render(dict(item))
+        except KeyError as e:
+            errors.append(f"{source}: parametre manquant {e} pour le nom de fichier")
+            continue
+        except Exception as e:
+            errors.append(f"{source}: {e}")
+            continue
+        path = (output_dir / relative).resolve()
+        if path != output_dir and output_dir not in path.parents:
+            errors.append(f"{source}: '{relative}' sort du dossier {output_dir}")
+            continue
+        elapsed = time.perf_counter() - start
+        files.append(GeneratedFile(path, content, overwrite, source, step or label, elapsed))
+    return files, errors
+
+
+def check_collisions(files: Iterable[GeneratedFile], protected: Iterable[str] = ()) -> List[str]:
+    """
+    Verifie un lot de fichiers a generer avant ecriture.
+
+    Args:
+        files: fichiers de toutes les instructions generator du plan
+        protected: fichiers transformes par le meme run (jamais ecrases)
+
+    Returns:
+        Les messages d'erreur (liste vide si le lot peut etre ecrit)
+    """
+    errors = []
+    seen = {}
+    protected = {os.path.normcase(str(Path(p).resolve())) for p in protected}
+    for generated in files:
+        key = os.path.normcase(str(generated.path))
+        if key in seen:
+            errors.append(
+                f"{generated.source}: {generated.path} deja genere par {seen[key].source}"
+            )
+            continue
+        seen[key] = generated
+        if key in protected:
+            errors.append(f"{generated.source}: {generated.path} est un fichier cible du plan")
+        elif generated.path.is_dir():
+            errors.append(f"{generated.source}: {generated.path} est un dossier")
+        elif not generated.overwrite and generated.path.exists():
+            errors.append(f"{generated.source}: {generated.path} existe deja")
+    return errors
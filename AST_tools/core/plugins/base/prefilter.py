@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Prefiltre d'applicabilite des plugins
+=====================================
+
+Un artisan analyse tout le fichier (ast.parse) avant de savoir s'il a quelque
+chose a faire. Le prefiltre declare, sans analyse, ce qu'un fichier doit
+contenir pour que le plugin puisse le modifier :
+
+- substrings : sous-chaines brutes (ex: "os.path") ;
+- tokens : identifiants entiers (ex: "print" ne correspond pas a "reprint") ;
+- regex : expression reguliere (mode multiligne) ;
+- imports : modules importes (`import os`, `from os.path import ...`).
+
+Un fichier est retenu si AU MOINS UN critere correspond : le prefiltre peut
+laisser passer un fichier inutile (occurrence dans un commentaire), jamais en
+ecarter un que le plugin aurait modifie. Un prefiltre vide retient tout.
+
+La forme dictionnaire (to_dict / from_dict) est stockee dans le manifeste des
+plugins : l'orchestrateur filtre les fichiers sans importer le plugin.
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+PREFILTER_KEYS = ("substrings", "tokens", "regex", "imports")
+
+
+class Prefilter:
+    """Criteres textuels d'applicabilite d'un plugin (evalues sur le code brut)."""
+
+    __slots__ = ("substrings", "tokens", "regex", "imports", "_patterns")
+
+    def __init__(
+        self,
+        substrings: Iterable[str] = (),
+        tokens: Iterable[str] = (),
+        regex: Optional[str] = None,
+        imports: Iterable[str] = (),
+    ):
+        self.substrings = tuple(substrings)
+        self.tokens = tuple(tokens)
+        self.regex = regex
+        self.imports = tuple(imports)
+        self._patterns = None
+
+    @property
+    def empty(self) -> bool:
+        return not (self.substrings or self.tokens or self.regex or self.imports)
+
+    def _compile(self):
+        """Compile les expressions une seule fois (a la premiere evaluation)."""
+        patterns = []
+        if self.tokens:
+            alternatives = "|".join(re.escape(token) for token in self.tokens)
+            patterns.append(re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)"))
+        if self.regex:
+            patterns.append(re.compile(self.regex, re.MULTILINE))
+        if self.imports:
+            modules = "|".join(re.escape(module) for module in self.imports)
+            patterns.append(
+                re.compile(
+                    rf"^[ \t]*(?:from[ \t]+(?:{modules})(?:\.[\w.]+)?[ \t]+import\b"
+                    rf"|import[ \t]+(?:[\w.]+(?:[ \t]+as[ \t]+\w+)?[ \t]*,[ \t]*)*"
+                    rf"(?:{modules})(?!\w))",
+                    re.MULTILINE,
+                )
+            )
+        self._patterns = patterns
+        return patterns
+
+    def matches(self, code: str) -> bool:
+        """Indique si le code peut interesser le plugin."""
+        if self.empty:
+            return True
+        if any(substring in code for substring in self.substrings):
+            return True
+        patterns = self._patterns if self._patterns is not None else self._compile()
+        return any(pattern.search(code) for pattern in patterns)
+
+    def to_dict(self) -> Dict:
+        """Forme JSON (cles non vides uniquement)."""
+        data = {
+            "substrings": list(self.substrings),
+            "tokens": list(self.tokens),
+            "regex": self.regex,
+            "imports": list(self.imports),
+        }
+        return {key: value for key, value in data.items() if value}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Prefilter":
+        """Reconstruit un prefiltre ; une cle inconnue leve ValueError."""
+        unknown = set(data) - set(PREFILTER_KEYS)
+        if unknown:
+            raise ValueError(f"Cle(s) de prefiltre inconnue(s): {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def __repr__(self):
+        return f"Prefilter({self.to_dict()})"
+
+
+def prefilter_matches(prefilter: Optional[Prefilter], code: str) -> bool:
+    """prefilter.matches(code), vrai si le plugin ne declare pas de prefiltre."""
+    return prefilter is None or prefilter.matches(code)
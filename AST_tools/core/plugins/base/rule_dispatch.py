@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Parcours unique de l'arbre pour plusieurs regles
+================================================
+
+Chaque artisan parcourait l'arbre complet pour son propre compte : un plan
+de N artisans AST coutait N analyses et N parcours par fichier. Un artisan
+peut desormais exposer sa logique sous forme de regle (make_rule) : des
+gestionnaires par type de noeud, plus une etape finale apres le parcours.
+
+RuleDispatcher regroupe les gestionnaires de plusieurs regles et visite
+chaque noeud une seule fois en appelant tous les gestionnaires interesses.
+Toutes les regles enregistrent leurs modifications sur le meme
+SourceRewriter : une seule analyse, un seul parcours, une seule application.
+
+Les regles fusionnees voient toutes le code d'origine (et non le resultat de
+la regle precedente). Une regle dont le resultat depend des modifications
+precedentes (suppression des imports devenus inutiles) le declare avec
+l'attribut de classe sees_prior_edits : apply_rules() lui ouvre un nouveau
+parcours. Les autres dependances entre regles passent par RuleContext :
+une regle qui introduit un nom importe le declare avec require_import() ;
+l'import est ajoute s'il n'est pas lie ou si une autre regle l'a retire.
+Deux modifications qui se chevauchent levent EditConflictError : l'appelant
+repasse alors en application sequentielle.
+"""
+
+import ast
+import copy
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union
+
+from core.plugins.base.cst_engine import SourceRewriter
+from core.symbol_index import SymbolIndex, get_symbol_index
+
+Handler = Callable[[ast.AST], None]
+NodeTypes = Union[Type[ast.AST], Tuple[Type[ast.AST], ...]]
+
+
+class RuleContext:
+    """Etat partage par les regles d'un meme parcours."""
+
+    def __init__(self, rewriter: SourceRewriter):
+        self.rewriter = rewriter
+        # nom lie -> instruction d'import a ajouter si elle est absente
+        self.required_imports: Dict[str, str] = {}
+        # id des alias d'import retires par une regle du parcours
+        self.removed_imports: Set[int] = set()
+        # Rang dans le parcours de la regle qui utilise le contexte (voir for_rule)
+        self.rule_index = 0
+        self._requested_by: Dict[str, int] = {}
+        self._symbols: Optional[SymbolIndex] = None
+
+    def for_rule(self, index: int) -> "RuleContext":
+        """Contexte de la regle de rang `index` : meme etat partage, rang propre."""
+        view = copy.copy(self)
+        view.rule_index = index
+        return view
+
+    @property
+    def tree(self) -> ast.Module:
+        return self.rewriter.tree
+
+    @property
+    def symbols(self) -> SymbolIndex:
+        """Table des symboles du code (calculee a la demande, partagee via le cache)."""
+        if self._symbols is None:
+            self._symbols = get_symbol_index(self.rewriter.source, self.rewriter.tree)
+        return self._symbols
+
+    def require_import(self, name: str, statement: str) -> None:
+        """Declare qu'une modification utilise `name`, lie par `statement`."""
+        self.required_imports.setdefault(name, statement)
+        self._requested_by.setdefault(name, self.rule_index)
+
+    def add_required_imports(self) -> None:
+        """
+        Ajoute en tete de module les imports requis dont le nom n'y est pas deja lie.
+
+        Les imports d'une regle sont places au-dessus de ceux des regles
+        precedentes, comme si chaque regle avait ajoute les siens a son tour.
+        """
+        added = set()
+        requested = sorted(
+            self.required_imports.items(), key=lambda item: -self._requested_by.get(item[0], 0)
+        )
+        for name, statement in requested:
+            if statement in added or self._is_bound(name, statement):
+                continue
+            self.rewriter.add_import(statement)
+            added.add(statement)
+
+    def _is_bound(self, name: str, statement: str) -> bool:
+        """
+        Vrai si `name` est deja lie, dans la portee du module, a ce que lie `statement`.
+
+        `import logging.handlers` lie bien `logging` au module logging ;
+        `import logging as log` ou `from pathlib import Path as P` ne lient pas
+        le nom demande, `import logging_config` encore moins.
+        """
+        expected = dict(_import_targets(ast.parse(statement).body)).get(name)
+        if expected is None:
+            return False
+        for binding in self.symbols.module.bindings.get(name, ()):
+            if binding.kind != "import" or id(binding.node) in self.removed_imports:
+                continue
+            if _import_target(binding.statement, binding.node)[1] == expected:
+                return True
+        return False
+
+
+def _import_target(statement: ast.stmt, alias: ast.alias) -> Tuple[str, Tuple]:
+    """(nom lie, (module de from ou None, module ou objet importe)) pour un alias d'import."""
+    if isinstance(statement, ast.ImportFrom):
+        module = statement.module if statement.level == 0 else "." * statement.level
+        return alias.asname or alias.name, (module, alias.name)
+    if alias.asname:
+        return alias.asname, (None, alias.name)
+    root = alias.name.partition(".")[0]
+    return root, (None, root)
+
+
+def _import_targets(statements: List[ast.stmt]) -> List[Tuple[str, Tuple]]:
+    return [
+        _import_target(node, alias)
+        for node in statements
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+        for alias in node.names
+    ]
+
+
+class Rule:
+    """
+    Logique d'un artisan decoupee pour le parcours partage.
+
+    Args:
+        handlers: {type(s) de noeud: fonction(noeud)} appelees pendant le parcours
+        finish: fonction sans argument appelee apres le parcours complet
+    """
+
+    def __init__(
+        self, handlers: Dict[NodeTypes, Handler], finish: Optional[Callable[[], None]] = None
+    ):
+        self.handlers = handlers
+        self.finish = finish
+
+
+class RuleDispatcher:
+    """Visite chaque noeud une fois et appelle les gestionnaires de toutes les regles."""
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self._handlers: Dict[Type[ast.AST], List[Handler]] = {}
+        self._finishers: List[Callable[[], None]] = []
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: Rule) -> None:
+        for node_types, handler in rule.handlers.items():
+            if not isinstance(node_types, tuple):
+                node_types = (node_types,)
+            for node_type in node_types:
+                self._handlers.setdefault(node_type, []).append(handler)
+        if rule.finish is not None:
+            self._finishers.append(rule.finish)
+
+    def run(self, tree: ast.AST) -> None:
+        """Parcours unique (meme ordre que ast.walk), puis etapes finales dans l'ordre."""
+        handlers = self._handlers
+        if handlers:
+            for node in ast.walk(tree):
+                node_handlers = handlers.get(type(node))
+                if node_handlers:
+                    for handler in node_handlers:
+                        handler(node)
+        for finish in self._finishers:
+            finish()
+
+
+def supports_rules(transformer) -> bool:
+    """Indique si un plugin expose sa logique sous forme de regle (make_rule)."""
+    return callable(getattr(transformer, "make_rule", None))
+
+
+def apply_rules(code_source: str, transformers: Sequence) -> str:
+    """
+    Applique les regles de plusieurs plugins en un seul parcours.
+
+    Une regle qui lit le resultat des regles precedentes (sees_prior_edits)
+    ouvre un nouveau parcours sur le code deja modifie : le resultat est le
+    meme que celui des plugins appliques un par un.
+
+    Les erreurs ne sont pas interceptees (EditConflictError, SyntaxError...) :
+    l'appelant decide du repli.
+    """
+    passes: List[list] = []
+    for transformer in transformers:
+        if not passes or getattr(transformer, "sees_prior_edits", False):
+            passes.append([])
+        passes[-1].append(transformer)
+    for group in passes:
+        code_source = _apply_pass(code_source, group)
+    return code_source
+
+
+def _apply_pass(code_source: str, transformers: Sequence) -> str:
+    rewriter = SourceRewriter(code_source)
+    context = RuleContext(rewriter)
+    dispatcher = RuleDispatcher(
+        transformer.make_rule(context.for_rule(index))
+        for index, transformer in enumerate(transformers)
+    )
+    dispatcher.run(rewriter.tree)
+    if rewriter.has_edits:
+        context.add_required_imports()
+    return rewriter.apply()
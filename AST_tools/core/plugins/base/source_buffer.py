@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tampon de code source avec index de lignes et modifications par lots
+====================================================================
+
+Les plugins textuels decoupaient le fichier en lignes, reconstruisaient des
+listes puis les rejoignaient ("\\n".join) plusieurs fois par appel. Un
+SourceBuffer garde le texte d'origine intact :
+
+- l'index des debuts de ligne est construit une fois, a la premiere demande ;
+- les lignes sont lues a la demande (line(), lines()) sans copie du fichier ;
+- les modifications sont des remplacements de portions (debut, fin, texte),
+  enregistres puis appliques en une seule passe par apply().
+
+Les lignes suivent la convention de str.split("\\n") : un fichier termine par
+un saut de ligne a une derniere ligne vide. Deux modifications qui se
+chevauchent levent EditConflictError.
+"""
+
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Tuple
+
+
+class EditConflictError(ValueError):
+    """Deux modifications portent sur des portions de texte qui se chevauchent."""
+
+
+class SourceBuffer:
+    """
+    Texte source, index de lignes et modifications en attente.
+
+    Usage:
+        buffer = SourceBuffer(code)
+        for lineno, line in buffer.lines():
+            if "print(" in line:
+                buffer.replace_line(lineno, line.replace("print(", "log("))
+        code = buffer.apply()
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._edits: List[Tuple[int, int, str, int]] = []
+        self._starts: Optional[List[int]] = None
+
+    # --- Index des lignes ---
+
+    @property
+    def _line_starts(self) -> List[int]:
+        """Indice du debut de chaque ligne (calcule a la premiere demande)."""
+        if self._starts is None:
+            starts = [0]
+            find = self.source.find
+            index = find("\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = find("\n", index + 1)
+            self._starts = starts
+        return self._starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self._line_starts)
+
+    def line_start(self, lineno: int) -> int:
+        """Indice du debut de la ligne (1-indexee)."""
+        return self._line_starts[lineno - 1]
+
+    def line_end(self, lineno: int, keep_newline: bool = False) -> int:
+        """Indice de fin de ligne (apres le saut de ligne si keep_newline)."""
+        starts = self._line_starts
+        if lineno < len(starts):
+            end = starts[lineno]
+            return end if keep_newline else end - 1
+        return len(self.source)
+
+    def line(self, lineno: int) -> str:
+        """Texte brut de la ligne, sans le saut de ligne."""
+        return self.source[self.line_start(lineno) : self.line_end(lineno)]
+
+    def lines(self, start: int = 1) -> Iterator[Tuple[int, str]]:
+        """(numero, texte) de chaque ligne a partir de `start`, lues a la demande."""
+        for lineno in range(start, self.line_count + 1):
+            yield lineno, self.line(lineno)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """(ligne 1-indexee, colonne en caracteres) d'un indice de la source."""
+        lineno = bisect_right(self._line_starts, offset)
+        return lineno, offset - self._line_starts[lineno - 1]
+
+    # --- Modifications ---
+
+    def replace_span(self, start: int, end: int, text: str) -> None:
+        """Remplace source[start:end] par text."""
+        self._edits.append((start, end, text, len(self._edits)))
+
+    def insert(self, offset: int, text: str) -> None:
+        """Insere du texte a un indice de la source."""
+        self.replace_span(offset, offset, text)
+
+    def replace_line(self, lineno: int, text: str) -> None:
+        """Remplace le contenu d'une ligne (le saut de ligne est conserve)."""
+        self.replace_span(self.line_start(lineno), self.line_end(lineno), text)
+
+    def insert_lines(self, lineno: int, lines: List[str]) -> None:
+        """Insere des lignes completes avant la ligne `lineno`."""
+        self.insert(self.line_start(lineno), "".join(f"{line}\n" for line in lines))
+
+    # --- Application ---
+
+    @property
+    def has_edits(self) -> bool:
+        return bool(self._edits)
+
+    def _sorted_edits(self) -> List[Tuple[int, int, str, int]]:
+        # Les insertions au meme point gardent leur ordre d'enregistrement
+        return sorted(self._edits, key=lambda e: (e[0], e[1], e[3]))
+
+    def check_conflicts(self) -> None:
+        """Leve EditConflictError si deux modifications se chevauchent."""
+        edits = self._sorted_edits()
+        for previous, current in zip(edits, edits[1:]):
+            if current[0] < previous[1]:
+                raise EditConflictError(
+                    f"Modifications en conflit sur les positions {previous[:2]} et {current[:2]}"
+                )
+
+    def apply(self) -> str:
+        """Retourne le code avec toutes les modifications appliquees (une seule passe)."""
+        if not self._edits:
+            return self.source
+        parts = []
+        position = 0
+        for start, end, text, _ in self._sorted_edits():
+            if start < position:
+                raise EditConflictError(
+                    f"Modifications en conflit autour de la position {start} (fin precedente "
+                    f"{position})"
+                )
+            parts.append(self.source[position:start])
+            parts.append(text)
+            position = end
+        parts.append(self.source[position:])
+        return "".join(parts)
@@ -5,15 +5,73 @@ File Creator - Generateur de fichiers Python
 
 import sys
 from pathlib import Path
+from string import Template
 from typing import Any, Dict, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from core.plugins.base.base_transformer import BaseTransformer
 
+# Modeles compiles une fois a l'import (rendu par substitution, sans concatenation)
+BASIC_TEMPLATE = Template(
+    """#!/usr/bin/env python3
+\"\"\"
+Module: $module_name
+Author: $author
+\"\"\"
+
+
+def main():
+    \"\"\"Fonction principale.\"\"\"
+    print("Hello from $module_name")
+
+
+if __name__ == "__main__":
+    main()"""
+)
+
+CLASS_TEMPLATE = Template(
+    """#!/usr/bin/env python3
+\"\"\"
+Module: $module_name
+Author: $author
+\"\"\"
+
+from typing import Any, Dict
+
+
+class $class_name:
+    \"\"\"$class_name implementation.\"\"\"
+
+    def __init__(self):
+        self.data = {}
+
+    def process(self, input_data: Any) -> Dict:
+        return {"status": "processed", "data": input_data}
+
+
+def main():
+    instance = $class_name()
+    result = instance.process("test")
+    print(f"Result: {result}")
+
+
+if __name__ == "__main__":
+    main()"""
+)
+
 
 class FileCreator(BaseTransformer):
     """Generateur pour creer de nouveaux fichiers Python."""
 
+    reusable = True
+    defaults = {
+        "template": "basic",
+        "module_name": "new_module",
+        "class_name": "MyClass",
+        "author": "AST Tools",
+    }
+    filename_template = Template("${module_name}.py")
+
     def __init__(self):
         super().__init__()
         self.name = "File Creator"
@@ -37,70 +95,27 @@ class FileCreator(BaseTransformer):
         else:
             raise ValueError("FileCreator ne modifie pas de fichiers existants")
 
+    def render(self, params: Dict[str, Any]) -> str:
+        """Contenu d'un fichier pour une instruction generator (voir generation.py)."""
+        return self.generate_new_file(params)
+
     def generate_new_file(self, params: Optional[Dict[str, Any]] = None) -> str:
         """Genere un nouveau fichier Python."""
-        if params is None:
-            params = {}
-
-        template_type = params.get("template", "basic")
-        module_name = params.get("module_name", "new_module")
-        author = params.get("author", "AST Tools")
+        params = {**self.defaults, **(params or {})}
 
-        if template_type == "class":
-            class_name = params.get("class_name", "MyClass")
-            return self._generate_class_code(module_name, class_name, author)
+        if params["template"] == "class":
+            return self._generate_class_code(
+                params["module_name"], params["class_name"], params["author"]
+            )
         else:
-            return self._generate_basic_code(module_name, author)
+            return self._generate_basic_code(params["module_name"], params["author"])
 
     def _generate_basic_code(self, module_name: str, author: str) -> str:
         """Genere code basique."""
-        lines = [
-            "#!/usr/bin/env python3",
-            '"""',
-            "Module: " + module_name,
-            "Author: " + author,
-            '"""',
-            "",
-            "",
-            "def main():",
-            '    """Fonction principale."""',
-            '    print("Hello from ' + module_name + '")',
-            "",
-            "",
-            'if __name__ == "__main__":',
-            "    main()",
-        ]
-        return "\n".join(lines)
+        return BASIC_TEMPLATE.substitute(module_name=module_name, author=author)
 
     def _generate_class_code(self, module_name: str, class_name: str, author: str) -> str:
         """Genere code avec classe."""
-        lines = [
-            "#!/usr/bin/env python3",
-            '"""',
-            "Module: " + module_name,
-            "Author: " + author,
-            '"""',
-            "",
-            "from typing import Any, Dict",
-            "",
-            "",
-            "class " + class_name + ":",
-            '    """' + class_name + ' implementation."""',
-            "",
-            "    def __init__(self):",
-            "        self.data = {}",
-            "",
-            "    def process(self, input_data: Any) -> Dict:",
-            '        return {"status": "processed", "data": input_data}',
-            "",
-            "",
-            "def main():",
-            "    instance = " + class_name + "()",
-            '    result = instance.process("test")',
-            '    print(f"Result: {result}")',
-            "",
-            "",
-            'if __name__ == "__main__":',
-            "    main()",
-        ]
-        return "\n".join(lines)
+        return CLASS_TEMPLATE.substitute(
+            module_name=module_name, class_name=class_name, author=author
+        )
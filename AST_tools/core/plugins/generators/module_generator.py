@@ -5,15 +5,63 @@ Module Generator - Genere des modules Python complets
 
 import sys
 from pathlib import Path
+from string import Template
 from typing import Any, Dict, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from core.plugins.base.base_transformer import BaseTransformer
 
+# Modele compile une fois a l'import (rendu par substitution, sans concatenation)
+SERVICE_TEMPLATE = Template(
+    """#!/usr/bin/env python3
+\"\"\"
+Service: $name
+Generated by AST Tools
+\"\"\"
+
+import logging
+from typing import Any, Dict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class $config_name:
+    \"\"\"Configuration for $name service.\"\"\"
+    host: str = "localhost"
+    port: int = 8080
+
+
+class $class_name:
+    \"\"\"Service implementation for $name.\"\"\"
+
+    def __init__(self, config: $config_name = None):
+        self.config = config or $config_name()
+        self._initialized = False
+
+    def initialize(self) -> bool:
+        \"\"\"Initialize the service.\"\"\"
+        self._initialized = True
+        logger.info("Service initialized")
+        return True
+
+    def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        \"\"\"Process incoming data.\"\"\"
+        if not self._initialized:
+            raise RuntimeError("Service not initialized")
+        return {"status": "success", "data": data}
+"""
+)
+
 
 class ModuleGenerator(BaseTransformer):
     """Generateur de modules Python complets."""
 
+    reusable = True
+    defaults = {"type": "service", "name": "new_service"}
+    filename_template = Template("${name}.py")
+
     def __init__(self):
         super().__init__()
         self.name = "Module Generator"
@@ -36,50 +84,17 @@ class ModuleGenerator(BaseTransformer):
             raise ValueError("ModuleGenerator cree de nouveaux fichiers uniquement")
         return self.generate_module()
 
+    def render(self, params: Dict[str, Any]) -> str:
+        """Contenu d'un fichier pour une instruction generator (voir generation.py)."""
+        return self.generate_module(params)
+
     def generate_module(self, params: Optional[Dict[str, Any]] = None) -> str:
         """Genere un module complet."""
-        if params is None:
-            params = {}
-
-        params.get("type", "service")
-        module_name = params.get("name", "new_service")
-
-        return self._generate_service(module_name, params)
+        params = {**self.defaults, **(params or {})}
+        return self._generate_service(params["name"], params)
 
     def _generate_service(self, name: str, params: Dict) -> str:
         """Genere un service."""
-        class_name = name.title() + "Service"
-        config_name = name.title() + "Config"
-
-        # Construction du template sans f-string problematique
-        template = "#!/usr/bin/env python3\n"
-        template += '"""\n'
-        template += f"Service: {name}\n"
-        template += "Generated by AST Tools\n"
-        template += '"""\n\n'
-        template += "import logging\n"
-        template += "from typing import Any, Dict\n"
-        template += "from dataclasses import dataclass\n\n"
-        template += "logger = logging.getLogger(__name__)\n\n\n"
-        template += "@dataclass\n"
-        template += f"class {config_name}:\n"
-        template += f'    """Configuration for {name} service."""\n'
-        template += '    host: str = "localhost"\n'
-        template += "    port: int = 8080\n\n\n"
-        template += f"class {class_name}:\n"
-        template += f'    """Service implementation for {name}."""\n\n'
-        template += f"    def __init__(self, config: {config_name} = None):\n"
-        template += f"        self.config = config or {config_name}()\n"
-        template += "        self._initialized = False\n\n"
-        template += "    def initialize(self) -> bool:\n"
-        template += '        """Initialize the service."""\n'
-        template += "        self._initialized = True\n"
-        template += '        logger.info("Service initialized")\n'
-        template += "        return True\n\n"
-        template += "    def process(self, data: Dict[str, Any]) -> Dict[str, Any]:\n"
-        template += '        """Process incoming data."""\n'
-        template += "        if not self._initialized:\n"
-        template += '            raise RuntimeError("Service not initialized")\n'
-        template += '        return {"status": "success", "data": data}\n'
-
-        return template
+        return SERVICE_TEMPLATE.substitute(
+            name=name, class_name=name.title() + "Service", config_name=name.title() + "Config"
+        )
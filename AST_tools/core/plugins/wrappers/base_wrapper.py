@@ -8,6 +8,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from core.plugins.base.base_transformer import BaseTransformer
+from core.subprocess_executor import get_executor
+from core.tool_probe import resolve_tool
 
 
 class BaseWrapper(BaseTransformer):
@@ -19,11 +21,74 @@ class BaseWrapper(BaseTransformer):
     avoir besoin de coder explicitement chaque option.
     """
 
+    # Les parametres sont passes a chaque appel : aucun etat entre deux fichiers
+    reusable = True
+
+    # Mode lot (transform_many) : l'outil accepte-t-il un repertoire en argument ?
+    # Sinon, la liste des fichiers est passee, par paquets de max_batch_files.
+    accepts_directory = False
+    max_batch_files = 200
+
+    # Streaming : l'outil lit le code sur stdin et ecrit le resultat sur stdout,
+    # sans fichier temporaire. stdin_path est l'argument qui remplace le chemin.
+    supports_stdin = False
+    stdin_path = "-"
+
+    # Delai maximal d'un appel (secondes), pour un fichier ou par tranche de
+    # files_per_timeout fichiers en mode lot ; surchargeable par `_timeout`
+    timeout = 60
+    files_per_timeout = 50
+
+    # Commandes d'aide analysees pour connaitre les options acceptees par l'outil
+    help_commands = (("--help",),)
+
     def __init__(self, tool_name):
         super().__init__()
         self.tool_name = tool_name
+        self.tool_info = None
+        self._tool_resolved = False
         self._setup_metadata()
 
+    def setup(self):
+        """Resout l'outil (chemin absolu, version, options) une fois pour l'instance."""
+        super().setup()
+        self._resolve_tool()
+
+    def _resolve_tool(self):
+        """Resolution via le cache de sondage (memoire puis disque)."""
+        if not self._tool_resolved:
+            self.tool_info = resolve_tool(self.tool_name, self.help_commands)
+            self._tool_resolved = True
+            if self.tool_info is None:
+                print(f"[WARNING] Outil '{self.tool_name}' introuvable dans le PATH")
+        return self.tool_info
+
+    def check_available(self):
+        """
+        Verifie que l'outil est installe.
+
+        Returns:
+            dict: informations de l'outil (chemin, version, options)
+
+        Raises:
+            ToolNotFoundError: si l'outil est introuvable
+        """
+        return resolve_tool(self.tool_name, self.help_commands, required=True)
+
+    def get_tool_info(self):
+        """Informations de l'outil resolu (None s'il est introuvable)."""
+        return self._resolve_tool()
+
+    def supports_flag(self, flag):
+        """Indique si l'outil accepte une option (ex: "--output-format")."""
+        info = self._resolve_tool()
+        return bool(info) and flag in info["flags"]
+
+    def _executable(self):
+        """Chemin absolu de l'outil (ou son nom s'il n'a pas pu etre resolu)."""
+        info = self._resolve_tool()
+        return info["path"] if info else self.tool_name
+
     def _setup_metadata(self):
         """Configure les metadonnees par defaut (peut etre surcharge)."""
         self.name = f"{self.tool_name.capitalize()} Wrapper"
@@ -56,6 +121,10 @@ class BaseWrapper(BaseTransformer):
         if params is None:
             params = {}
 
+        if self._can_stream(params):
+            return self._transform_stdin(code_source, params)
+
+        tmp_path = None
         try:
             # Creer un fichier temporaire avec le code source
             with tempfile.NamedTemporaryFile(
@@ -69,10 +138,10 @@ class BaseWrapper(BaseTransformer):
 
             print(f"[DEBUG] Commande {self.tool_name}: {' '.join(cmd)}")
 
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
+            result = self._run_tool(cmd, params)
 
             # Gerer les erreurs potentielles
-            if result.returncode != 0:
+            if self._is_failure(result.returncode):
                 if result.stderr:
                     print(f"[WARNING] {self.tool_name} stderr: {result.stderr}")
                 if self._should_return_original_on_error(params):
@@ -89,6 +158,52 @@ class BaseWrapper(BaseTransformer):
 
             return transformed_code
 
+        except subprocess.SubprocessError as e:
+            # Delai depasse compris : ne pas laisser le fichier temporaire
+            print(f"[ERROR] Erreur d'execution {self.tool_name}: {e}")
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
+            return code_source
+        except Exception as e:
+            print(f"[ERROR] Erreur inattendue {self.tool_name}: {e}")
+            return code_source
+
+    def _run_tool(self, cmd, params, input=None, n_files=1):
+        """
+        Lance l'outil via l'executeur partage (concurrence bornee).
+
+        Le delai vaut `_timeout` (parametre du plan) ou self.timeout, multiplie
+        pour un lot par le nombre de tranches de files_per_timeout fichiers.
+        """
+        timeout = params.get("_timeout", self.timeout)
+        if timeout and n_files > 1:
+            timeout *= -(-n_files // self.files_per_timeout)
+        return get_executor().run(cmd, input=input, timeout=timeout)
+
+    def _can_stream(self, params):
+        """
+        Indique si l'appel peut passer par stdin/stdout. Le parametre `_stdin`
+        du plan permet de forcer le passage par un fichier temporaire.
+        """
+        return self.supports_stdin and params.get("_stdin", True)
+
+    def _transform_stdin(self, code_source, params):
+        """Transmet le code a l'outil par un pipe et lit le resultat sur stdout."""
+        try:
+            cmd = self._build_command(self.stdin_path, params)
+
+            print(f"[DEBUG] Commande {self.tool_name} (stdin): {' '.join(cmd)}")
+
+            result = self._run_tool(cmd, params, input=code_source)
+
+            if self._is_failure(result.returncode):
+                if result.stderr:
+                    print(f"[WARNING] {self.tool_name} stderr: {result.stderr}")
+                print("[INFO] Retour du code original suite a l'erreur")
+                return code_source
+
+            return result.stdout
+
         except subprocess.SubprocessError as e:
             print(f"[ERROR] Erreur d'execution {self.tool_name}: {e}")
             return code_source
@@ -96,6 +211,96 @@ class BaseWrapper(BaseTransformer):
             print(f"[ERROR] Erreur inattendue {self.tool_name}: {e}")
             return code_source
 
+    def transform_many(self, sources, params=None):
+        """
+        Applique l'outil a plusieurs codes sources avec un seul appel.
+
+        Tous les codes sont ecrits dans un meme repertoire temporaire, l'outil
+        est lance une fois sur ce repertoire (ou sur la liste de ses fichiers)
+        et chaque resultat est relu a sa place. Si l'appel groupe echoue, les
+        codes du lot sont retraites un par un avec transform().
+
+        Args:
+            sources (list[str]): Les codes sources a transformer
+            params (dict): Les parametres a passer a l'outil
+
+        Returns:
+            list[str]: Les codes transformes, dans l'ordre de sources
+        """
+        sources = list(sources)
+        if params is None:
+            params = {}
+        if len(sources) <= 1:
+            return [self.transform(code, params) for code in sources]
+
+        if self.accepts_directory:
+            # L'outil parallelise lui-meme le parcours du repertoire
+            return self._transform_batch(sources, params)
+
+        # Sinon, des tranches lancees en parallele pour occuper tous les coeurs
+        executor = get_executor()
+        batch_size = min(max(1, self.max_batch_files), -(-len(sources) // executor.max_workers))
+        batches = [sources[i : i + batch_size] for i in range(0, len(sources), batch_size)]
+        results = []
+        for transformed in executor.map(
+            lambda batch: self._transform_batch(batch, params), batches
+        ):
+            results.extend(transformed)
+        return results
+
+    def _transform_batch(self, sources, params):
+        """Traite un lot de codes en un appel, avec repli fichier par fichier en cas d'echec."""
+        try:
+            with tempfile.TemporaryDirectory(prefix=f"ast_{self.tool_name}_") as tmp_dir:
+                paths = []
+                for i, code in enumerate(sources):
+                    path = Path(tmp_dir) / f"source_{i:05d}{self._get_file_suffix()}"
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(code)
+                    paths.append(path)
+
+                cmd = self._build_batch_command(tmp_dir, [str(p) for p in paths], params)
+                print(f"[DEBUG] Commande {self.tool_name} (lot de {len(sources)} fichiers)")
+
+                result = self._run_tool(cmd, params, n_files=len(sources))
+
+                if not self._is_failure(result.returncode):
+                    transformed = []
+                    for path, code in zip(paths, sources):
+                        try:
+                            with open(path, encoding="utf-8") as f:
+                                transformed.append(f.read())
+                        except OSError:
+                            transformed.append(self.transform(code, params))
+                    return transformed
+
+                if result.stderr:
+                    print(f"[WARNING] {self.tool_name} stderr: {result.stderr}")
+
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"[ERROR] Erreur d'execution {self.tool_name} en lot: {e}")
+
+        print("[INFO] Echec de l'appel groupe, traitement fichier par fichier")
+        return list(get_executor().map(lambda code: self.transform(code, params), sources))
+
+    def _build_batch_command(self, directory, file_paths, params):
+        """
+        Construit la commande d'un lot a partir de _build_command : le chemin
+        unique est remplace par le repertoire ou par la liste des fichiers.
+        """
+        placeholder = "<AST_TOOLS_BATCH>"
+        cmd = self._build_command(placeholder, params)
+        targets = [directory] if self.accepts_directory else file_paths
+        index = cmd.index(placeholder)
+        return cmd[:index] + targets + cmd[index + 1 :]
+
+    def _is_failure(self, returncode):
+        """
+        Indique si un code de retour de l'outil signale un echec
+        (peut etre surcharge pour les outils qui utilisent 1 comme information).
+        """
+        return returncode != 0
+
     def _build_command(self, file_path, params):
         """
         Construit la commande de facon totalement generique.
@@ -103,7 +308,7 @@ class BaseWrapper(BaseTransformer):
         Cette methode convertit automatiquement un dictionnaire de parametres
         en arguments de ligne de commande, en gerant intelligemment les types.
         """
-        cmd = [self.tool_name]
+        cmd = [self._executable()]
 
         # Gerer les sous-commandes (ex: ruff check, ruff format)
         if "command" in params:
@@ -28,7 +28,7 @@ class PyupgradeWrapper(BaseWrapper):
 
         Pyupgrade utilise des flags comme --py38-plus, --py39-plus, etc.
         """
-        cmd = [self.tool_name]
+        cmd = [self._executable()]
 
         # Gerer la version Python cible de maniere intelligente
         if "python_version" in params:
@@ -62,3 +62,7 @@ class PyupgradeWrapper(BaseWrapper):
         cmd.append(file_path)
 
         return cmd
+
+    def _is_failure(self, returncode):
+        """Pyupgrade retourne 1 lorsqu'il a reecrit un fichier : ce n'est pas un echec."""
+        return returncode not in (0, 1)
@@ -16,6 +16,18 @@ class RuffWrapper(BaseWrapper):
     Les parametres sont passes directement depuis le JSON.
     """
 
+    # Ruff parcourt les repertoires : un lot = un seul appel sur le dossier
+    accepts_directory = True
+
+    # `ruff format -` et `ruff check --fix -` ecrivent le code sur stdout
+    supports_stdin = True
+
+    # Les options utiles sont celles des sous-commandes
+    help_commands = (("check", "--help"), ("format", "--help"))
+
+    # Options qui remplacent le code par un rapport sur stdout
+    REPORT_OPTIONS = ("diff", "check", "statistics", "show_files", "show_settings", "watch")
+
     def __init__(self):
         super().__init__(tool_name="ruff")
         self.name = "Ruff Wrapper (Generic)"
@@ -31,10 +43,30 @@ class RuffWrapper(BaseWrapper):
         - Les sous-commandes (check, format) viennent en premier
         - Certaines options sont specifiques a certaines sous-commandes
         """
-        # Utiliser la methode parent qui gere deja tout ca
-        cmd = super()._build_command(file_path, params)
+        # Ruff attend les listes separees par des virgules (--select E,F) : sous
+        # la forme generique --select E F, les valeurs suivantes seraient lues
+        # comme des chemins
+        params = {
+            key: ",".join(str(v) for v in value)
+            if isinstance(value, list) and key != "positional_args"
+            else value
+            for key, value in params.items()
+        }
 
-        # Ajustements specifiques a Ruff si necessaire
-        # (actuellement, la methode parent gere deja tout correctement)
+        # Utiliser la methode parent qui gere deja tout le reste
+        return super()._build_command(file_path, params)
 
-        return cmd
+    def _can_stream(self, params):
+        """Le streaming n'est possible que si Ruff renvoie du code sur stdout."""
+        if not super()._can_stream(params):
+            return False
+        command = params.get("command")
+        produces_code = command == "format" or (command == "check" and params.get("fix"))
+        return bool(produces_code) and not any(params.get(o) for o in self.REPORT_OPTIONS)
+
+    def _is_failure(self, returncode):
+        """
+        Ruff retourne 1 quand des violations subsistent (les corrections
+        demandees sont appliquees quand meme) ; seul 2 signale un echec.
+        """
+        return returncode >= 2
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Index persistant des symboles d'un projet
+=========================================
+
+L'AnalyseurCode analyse un code a la fois et oublie tout au reset(). Pour un
+projet entier, ProjectIndex enregistre dans une base SQLite sur disque les
+fonctions, classes, imports et appels au print builtin de chaque fichier,
+avec leur ligne :
+
+- l'analyse est faite en parallele (un processus par job) avec la meme table
+  des symboles que les artisans (core/symbol_index.py) ;
+- la mise a jour est incrementale : un fichier dont la taille et la date de
+  modification n'ont pas change n'est pas relu, un fichier relu dont
+  l'empreinte du contenu est inchangee n'est pas re-analyse, les fichiers
+  supprimes sont retires de l'index ;
+- les noms sont indexes en plein texte (FTS5) si SQLite le permet, sinon les
+  recherches se font par LIKE.
+
+Usage:
+    index = ProjectIndex("mon_projet/")
+    index.update()
+    index.find(kind="print")            # tous les appels a print
+    index.find(kind="class")            # toutes les classes
+    index.search("Service")             # symboles dont le nom contient un mot
+"""
+
+import ast
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.cache_utils import get_cache_dir
+from core.symbol_index import SymbolIndex, content_key
+
+INDEX_SUBDIR = "project_index"
+
+# Dossiers jamais parcourus
+EXCLUDED_DIRS = {
+    ".git",
+    ".hg",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".ast_cache",
+    ".mypy_cache",
+    ".ruff_cache",
+    "node_modules",
+    "build",
+    "dist",
+}
+
+# En dessous, l'analyse reste dans le processus courant (cout de demarrage du pool)
+PARALLEL_THRESHOLD = 32
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    scope TEXT NOT NULL DEFAULT '',
+    detail TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path);
+CREATE INDEX IF NOT EXISTS symbols_kind_name ON symbols (kind, name);
+"""
+
+# (kind, name, line, scope, detail)
+Symbol = Tuple[str, str, int, str, str]
+
+
+def extract_symbols(code: str) -> List[Symbol]:
+    """Symboles d'un code : fonctions, classes, imports et appels au print builtin."""
+    index = SymbolIndex(ast.parse(code))
+    symbols = []
+    for binding in index.definitions:
+        scope = binding.scope.name if binding.scope is not index.module else ""
+        symbols.append((binding.kind, binding.name, binding.lineno, scope, ""))
+    for binding in index.imports:
+        scope = binding.scope.name if binding.scope is not index.module else ""
+        detail = "" if binding.used else "unused"
+        symbols.append(("import", binding.name, binding.lineno, scope, detail))
+    for call in index.calls.get("print", []):
+        if index.is_builtin_use(call.func):
+            symbols.append(("print", "print", call.lineno, "", ""))
+    return symbols
+
+
+def _analyse_file(task: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Analyse un fichier (execute dans un processus de travail).
+
+    Le fichier n'est pas analyse si son empreinte est celle deja indexee.
+    """
+    path, known_hash = task
+    result = {"path": path, "hash": "", "size": 0, "mtime": 0.0, "symbols": None, "error": None}
+    try:
+        stat = os.stat(path)
+        with open(path, encoding="utf-8") as f:
+            code = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        result["error"] = f"Lecture impossible: {e}"
+        return result
+    result.update(hash=content_key(code), size=stat.st_size, mtime=stat.st_mtime)
+    if result["hash"] == known_hash:
+        return result
+    try:
+        result["symbols"] = extract_symbols(code)
+    except (SyntaxError, ValueError) as e:
+        result["symbols"] = []
+        result["error"] = f"Analyse impossible: {e}"
+    return result
+
+
+class ProjectIndex:
+    """Base SQLite des symboles d'une arborescence, mise a jour de facon incrementale."""
+
+    def __init__(self, root, db_path=None, jobs: Optional[int] = None):
+        self.root = Path(root).resolve()
+        if db_path is None:
+            digest = hashlib.sha1(str(self.root).encode("utf-8")).hexdigest()[:16]
+            db_path = get_cache_dir(INDEX_SUBDIR) / f"{self.root.name}_{digest}.sqlite"
+        self.db_path = Path(db_path)
+        self.jobs = jobs or os.cpu_count() or 1
+        self._connection = None
+        self.has_fts = False
+
+    # --- Base ---
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path))
+            connection.row_factory = sqlite3.Row
+            connection.executescript(_SCHEMA)
+            version = connection.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            if version is not None and int(version[0]) != SCHEMA_VERSION:
+                # Format different : l'index est reconstruit
+                connection.executescript(
+                    "DROP TABLE IF EXISTS symbols_fts; DROP TABLE IF EXISTS symbols; "
+                    "DROP TABLE IF EXISTS files;" + _SCHEMA
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+            )
+            try:
+                # Trigrammes : recherche de sous-chaines ("Serv" dans "BillingService")
+                connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts "
+                    "USING fts5(name, tokenize='trigram')"
+                )
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite sans FTS5 (ou trop ancien pour les trigrammes) : recherches par LIKE
+                self.has_fts = False
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # --- Mise a jour ---
+
+    def iter_files(self) -> Iterator[Path]:
+        """Fichiers Python de l'arborescence (dossiers exclus ignores), dans un ordre stable."""
+        for root, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield Path(root) / name
+
+    def update(self) -> Dict[str, int]:
+        """
+        Met l'index a jour avec l'etat du disque.
+
+        Returns:
+            Statistiques : fichiers parcourus, analyses, inchanges, retires, en erreur
+        """
+        connection = self.connection
+        known = {
+            row["path"]: (row["hash"], row["size"], row["mtime"])
+            for row in connection.execute("SELECT path, hash, size, mtime FROM files")
+        }
+        stats = {"files": 0, "analysed": 0, "unchanged": 0, "removed": 0, "errors": 0}
+
+        tasks = []
+        seen = set()
+        for path in self.iter_files():
+            key = str(path)
+            seen.add(key)
+            stats["files"] += 1
+            previous = known.get(key)
+            if previous is not None:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if (stat.st_size, stat.st_mtime) == previous[1:]:
+                    stats["unchanged"] += 1
+                    continue
+            tasks.append((key, previous[0] if previous else None))
+
+        with connection:
+            for result in self._analyse(tasks):
+                if result["symbols"] is None and result["error"] is None:
+                    # Contenu identique (date seule modifiee)
+                    stats["unchanged"] += 1
+                    connection.execute(
+                        "UPDATE files SET size = ?, mtime = ? WHERE path = ?",
+                        (result["size"], result["mtime"], result["path"]),
+                    )
+                    continue
+                stats["analysed"] += 1
+                stats["errors"] += result["error"] is not None
+                self._store(result)
+
+            removed = [path for path in known if path not in seen]
+            for path in removed:
+                self._delete_symbols(path)
+                connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            stats["removed"] = len(removed)
+        return stats
+
+    def _analyse(self, tasks: List[Tuple[str, Optional[str]]]) -> Iterator[Dict[str, Any]]:
+        if self.jobs <= 1 or len(tasks) < PARALLEL_THRESHOLD:
+            yield from map(_analyse_file, tasks)
+            return
+        chunksize = max(1, len(tasks) // (self.jobs * 4))
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            yield from executor.map(_analyse_file, tasks, chunksize=chunksize)
+
+    def _delete_symbols(self, path: str) -> None:
+        if self.has_fts:
+            self.connection.execute(
+                "DELETE FROM symbols_fts WHERE rowid IN (SELECT id FROM symbols WHERE path = ?)",
+                (path,),
+            )
+        self.connection.execute("DELETE FROM symbols WHERE path = ?", (path,))
+
+    def _store(self, result: Dict[str, Any]) -> None:
+        """Remplace les symboles d'un fichier analyse."""
+        connection = self.connection
+        path = result["path"]
+        self._delete_symbols(path)
+        if result["symbols"] is None:
+            # Fichier illisible : retire de l'index, retente au prochain passage
+            connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+            (path, result["hash"], result["size"], result["mtime"], result["error"]),
+        )
+        for kind, name, line, scope, detail in result["symbols"]:
+            cursor = connection.execute(
+                "INSERT INTO symbols (path, kind, name, line, scope, detail) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, kind, name, line, scope, detail),
+            )
+            if self.has_fts:
+                connection.execute(
+                    "INSERT INTO symbols_fts (rowid, name) VALUES (?, ?)", (cursor.lastrowid, name)
+                )
+
+    # --- Requetes ---
+
+    def find(
+        self,
+        kind: Optional[str] = None,
+        name: Optional[str] = None,
+        path: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Symboles filtres par type (function, class, import, print), nom exact et fichier."""
+        clauses, values = [], []
+        for column, value in (("kind", kind), ("name", name), ("path", path)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                values.append(str(value))
+        return self._select(clauses, values, limit)
+
+    def search(self, text: str, kind: Optional[str] = None, limit: Optional[int] = 100):
+        """
+        Symboles dont le nom contient chacun des mots de `text` (sans tenir
+        compte de la casse). Les mots de 3 caracteres ou plus passent par
+        l'index plein texte s'il existe, les autres par LIKE.
+        """
+        clauses, values = [], []
+        terms = [term for term in text.replace('"', " ").split() if term]
+        if not terms:
+            return []
+        indexed = [term for term in terms if self.has_fts and len(term) >= 3]
+        if indexed:
+            query = " AND ".join(f'"{term}"' for term in indexed)
+            clauses.append("id IN (SELECT rowid FROM symbols_fts WHERE name MATCH ?)")
+            values.append(query)
+        for term in terms:
+            if term in indexed:
+                continue
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            values.append(f"%{escaped}%")
+        if kind is not None:
+            clauses.append("kind = ?")
+            values.append(kind)
+        return self._select(clauses, values, limit)
+
+    def _select(self, clauses, values, limit) -> List[Dict[str, Any]]:
+        sql = "SELECT path, kind, name, line, scope, detail FROM symbols"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY path, line"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.connection.execute(sql, values)]
+
+    def counts(self) -> Dict[str, int]:
+        """Nombre de symboles par type, et de fichiers indexes."""
+        counts = {
+            row["kind"]: row["total"]
+            for row in self.connection.execute(
+                "SELECT kind, COUNT(*) AS total FROM symbols GROUP BY kind"
+            )
+        }
+        counts["files"] = self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return counts
+
+    def errors(self) -> List[Dict[str, str]]:
+        """Fichiers indexes dont l'analyse a echoue."""
+        return [
+            dict(row)
+            for row in self.connection.execute(
+                "SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path"
+            )
+        ]
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Moteur de remplacement multi-motifs (instruction remplacement_simple)
+=====================================================================
+
+Une instruction remplacement_simple peut porter des centaines de couples
+(ancien, nouveau) ; les appliquer un par un avec str.replace ou re.sub
+parcourt le fichier autant de fois qu'il y a de motifs. MultiReplacer les
+compile en une seule expression et remplace tout en un parcours :
+
+- les motifs litteraux sont ranges dans un arbre de prefixes (trie) traduit
+  en expression reguliere : a chaque position, le cout depend de la longueur
+  du motif et non du nombre de motifs ; le plus long motif l'emporte (les
+  motifs "word", limites a des mots entiers, sont essayes en premier) ;
+- les motifs regex sont ajoutes en alternatives, dans l'ordre du plan, apres
+  les litteraux (leur cout reste proportionnel a leur nombre) ; leurs groupes
+  sont renommes par regle pour que les references numerotees (\\1 dans le
+  motif ou dans le remplacement) restent celles de la regle ;
+- avec code_only, les chaines et commentaires sont laisses intacts : seules
+  les portions de code sont parcourues.
+
+Parametres d'une instruction :
+
+    {
+        "replacements": [
+            {"old": "old_api.fetch", "new": "new_api.get"},
+            {"old": "Client", "new": "HttpClient", "word": true},
+            {"old": "v(\\\\d+)_", "new": "version\\\\1_", "regex": true}
+        ],
+        "code_only": true
+    }
+
+Les remplacements ne se chevauchent pas et ne sont pas reappliques au texte
+produit (un seul parcours de la source d'origine).
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.plugins.base.source_buffer import SourceBuffer
+
+REPLACEMENTS_PARAM = "replacements"
+CODE_ONLY_PARAM = "code_only"
+
+# Un mot ne commence ni ne finit au milieu d'un identifiant (comme les tokens du prefiltre)
+_WORD_BEFORE = r"(?<!\w)"
+_WORD_AFTER = r"(?!\w)"
+
+_RULE_KEYS = {"old", "new", "regex", "word"}
+
+# Commentaire ou litteral chaine (prefixe r/b/u/f compris, f-strings entieres).
+# Un seul parcours lineaire, plus rapide que tokenize et tolerant au code invalide :
+# une chaine non terminee est traitee comme du code.
+_STRING_OR_COMMENT = re.compile(
+    r"""
+    \#[^\r\n]*
+    | (?:(?<!\w)[rRbBuUfF]{1,2})?
+      (?: '''(?:[^'\\]|\\.|'(?!''))*'''
+        | \"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"
+        | '(?:[^'\\\r\n]|\\.)*'
+        | "(?:[^"\\\r\n]|\\.)*"
+      )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+_DIGITS = "0123456789"
+_OCTDIGITS = "01234567"
+
+
+def _numbered_reference(text: str, i: int) -> Tuple[Optional[int], int]:
+    """
+    Reference numerotee a text[i] (le caractere qui suit l'antislash), selon
+    les regles de re : (numero, fin), ou (None, fin) pour un echappement octal.
+    """
+    end = i + 1
+    if end < len(text) and text[end] in _DIGITS:
+        end += 1
+        if text[i] in _OCTDIGITS and text[i + 1] in _OCTDIGITS:
+            if end < len(text) and text[end] in _OCTDIGITS:
+                return None, end + 1
+    return int(text[i:end]), end
+
+
+def _name_groups(pattern: str, prefix: str) -> Tuple[str, Dict[int, str]]:
+    """
+    Nomme les groupes capturants d'un motif (prefix + numero) et remplace les
+    references numerotees (\\1, (?(1)...)) par des references nommees.
+
+    Returns:
+        (motif reecrit, nom de chaque groupe par numero)
+    """
+    # Un groupe n'est reference qu'apres son ouverture : un seul passage suffit
+    names: Dict[int, str] = {}
+    pieces = []
+    in_class = False
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        end = i + 1
+        if char == "\\":
+            end = i + 2
+            if not in_class and pattern[i + 1 : i + 2] in tuple("123456789"):
+                number, end = _numbered_reference(pattern, i + 1)
+                if number is not None:
+                    if number not in names:
+                        raise re.error(f"invalid group reference {number}")
+                    pieces.append(f"(?P={names[number]})")
+                    i = end
+                    continue
+            pieces.append(pattern[i:end])
+        elif in_class:
+            in_class = char != "]"
+            pieces.append(char)
+        elif char == "[":
+            # "]" en tete de classe ("[]a]", "[^]a]") est un caractere ordinaire
+            if pattern.startswith("^", end):
+                end += 1
+            if pattern.startswith("]", end):
+                end += 1
+            in_class = True
+            pieces.append(pattern[i:end])
+        elif pattern.startswith("(?(", i):
+            # Condition "(?(1)...)" : la parenthese interne n'est pas un groupe
+            close = pattern.find(")", i)
+            reference = pattern[i + 3 : close]
+            if reference.isdecimal() and int(reference) in names:
+                pieces.append(f"(?({names[int(reference)]})")
+                end = close + 1
+            else:
+                pieces.append("(?(")
+                end = i + 3
+        elif char == "(" and not pattern.startswith("?", end):
+            names[len(names) + 1] = f"{prefix}{len(names) + 1}"
+            pieces.append(f"(?P<{names[len(names)]}>")
+        else:
+            if pattern.startswith("(?P<", i):
+                names[len(names) + 1] = pattern[i + 4 : pattern.find(">", i)]
+            pieces.append(char)
+        i = end
+    return "".join(pieces), names
+
+
+def _name_template(template: str, names: Dict[int, str]) -> str:
+    """Remplace les references numerotees d'un modele (\\1, \\g<1>) par des noms."""
+    pieces = []
+    i, n = 0, len(template)
+    while i < n:
+        char = template[i]
+        if char != "\\" or i + 1 == n:
+            pieces.append(char)
+            i += 1
+            continue
+        number, end = None, i + 2
+        if template[i + 1] in "123456789":
+            number, end = _numbered_reference(template, i + 1)
+        elif template.startswith("g<", i + 1) and template.find(">", i) != -1:
+            end = template.find(">", i) + 1
+            reference = template[i + 3 : end - 1]
+            number = int(reference) if reference.isdecimal() else None
+        if number is None:
+            pieces.append(template[i:end])
+        elif number in names:
+            pieces.append(f"\\g<{names[number]}>")
+        else:
+            raise re.error(f"invalid group reference {number}")
+        i = end
+    return "".join(pieces)
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Expression reguliere reconnaissant un ensemble de mots, factorisee par
+    prefixes : "foo", "foobar", "fox" -> fo(?:o(?:bar)?|x).
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        alternation = "|".join(branches)
+        # Quantificateur gourmand : la branche la plus longue est essayee d'abord
+        return f"(?:{alternation})?" if terminal else f"(?:{alternation})"
+
+    return build(trie)
+
+
+class MultiReplacer:
+    """
+    Ensemble de remplacements compile en une seule expression reguliere.
+
+    Usage:
+        replacer = MultiReplacer([{"old": "a", "new": "b"}], code_only=True)
+        code, count = replacer.replace(code)
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], code_only: bool = False):
+        self.code_only = code_only
+        self.literals: Dict[str, str] = {}
+        self.word_literals: Dict[str, str] = {}
+        self.regex_rules: List[Tuple[re.Pattern, str]] = []
+        named_rules: List[Tuple[str, str]] = []
+
+        for index, rule in enumerate(rules):
+            if not isinstance(rule, dict) or not isinstance(rule.get("old"), str):
+                raise ValueError(f"Remplacement {index}: objet avec une cle 'old' attendu")
+            unknown = set(rule) - _RULE_KEYS
+            if unknown:
+                raise ValueError(f"Remplacement {index}: cle(s) inconnue(s) {sorted(unknown)}")
+            old, new = rule["old"], rule.get("new", "")
+            if not old or not isinstance(new, str):
+                raise ValueError(f"Remplacement {index}: 'old' vide ou 'new' invalide")
+            if rule.get("regex"):
+                pattern = f"{_WORD_BEFORE}(?:{old}){_WORD_AFTER}" if rule.get("word") else old
+                try:
+                    compiled = re.compile(pattern)
+                    # Groupes nommes par regle : la numerotation ne depend plus de la position
+                    # de la regle dans l'expression combinee
+                    prefix = f"_r{index}_"
+                    named, names = _name_groups(pattern, prefix)
+                    names[0] = f"{prefix}0"
+                    if len(names) != compiled.groups + 1:
+                        raise re.error("groupes non reconnus")
+                    template = _name_template(new, names)
+                except re.error as e:
+                    raise ValueError(f"Remplacement {index}: regex invalide ({e})") from e
+                self.regex_rules.append((compiled, new))
+                named_rules.append((f"(?P<{names[0]}>{named})", template))
+            else:
+                target = self.word_literals if rule.get("word") else self.literals
+                # Premier couple du plan retenu pour un meme motif
+                target.setdefault(old, new)
+
+        # Groupe englobant de chaque alternative -> table des litteraux ou regle regex
+        alternatives = []
+        self._rules_by_group: Dict[int, Any] = {}
+        group = 0
+        for words, word_only in ((self.word_literals, True), (self.literals, False)):
+            if words:
+                pattern = _trie_pattern(list(words))
+                if word_only:
+                    pattern = f"{_WORD_BEFORE}(?:{pattern}){_WORD_AFTER}"
+                alternatives.append(f"({pattern})")
+                group += 1
+                self._rules_by_group[group] = words
+        for (compiled, _), (named, template) in zip(self.regex_rules, named_rules):
+            alternatives.append(named)
+            group += 1
+            self._rules_by_group[group] = template
+            group += compiled.groups
+        try:
+            self.pattern: Optional[re.Pattern] = (
+                re.compile("|".join(alternatives)) if alternatives else None
+            )
+        except re.error as e:
+            # Noms de groupes repetes d'une regle a l'autre, drapeaux en ligne...
+            raise ValueError(f"Remplacements incompatibles entre eux ({e})") from e
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "MultiReplacer":
+        """Construit le moteur depuis les parametres d'une instruction remplacement_simple."""
+        rules = params.get(REPLACEMENTS_PARAM)
+        if not isinstance(rules, list):
+            raise ValueError(f"'{REPLACEMENTS_PARAM}' doit etre une liste de remplacements")
+        return cls(rules, code_only=bool(params.get(CODE_ONLY_PARAM, False)))
+
+    def _replacement(self, match: re.Match) -> str:
+        # lastindex designe le groupe englobant : il se ferme apres ses sous-groupes
+        rule = self._rules_by_group[match.lastindex]
+        if isinstance(rule, dict):
+            return rule[match.group()]
+        # Modele aux references nommees : developpe sur l'etendue exacte de la correspondance
+        return match.expand(rule)
+
+    def replace(self, source: str) -> Tuple[str, int]:
+        """Retourne (code remplace, nombre de remplacements)."""
+        if self.pattern is None:
+            return source, 0
+        buffer = SourceBuffer(source)
+        segments = code_segments(source) if self.code_only else [(0, len(source))]
+        count = 0
+        for start, end in segments:
+            for match in self.pattern.finditer(source, start, end):
+                if match.start() == match.end():
+                    continue
+                buffer.replace_span(match.start(), match.end(), self._replacement(match))
+                count += 1
+        return buffer.apply(), count
+
+
+def code_segments(source: str) -> List[Tuple[int, int]]:
+    """Portions (debut, fin) de la source qui ne sont ni des chaines ni des commentaires."""
+    segments = []
+    position = 0
+    for match in _STRING_OR_COMMENT.finditer(source):
+        if match.start() > position:
+            segments.append((position, match.start()))
+        position = match.end()
+    if position < len(source):
+        segments.append((position, len(source)))
+    return segments
+
+
+@lru_cache(maxsize=32)
+def _compiled(key: str) -> MultiReplacer:
+    return MultiReplacer.from_params(json.loads(key))
+
+
+def get_replacer(params: Dict[str, Any]) -> MultiReplacer:
+    """MultiReplacer d'une instruction, compile une fois par jeu de parametres."""
+    try:
+        key = json.dumps(params, sort_keys=True)
+    except (TypeError, ValueError):
+        return MultiReplacer.from_params(params)
+    return _compiled(key)
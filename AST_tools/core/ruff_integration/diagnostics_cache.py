@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Cache incremental des diagnostics Ruff
+======================================
+
+Les diagnostics d'un fichier ne dependent que de son contenu, de la version de
+Ruff, des options passees et des fichiers de configuration qui le concernent.
+Chaque entree est donc indexee par le chemin du fichier et validee par une
+empreinte de ces elements : un fichier inchange est servi depuis le cache,
+seuls les fichiers modifies sont renvoyes a Ruff. La cle calculee par lookup()
+pour un fichier a analyser est reprise par store() : les diagnostics sont
+ranges sous l'empreinte du contenu lu avant l'appel a Ruff (une modification
+pendant l'analyse n'est pas masquee) et chaque fichier n'est hache qu'une fois.
+
+Les entrees sont rangees dans une base SQLite (une ligne par fichier) : une
+recherche ne lit que les fichiers demandes et save() n'ecrit que les entrees
+enregistrees depuis la derniere sauvegarde, quelle que soit la taille du
+projet.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.cache_utils import get_cache_dir
+
+DIAGNOSTICS_CACHE_FILENAME = "diagnostics.sqlite"
+DIAGNOSTICS_CACHE_VERSION = 2
+
+# Nombre de chemins par requete "IN (...)" (limite de parametres SQLite)
+LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    diagnostics TEXT NOT NULL
+);
+"""
+
+# Fichiers de configuration lus par Ruff (un changement invalide les entrees)
+RUFF_CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml")
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class DiagnosticsCache:
+    """
+    Cache disque des diagnostics `ruff check`, indexe par chemin de fichier.
+
+    Usage:
+        cache = DiagnosticsCache(ruff_version, extra_args)
+        hits, misses = cache.lookup(fichiers)
+        ...  # ruff check sur misses uniquement
+        cache.store(fichier, diagnostics)  # cle calculee par lookup
+        cache.save()
+    """
+
+    def __init__(
+        self,
+        ruff_version: Optional[str],
+        extra_args: Sequence[str] = (),
+        path: Optional[Path] = None,
+    ):
+        self.path = path or get_cache_dir("ruff") / DIAGNOSTICS_CACHE_FILENAME
+        self.settings_key = _sha1("\0".join([ruff_version or "", *extra_args]).encode("utf-8"))
+        self.hits = 0
+        self.misses = 0
+        self._config_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Entrees enregistrees depuis la derniere sauvegarde : chemin -> (cle, diagnostics)
+        self._pending: Dict[str, Tuple[str, List[Dict]]] = {}
+        # Cles des fichiers a analyser calculees par lookup : chemin -> cle
+        self._miss_keys: Dict[str, str] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """Base du cache (None si elle ne peut pas etre ouverte : cache inactif)."""
+        if self._connection is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # Utilisee depuis le thread du worker qui a cree le cache (acces sous verrou)
+                connection = sqlite3.connect(str(self.path), check_same_thread=False)
+                connection.executescript(_SCHEMA)
+                version = connection.execute(
+                    "SELECT value FROM meta WHERE key = 'version'"
+                ).fetchone()
+                if version is None or version[0] != str(DIAGNOSTICS_CACHE_VERSION):
+                    connection.execute("DELETE FROM entries")
+                    connection.execute(
+                        "INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                        (str(DIAGNOSTICS_CACHE_VERSION),),
+                    )
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"[WARNING] Cache des diagnostics indisponible ({self.path}): {e}")
+                return None
+            self._connection = connection
+        return self._connection
+
+    def _stored(self, paths: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Entrees sur disque des chemins demandes : chemin -> (cle, diagnostics JSON)."""
+        connection = self.connection
+        if connection is None or not paths:
+            return {}
+        found = {}
+        for start in range(0, len(paths), LOOKUP_CHUNK):
+            chunk = paths[start : start + LOOKUP_CHUNK]
+            rows = connection.execute(
+                "SELECT path, key, diagnostics FROM entries "
+                f"WHERE path IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update((path, (key, diagnostics)) for path, key, diagnostics in rows)
+        return found
+
+    def _config_hash(self, directory: str) -> str:
+        """Empreinte des fichiers de configuration du repertoire et de ses parents."""
+        cached = self._config_hashes.get(directory)
+        if cached is not None:
+            return cached
+
+        parent = os.path.dirname(directory)
+        digest = hashlib.sha1(self._config_hash(parent).encode() if parent != directory else b"")
+        for name in RUFF_CONFIG_FILES:
+            try:
+                with open(os.path.join(directory, name), "rb") as f:
+                    digest.update(name.encode() + b"\0" + f.read())
+            except OSError:
+                continue
+        self._config_hashes[directory] = digest.hexdigest()
+        return self._config_hashes[directory]
+
+    def file_key(self, file: str) -> Optional[str]:
+        """Cle d'un fichier (contenu + reglages + configuration), None s'il est illisible."""
+        try:
+            with open(file, "rb") as f:
+                content_hash = _sha1(f.read())
+        except OSError:
+            return None
+        directory = os.path.dirname(os.path.abspath(file))
+        return _sha1(f"{content_hash}|{self.settings_key}|{self._config_hash(directory)}".encode())
+
+    def lookup(self, files: Sequence[str]) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        """
+        Separe les fichiers servis par le cache de ceux a analyser.
+
+        Returns:
+            ({fichier: diagnostics} pour les entrees valides, [fichiers a analyser])
+        """
+        hits = {}
+        misses = []
+        miss_keys = {}
+        paths = [os.path.abspath(file) for file in files]
+        with self._lock:
+            pending = dict(self._pending)
+            stored = self._stored([path for path in paths if path not in pending])
+        for file, path in zip(files, paths):
+            key = self.file_key(file)
+            if path in pending and pending[path][0] == key:
+                hits[file] = pending[path][1]
+            elif path not in pending and path in stored and stored[path][0] == key:
+                hits[file] = json.loads(stored[path][1])
+            else:
+                misses.append(file)
+                if key is not None:
+                    miss_keys[path] = key
+        with self._lock:
+            self._miss_keys.update(miss_keys)
+        self.hits += len(hits)
+        self.misses += len(misses)
+        return hits, misses
+
+    def store(self, file: str, diagnostics: List[Dict], key: Optional[str] = None) -> None:
+        """
+        Enregistre les diagnostics d'un fichier.
+
+        La cle est `key` si elle est donnee, sinon celle calculee par lookup()
+        (contenu envoye a Ruff), a defaut celle du contenu actuel.
+        """
+        path = os.path.abspath(file)
+        with self._lock:
+            remembered = self._miss_keys.pop(path, None)
+        key = key or remembered or self.file_key(file)
+        if key is None:
+            return
+        with self._lock:
+            self._pending[path] = (key, diagnostics)
+
+    def hit_rate(self) -> float:
+        """Proportion de fichiers servis par le cache depuis la creation."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def save(self) -> bool:
+        """Ecrit sur disque les entrees enregistrees depuis la derniere sauvegarde."""
+        with self._lock:
+            if not self._pending:
+                return True
+            connection = self.connection
+            if connection is None:
+                return False
+            rows = [
+                (path, key, json.dumps(diagnostics))
+                for path, (key, diagnostics) in self._pending.items()
+            ]
+            try:
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                print(f"[WARNING] Ecriture du cache des diagnostics impossible: {e}")
+                return False
+            self._pending.clear()
+            return True
+
+    def clear(self) -> None:
+        """Vide le cache (memoire et disque)."""
+        with self._lock:
+            self._pending.clear()
+            self._miss_keys.clear()
+            connection = self.connection
+            if connection is not None:
+                with connection:
+                    connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Stockage compact des diagnostics Ruff
+=====================================
+
+Plutot qu'une liste de dictionnaires complets, les diagnostics sont ranges en
+colonnes (tableaux `array` : fichier, ligne, colonne, code, applicabilite de
+la correction) avec des codes et des chemins internes (un entier par valeur
+distincte). Les regroupements par regle, categorie et fichier sont tenus a
+jour a l'insertion : les agregats sur 100k+ diagnostics sont immediats et la
+serialisation reste compacte (to_dict / from_dict).
+
+Seules les corrections "safe" sont comptees comme corrigeables : Ruff
+n'applique les corrections "unsafe" qu'avec --unsafe-fixes, et jamais les
+"display-only".
+"""
+
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
+
+ISSUE_STORE_VERSION = 2
+
+# Code affiche pour les erreurs de syntaxe (Ruff les rend sans code)
+SYNTAX_CODE = "syntax"
+
+# Categorie selon la premiere lettre du code
+CATEGORY_BY_PREFIX = {
+    "E": "Style et Formatage",
+    "F": "Erreurs Python",
+    "W": "Avertissements",
+    "I": "Imports",
+    "N": "Nommage",
+    "D": "Documentation",
+}
+DEFAULT_CATEGORY = "Autres"
+SEVERITIES = ("error", "warning", "info")
+
+# Applicabilite d'une correction Ruff ("" : pas de correction) ; indice stocke par diagnostic
+APPLICABILITIES = ("", "safe", "unsafe", "display-only")
+SAFE_FIX = APPLICABILITIES.index("safe")
+
+
+def fix_applicability(diagnostic: Dict) -> str:
+    """Applicabilite de la correction d'un diagnostic JSON de Ruff ("" sans correction)."""
+    fix = diagnostic.get("fix")
+    if not fix:
+        return ""
+    # Format JSON sans applicabilite (anciennes versions) : correction sure
+    applicability = fix.get("applicability") or "safe"
+    return applicability if applicability in APPLICABILITIES else "display-only"
+
+
+@lru_cache(maxsize=None)
+def issue_category(code: str) -> str:
+    """Categorie d'un code de regle (les erreurs de syntaxe sont des erreurs Python)."""
+    if code == SYNTAX_CODE:
+        return CATEGORY_BY_PREFIX["F"]
+    return CATEGORY_BY_PREFIX.get(code[:1], DEFAULT_CATEGORY)
+
+
+@lru_cache(maxsize=None)
+def issue_severity(code: str) -> str:
+    """Severite d'un code de regle : error, warning ou info."""
+    if code == SYNTAX_CODE or code.startswith(("F", "E9")):
+        return "error"
+    if code.startswith(("W", "E")):
+        return "warning"
+    return "info"
+
+
+class IssueStore:
+    """
+    Diagnostics en colonnes avec index de regroupement.
+
+    Chaque diagnostic est une ligne i des colonnes file_ids, lines, cols,
+    code_ids, applicabilities (indice dans APPLICABILITIES) et messages ; by_code / by_file donnent les lignes de
+    chaque code / fichier.
+    """
+
+    def __init__(self):
+        self.files: List[str] = []
+        self.codes: List[str] = []
+        self._file_index: Dict[str, int] = {}
+        self._code_index: Dict[str, int] = {}
+
+        self.file_ids = array("I")
+        self.lines = array("I")
+        self.cols = array("I")
+        self.code_ids = array("I")
+        self.applicabilities = array("b")
+        self.messages: List[str] = []
+
+        self.by_code: Dict[int, array] = {}
+        self.by_file: Dict[int, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.code_ids)
+
+    def fixable(self, row: int, accepted=("safe",)) -> bool:
+        """Indique si Ruff corrige le diagnostic (corrections "safe" par defaut)."""
+        return APPLICABILITIES[self.applicabilities[row]] in accepted
+
+    def applicability(self, row: int) -> str:
+        return APPLICABILITIES[self.applicabilities[row]]
+
+    def _intern(self, value: str, values: List[str], index: Dict[str, int]) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = index[value] = len(values)
+            values.append(value)
+        return value_id
+
+    def add(self, file: str, diagnostics: Iterable[Dict]) -> None:
+        """Ajoute les diagnostics JSON de Ruff d'un fichier."""
+        file_id = self._intern(file, self.files, self._file_index)
+        file_rows = self.by_file.setdefault(file_id, array("I"))
+        for diagnostic in diagnostics:
+            code = diagnostic.get("code") or SYNTAX_CODE
+            code_id = self._intern(code, self.codes, self._code_index)
+            location = diagnostic.get("location") or {}
+            row = len(self.code_ids)
+
+            self.file_ids.append(file_id)
+            self.lines.append(location.get("row") or 0)
+            self.cols.append(location.get("column") or 0)
+            self.code_ids.append(code_id)
+            self.applicabilities.append(APPLICABILITIES.index(fix_applicability(diagnostic)))
+            self.messages.append(diagnostic.get("message", ""))
+
+            self.by_code.setdefault(code_id, array("I")).append(row)
+            file_rows.append(row)
+
+    def add_issues(self, issues: Iterable[Dict]) -> None:
+        """Ajoute une liste de diagnostics portant chacun leur "filename"."""
+        for issue in issues:
+            self.add(issue.get("filename", ""), [issue])
+
+    # --- Agregats ---
+
+    def count_by_code(self) -> Dict[str, int]:
+        """Nombre de diagnostics par code de regle."""
+        return {self.codes[code_id]: len(rows) for code_id, rows in self.by_code.items()}
+
+    def count_by_file(self) -> Dict[str, int]:
+        """Nombre de diagnostics par fichier (fichiers sans diagnostic inclus)."""
+        return {self.files[file_id]: len(rows) for file_id, rows in self.by_file.items()}
+
+    def count_by_category(self) -> Dict[str, int]:
+        """Nombre de diagnostics par categorie."""
+        counts: Dict[str, int] = {}
+        for code, count in self.count_by_code().items():
+            category = issue_category(code)
+            counts[category] = counts.get(category, 0) + count
+        return counts
+
+    def severity_summary(self) -> Dict[str, int]:
+        """Nombre de diagnostics par severite (error, warning, info)."""
+        counts = dict.fromkeys(SEVERITIES, 0)
+        for code, count in self.count_by_code().items():
+            counts[issue_severity(code)] += count
+        return counts
+
+    def codes_by_category(self) -> Dict[str, List[str]]:
+        """Codes presents, regroupes par categorie."""
+        groups: Dict[str, List[str]] = {}
+        for code in self.codes:
+            groups.setdefault(issue_category(code), []).append(code)
+        return groups
+
+    # --- Acces aux lignes ---
+
+    def rows_for_code(self, code: str) -> array:
+        code_id = self._code_index.get(code)
+        return self.by_code.get(code_id, array("I")) if code_id is not None else array("I")
+
+    def rows_for_file(self, file: str) -> array:
+        file_id = self._file_index.get(file)
+        return self.by_file.get(file_id, array("I")) if file_id is not None else array("I")
+
+    def rows_for_category(self, category: str) -> List[int]:
+        rows: List[int] = []
+        for code in self.codes_by_category().get(category, []):
+            rows.extend(self.rows_for_code(code))
+        return sorted(rows)
+
+    def issue(self, row: int) -> Dict:
+        """Reconstruit un diagnostic (sous-ensemble du format JSON de Ruff)."""
+        code = self.codes[self.code_ids[row]]
+        return {
+            "filename": self.files[self.file_ids[row]],
+            "code": None if code == SYNTAX_CODE else code,
+            "location": {"row": self.lines[row], "column": self.cols[row]},
+            "message": self.messages[row],
+            "fixable": self.applicabilities[row] == SAFE_FIX,
+            "applicability": self.applicability(row),
+        }
+
+    def iter_issues(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        for row in range(len(self)) if rows is None else rows:
+            yield self.issue(row)
+
+    # --- Serialisation ---
+
+    def to_dict(self) -> Dict:
+        """Forme JSON compacte (colonnes en listes d'entiers)."""
+        return {
+            "version": ISSUE_STORE_VERSION,
+            "files": self.files,
+            "codes": self.codes,
+            "file_ids": self.file_ids.tolist(),
+            "lines": self.lines.tolist(),
+            "cols": self.cols.tolist(),
+            "code_ids": self.code_ids.tolist(),
+            "applicabilities": self.applicabilities.tolist(),
+            "messages": self.messages,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IssueStore":
+        """Reconstruit un store (et ses index) depuis to_dict()."""
+        if data.get("version") != ISSUE_STORE_VERSION:
+            raise ValueError(f"Version de store non supportee: {data.get('version')}")
+        store = cls()
+        for file in data["files"]:
+            store._intern(file, store.files, store._file_index)
+            store.by_file[store._file_index[file]] = array("I")
+        for code in data["codes"]:
+            store._intern(code, store.codes, store._code_index)
+        store.file_ids = array("I", data["file_ids"])
+        store.lines = array("I", data["lines"])
+        store.cols = array("I", data["cols"])
+        store.code_ids = array("I", data["code_ids"])
+        store.applicabilities = array("b", data["applicabilities"])
+        store.messages = list(data["messages"])
+        for row, (file_id, code_id) in enumerate(zip(store.file_ids, store.code_ids)):
+            store.by_file[file_id].append(row)
+            store.by_code.setdefault(code_id, array("I")).append(row)
+        return store
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Generation d'un plan de transformation depuis les diagnostics Ruff
+==================================================================
+
+Les diagnostics agreges (IssueStore) sont convertis en TransformationPlanModel :
+
+- les regles qu'un artisan corrige a coup sur (print, docstrings des
+  fonctions et classes) donnent une instruction par artisan, placee avant
+  Ruff : l'artisan transforme le code la ou la correction Ruff est absente ou
+  "unsafe" (T201 supprimerait les print au lieu de les convertir en logging) ;
+- les autres regles dont la correction Ruff est "safe" (ou "unsafe" avec le
+  parametre unsafe_fixes) sont regroupees dans UNE instruction
+  `ruff check --fix --select <regles>` : un seul appel du wrapper par lot de
+  fichiers, au lieu d'une passe par regle.
+
+Chaque instruction est ciblee par le parametre reserve `_files` : l'orchestrateur
+ne l'applique qu'aux fichiers concernes, le plan entier s'execute en une passe
+sur l'union des fichiers.
+
+save_generated_plan() range les plans generes dans le cache : un plan identique
+reutilise le meme fichier et seuls les KEEP_PLANS plus recents sont gardes.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.cache_utils import get_cache_dir
+from core.models import TARGET_FILES_PARAM, TransformationModel, TransformationPlanModel
+from core.ruff_integration.issue_store import SYNTAX_CODE, IssueStore
+
+# Plans generes conserves dans le cache
+KEEP_PLANS = 10
+PLANS_SUBDIR = "plans"
+
+# Artisans prioritaires sur Ruff pour ces regles (prefixes de codes). Une
+# regle n'y figure que si l'artisan corrige chacun de ses diagnostics : les
+# docstrings de module et de paquet (D100, D104) ne sont pas ajoutees par
+# add_docstrings_transform, ces regles restent a Ruff (sans correction).
+ARTISAN_RULES = {
+    "print_to_logging_transform": ("T201",),
+    "add_docstrings_transform": ("D101", "D102", "D103", "D105", "D106", "D107"),
+}
+
+
+def _artisan_for(code: str) -> Optional[str]:
+    for plugin_name, prefixes in ARTISAN_RULES.items():
+        if code.startswith(prefixes):
+            return plugin_name
+    return None
+
+
+def plan_from_store(
+    store: IssueStore,
+    name: str = "Plan genere depuis Ruff",
+    ruff_params: Optional[Dict] = None,
+) -> Optional[Tuple[TransformationPlanModel, List[str]]]:
+    """
+    Construit un plan cible par fichier et par regle.
+
+    Args:
+        store: diagnostics agreges
+        name: nom du plan
+        ruff_params: parametres supplementaires pour l'instruction ruff
+            (ex: {"unsafe_fixes": True})
+
+    Returns:
+        (plan, fichiers cibles) ou None si aucun diagnostic n'est traitable
+    """
+    fix_codes = set()
+    fix_files = set()
+    artisan_files: Dict[str, set] = {}
+
+    accepted = ("safe", "unsafe") if (ruff_params or {}).get("unsafe_fixes") else ("safe",)
+
+    for code, rows in ((store.codes[code_id], rows) for code_id, rows in store.by_code.items()):
+        if code == SYNTAX_CODE:
+            continue
+        artisan = _artisan_for(code)
+        for row in rows:
+            file = store.files[store.file_ids[row]]
+            if artisan:
+                artisan_files.setdefault(artisan, set()).add(file)
+            elif store.fixable(row, accepted):
+                fix_codes.add(code)
+                fix_files.add(file)
+
+    transformations = []
+    for plugin_name in ARTISAN_RULES:
+        if plugin_name in artisan_files:
+            transformations.append(
+                TransformationModel(
+                    type="appel_plugin",
+                    description=f"{plugin_name} ({len(artisan_files[plugin_name])} fichier(s))",
+                    plugin_name=plugin_name,
+                    params={TARGET_FILES_PARAM: sorted(artisan_files[plugin_name])},
+                )
+            )
+    if fix_codes:
+        transformations.append(
+            TransformationModel(
+                type="appel_plugin",
+                description=f"Corrections Ruff ({len(fix_codes)} regle(s))",
+                plugin_name="ruff_wrapper",
+                params={
+                    "command": "check",
+                    "fix": True,
+                    **(ruff_params or {}),
+                    "select": sorted(fix_codes),
+                    TARGET_FILES_PARAM: sorted(fix_files),
+                },
+            )
+        )
+
+    if not transformations:
+        return None
+
+    targets = sorted(fix_files.union(*artisan_files.values()))
+    plan = TransformationPlanModel(
+        name=name,
+        description=(
+            f"{len(store)} diagnostic(s) Ruff sur {len(targets)} fichier(s), "
+            f"{len(transformations)} instruction(s)"
+        ),
+        author="AST Tools",
+        transformations=transformations,
+    )
+    return plan, targets
+
+
+def save_plan(plan: TransformationPlanModel, path: str) -> None:
+    """Ecrit le plan au format JSON attendu par charger_plan()."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan.model_dump(exclude_none=True), f, indent=2, ensure_ascii=False)
+
+
+def save_generated_plan(
+    plan: TransformationPlanModel,
+    directory: Optional[Path] = None,
+    keep: int = KEEP_PLANS,
+    protected: Optional[str] = None,
+) -> Path:
+    """
+    Ecrit un plan genere dans le cache des plans et retourne son chemin.
+
+    Le nom depend du contenu : regenerer le meme plan reutilise le meme
+    fichier. Au-dela des `keep` plans les plus recents, les plus anciens sont
+    supprimes, sauf `protected` (plan charge dans l'interface).
+    """
+    directory = Path(directory) if directory else get_cache_dir(PLANS_SUBDIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    content = json.dumps(plan.model_dump(exclude_none=True), indent=2, ensure_ascii=False)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    path = directory / f"ruff_plan_{digest}.json"
+    if path.exists():
+        os.utime(path)
+    else:
+        path.write_text(content, encoding="utf-8")
+
+    plans = []
+    for candidate in directory.glob("ruff_plan_*.json"):
+        try:
+            plans.append((candidate.stat().st_mtime, candidate))
+        except OSError:
+            continue
+    plans.sort(reverse=True)
+    protected_path = Path(protected).resolve() if protected else None
+    for _, old in plans[max(1, keep) :]:
+        if old == path or old.resolve() == protected_path:
+            continue
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    return path
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Execution groupee de Ruff (sans dependance Qt)
+==============================================
+
+Ruff est concu pour verifier des arborescences entieres en un seul processus
+multi-thread : plutot qu'un appel par fichier, la selection est decoupee en
+quelques gros paquets (bornes par la longueur de la ligne de commande) et les
+diagnostics JSON de chaque appel sont redistribues par fichier.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.ruff_integration.diagnostics_cache import DiagnosticsCache
+from core.subprocess_executor import get_executor
+from core.tool_probe import resolve_tool
+
+# Commandes d'aide sondees pour connaitre les options de Ruff
+RUFF_HELP_COMMANDS = (("check", "--help"), ("format", "--help"))
+
+# Longueur maximale des chemins passes en un appel (limite Windows ~32k)
+MAX_COMMAND_CHARS = 24_000 if os.name == "nt" else 200_000
+
+# Dossiers jamais parcourus a la recherche de fichiers Python
+EXCLUDED_DIRS = {".venv", "venv", "__pycache__", ".git", "node_modules", ".ruff_cache"}
+
+# Delai maximal d'un appel groupe (secondes)
+CHUNK_TIMEOUT = 300
+
+
+def ruff_info() -> Dict:
+    """Informations de l'executable Ruff (leve ToolNotFoundError s'il manque)."""
+    return resolve_tool("ruff", RUFF_HELP_COMMANDS, required=True)
+
+
+def json_format_args(info: Dict) -> List[str]:
+    """Option de sortie JSON : --output-format (Ruff recent) ou --format (ancien)."""
+    if "--output-format" in info["flags"]:
+        return ["--output-format", "json"]
+    return ["--format", "json"]
+
+
+def chunk_files(
+    files: Sequence[str], max_chars: int = MAX_COMMAND_CHARS, max_files: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Decoupe une liste de fichiers en paquets dont la ligne de commande reste bornee.
+
+    max_files borne en plus le nombre de fichiers par paquet (resultats rendus
+    plus tot, au prix de quelques appels supplementaires).
+    """
+    chunks = []
+    current = []
+    size = 0
+    for file in files:
+        length = len(file) + 1
+        if current and (size + length > max_chars or len(current) == max_files):
+            chunks.append(current)
+            current = []
+            size = 0
+        current.append(file)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def collect_python_files(target: str) -> List[str]:
+    """Fichiers Python d'un chemin (fichier seul ou dossier parcouru recursivement)."""
+    if os.path.isfile(target):
+        return [target]
+    py_files = []
+    for root, dirs, files in os.walk(target):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        py_files.extend(os.path.join(root, file) for file in files if file.endswith(".py"))
+    return py_files
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _error_file(line: str, files_by_key: Dict[str, str]) -> Optional[str]:
+    """
+    Fichier vise par une ligne d'erreur de ruff format
+    ("error: Failed to parse <chemin>:2:1: ..."), ou None.
+
+    Le chemin (relatif au dossier courant ou absolu) peut contenir ":" : le
+    plus long prefixe suivi de ":" qui designe un fichier du paquet est retenu.
+    """
+    _, _, rest = line.partition("Failed to ")
+    rest = rest.partition(" ")[2] if rest else line.partition(":")[2].lstrip()
+    found = None
+    position = rest.find(":")
+    while position != -1:
+        file = files_by_key.get(_normalize(rest[:position]))
+        if file is not None:
+            found = file
+        position = rest.find(":", position + 1)
+    return found
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _error_results(files: Sequence[str], message: str) -> Dict[str, Dict]:
+    return {file: {"diagnostics": [], "fixed": False, "error": message} for file in files}
+
+
+def check_chunk(
+    files: Sequence[str], fix: bool = False, extra_args: Sequence[str] = ()
+) -> Dict[str, Dict]:
+    """
+    Lance `ruff check` une seule fois sur un paquet de fichiers.
+
+    Returns:
+        {fichier: {"diagnostics": [...], "fixed": bool, "error": str | None}}
+        "fixed" indique que --fix a modifie le contenu du fichier.
+    """
+    info = ruff_info()
+    cmd = [info["path"], "check", *json_format_args(info), *extra_args]
+    if fix:
+        cmd.append("--fix")
+    cmd.extend(files)
+
+    before = {file: _file_hash(file) for file in files} if fix else {}
+    try:
+        result = get_executor().run(cmd, timeout=CHUNK_TIMEOUT, errors="replace")
+    except Exception as e:
+        return _error_results(files, f"Erreur execution ruff: {e}")
+
+    # 0 : aucun probleme, 1 : problemes trouves, 2 : erreur de Ruff
+    if result.returncode >= 2:
+        return _error_results(files, result.stderr.strip() or f"ruff code {result.returncode}")
+
+    try:
+        diagnostics = json.loads(result.stdout) if result.stdout.strip() else []
+    except json.JSONDecodeError as e:
+        return _error_results(files, f"Sortie JSON invalide: {e}")
+
+    index = {_normalize(file): file for file in files}
+    per_file = {file: [] for file in files}
+    for diagnostic in diagnostics:
+        file = index.get(_normalize(diagnostic.get("filename") or ""))
+        if file is not None:
+            per_file[file].append(diagnostic)
+
+    return {
+        file: {
+            "diagnostics": per_file[file],
+            "fixed": fix and _file_hash(file) != before.get(file),
+            "error": None,
+        }
+        for file in files
+    }
+
+
+def open_diagnostics_cache(extra_args: Sequence[str] = ()) -> DiagnosticsCache:
+    """Cache de diagnostics pour la version de Ruff installee et ces options."""
+    return DiagnosticsCache(ruff_info()["version"], extra_args)
+
+
+def iter_check(
+    files: Sequence[str],
+    fix: bool = False,
+    extra_args: Sequence[str] = (),
+    max_chars: int = MAX_COMMAND_CHARS,
+    cache: Optional[DiagnosticsCache] = None,
+    max_files: Optional[int] = None,
+) -> Iterator[Tuple[List[str], Dict[str, Dict]]]:
+    """
+    Genere (paquet, resultats par fichier) pour chaque appel groupe de ruff check.
+
+    Avec un cache (sans --fix), les fichiers inchanges sont rendus d'abord dans
+    un paquet sans appel a Ruff ("cached": True), seuls les autres sont
+    analyses. Les resultats sans erreur sont enregistres dans le cache, sous la
+    cle calculee par lookup (contenu effectivement analyse).
+    """
+    if cache is not None and not fix:
+        hits, files = cache.lookup(files)
+        if hits:
+            yield (
+                list(hits),
+                {
+                    file: {
+                        "diagnostics": diagnostics,
+                        "fixed": False,
+                        "error": None,
+                        "cached": True,
+                    }
+                    for file, diagnostics in hits.items()
+                },
+            )
+
+    for chunk in chunk_files(files, max_chars, max_files):
+        results = check_chunk(chunk, fix=fix, extra_args=extra_args)
+        if cache is not None:
+            for file, result in results.items():
+                if result["error"] is None:
+                    # --fix modifie le fichier : cle du contenu corrige, sinon celle de lookup
+                    key = cache.file_key(file) if fix else None
+                    cache.store(file, result["diagnostics"], key=key)
+        yield chunk, results
+
+    if cache is not None:
+        cache.save()
+
+
+def format_chunk(files: Sequence[str], extra_args: Sequence[str] = ()) -> Dict[str, Dict]:
+    """
+    Lance `ruff format` une seule fois sur un paquet de fichiers.
+
+    Returns:
+        {fichier: {"formatted": bool, "error": str | None}}
+    """
+    info = ruff_info()
+    cmd = [info["path"], "format", *extra_args, *files]
+    try:
+        result = get_executor().run(cmd, timeout=CHUNK_TIMEOUT, errors="replace")
+    except Exception as e:
+        return {file: {"formatted": False, "error": str(e)} for file in files}
+
+    # Ruff signale chaque fichier en echec sur une ligne "error: ... <chemin>:..."
+    files_by_key = {_normalize(file): file for file in files}
+    errors: Dict[str, List[str]] = {file: [] for file in files}
+    for line in result.stderr.splitlines():
+        if line.startswith("error"):
+            file = _error_file(line, files_by_key)
+            if file is not None:
+                errors[file].append(line)
+    if result.returncode >= 2 and not any(errors.values()):
+        return {file: {"formatted": False, "error": result.stderr.strip()} for file in files}
+    return {
+        file: {"formatted": not lines, "error": "\n".join(lines) or None}
+        for file, lines in errors.items()
+    }
+
+
+def iter_format(
+    files: Sequence[str],
+    extra_args: Sequence[str] = (),
+    max_chars: int = MAX_COMMAND_CHARS,
+    max_files: Optional[int] = None,
+) -> Iterator[Tuple[List[str], Dict[str, Dict]]]:
+    """Genere (paquet, resultats par fichier) pour chaque appel groupe de ruff format."""
+    for chunk in chunk_files(files, max_chars, max_files):
+        yield chunk, format_chunk(chunk, extra_args=extra_args)
@@ -6,13 +6,19 @@ Worker thread pour executer Ruff en arriere-plan avec PySide6.
 Version sans caracteres Unicode pour compatibilite maximale.
 """
 
-import json
 import logging
 import os
 import subprocess
 
 from PySide6.QtCore import QThread, Signal
 
+from core.ruff_integration import ruff_runner
+from core.ruff_integration.issue_store import IssueStore
+from core.tool_probe import ToolNotFoundError
+
+# Fichiers par appel de Ruff pour l'analyse IA (un signal par paquet)
+STREAM_BATCH_FILES = 200
+
 
 class RuffWorker(QThread):
     """Worker thread pour executer Ruff en arriere-plan."""
@@ -22,6 +28,7 @@ class RuffWorker(QThread):
     error_occurred = Signal(str)
     progress_updated = Signal(int)
     finished_successfully = Signal(dict)
+    diagnostics_batch = Signal(dict)  # {fichier: diagnostics}, emis au fil de l'analyse
 
     def __init__(self, command_type, target_path, options):
         super().__init__()
@@ -29,6 +36,7 @@ class RuffWorker(QThread):
         self.target_path = target_path
         self.options = options
         self.is_cancelled = False
+        self.store = IssueStore()  # Diagnostics de l'analyse IA, remplis au fil des paquets
         self.logger = logging.getLogger(__name__)
 
     def run(self):
@@ -96,79 +104,61 @@ class RuffWorker(QThread):
             self.error_occurred.emit(result["stderr"])
 
     def _run_analyze_for_ai(self):
-        """Execute l'analyse pour l'IA."""
-        cmd = ["ruff", "check", self.target_path, "--format=json"]
-        result = self._execute_command(cmd)
+        """
+        Execute l'analyse pour l'IA.
+
+        Les diagnostics sont emis par paquets de fichiers (diagnostics_batch) et
+        ranges au fil de l'analyse dans `self.store` ; le signal final ne porte
+        que le resume (compteurs, categories, severites, regles).
+        """
+        files = ruff_runner.collect_python_files(self.target_path)
+        store = self.store
+        done = 0
 
         try:
-            if result["stdout"].strip():
-                issues = json.loads(result["stdout"])
-                analysis = {
-                    "total_issues": len(issues),
-                    "issues": issues,
-                    "target_path": self.target_path,
-                    "categories": self._categorize_issues(issues),
-                    "severity_summary": self._analyze_severity(issues),
-                }
-            else:
-                analysis = {
-                    "total_issues": 0,
-                    "issues": [],
-                    "target_path": self.target_path,
-                    "categories": {},
-                    "severity_summary": {"error": 0, "warning": 0, "info": 0},
-                }
+            for chunk, results in ruff_runner.iter_check(files, max_files=STREAM_BATCH_FILES):
+                if self.is_cancelled:
+                    self.error_occurred.emit("Operation annulee")
+                    return
+
+                batch = {}
+                for file in chunk:
+                    if results[file]["error"]:
+                        self.error_occurred.emit(f"{file}: {results[file]['error']}")
+                    if results[file]["diagnostics"]:
+                        batch[file] = results[file]["diagnostics"]
+                        store.add(file, results[file]["diagnostics"])
+                if batch:
+                    self.diagnostics_batch.emit(batch)
+
+                done += len(chunk)
+                self.progress_updated.emit(int(100 * done / len(files)))
+
+            analysis = {
+                "total_issues": len(store),
+                "target_path": self.target_path,
+                "categories": self._categorize_issues(store),
+                "severity_summary": self._analyze_severity(store),
+                "rules": store.count_by_code(),
+            }
 
             self.logger.info(f"Analyse IA terminee: {analysis['total_issues']} problemes")
             self.finished_successfully.emit(analysis)
 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Erreur JSON: {e}")
-            self.error_occurred.emit(f"Erreur de parsing JSON: {e!s}")
+        except ToolNotFoundError:
+            self.logger.error("Ruff non trouve")
+            self.error_occurred.emit("Ruff non trouve. Installez avec: pip install ruff")
         except Exception as e:
             self.logger.error(f"Erreur analyse IA: {e}")
             self.error_occurred.emit(f"Erreur durant l'analyse IA: {e!s}")
 
-    def _categorize_issues(self, issues):
-        """Categorise les problemes par type."""
-        categories = {}
-        for issue in issues:
-            code = issue.get("code", "UNKNOWN")
-            category = self._get_issue_category(code)
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(issue)
-        return categories
-
-    def _get_issue_category(self, code):
-        """Determine la categorie d'un code d'erreur."""
-        if code.startswith("E"):
-            return "Style et Formatage"
-        elif code.startswith("F"):
-            return "Erreurs Python"
-        elif code.startswith("W"):
-            return "Avertissements"
-        elif code.startswith("I"):
-            return "Imports"
-        elif code.startswith("N"):
-            return "Nommage"
-        elif code.startswith("D"):
-            return "Documentation"
-        else:
-            return "Autres"
-
-    def _analyze_severity(self, issues):
-        """Analyse la severite des problemes."""
-        severity_count = {"error": 0, "warning": 0, "info": 0}
-        for issue in issues:
-            code = issue.get("code", "")
-            if code.startswith("F") or code.startswith("E9"):
-                severity_count["error"] += 1
-            elif code.startswith("W") or code.startswith("E"):
-                severity_count["warning"] += 1
-            else:
-                severity_count["info"] += 1
-        return severity_count
+    def _categorize_issues(self, store):
+        """Nombre de problemes par categorie (index du store)."""
+        return store.count_by_category()
+
+    def _analyze_severity(self, store):
+        """Nombre de problemes par severite (index du store)."""
+        return store.severity_summary()
 
     def _execute_command(self, cmd):
         """Execute une commande avec gestion robuste."""
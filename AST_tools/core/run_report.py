@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Resultats structures d'un run de transformation
+===============================================
+
+Chaque instruction appliquee a un fichier produit un StepResult : duree,
+taille avant/apres, changement effectif, erreur eventuelle, ou fichier
+ignore par le prefiltre. Le RunReport d'un run les regroupe avec les
+statistiques d'ecriture et classe les etapes et les fichiers les plus lents.
+
+Pour un lot traite en un seul appel d'outil (wrappers), la duree de l'appel
+est repartie entre les fichiers au prorata de leur taille.
+
+executer_plan retourne toujours un RunReport ; son etat est porte par des
+champs : plan_error (plan invalide, rien n'est execute), empty (aucune
+instruction a appliquer aux fichiers), dry_run (apercu sans ecriture, lignes
+ajoutees / supprimees dans diff_stats). Le rapport est vrai si le run a reussi
+(voir RunReport.ok).
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+def text_size(code: str) -> int:
+    """Taille en octets UTF-8 d'un code (sans encoder les textes ASCII)."""
+    return len(code) if code.isascii() else len(code.encode("utf-8"))
+
+
+class StepResult(NamedTuple):
+    """Resultat d'une etape (instruction ou groupe fusionne) sur un fichier."""
+
+    file: str
+    step: str
+    elapsed: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    changed: bool = False
+    error: Optional[str] = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __bool__(self) -> bool:
+        # Vrai si l'etape a reussi (et non parce que le tuple est non vide)
+        return self.ok
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class RunReport:
+    """
+    Rapport d'un run : resultats par (fichier, etape) et statistiques globales.
+
+    Usage:
+        rapport = orchestrateur.executer_plan(plan, fichiers)
+        if rapport:
+            for etape, duree in rapport.slowest_steps():
+                print(etape, duree)
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self.results: List[StepResult] = []
+        self.success_count = 0
+        self.elapsed = 0.0
+        self.write_stats = {"written": 0, "unchanged": 0, "failed": 0}
+        self.errors: List[str] = []
+        self.plan_error: Optional[str] = None
+        self.empty = False
+        self.dry_run = False
+        self.diff_stats = {"added": 0, "removed": 0}
+
+    @property
+    def ok(self) -> bool:
+        """
+        Succes du run : plan valide, puis sans aucune erreur en dry_run, sinon
+        au moins une instruction reussie (ou rien a appliquer).
+        """
+        if self.plan_error is not None:
+            return False
+        if self.dry_run:
+            return not self.errors and not self.failures
+        return self.empty or self.success_count > 0
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def add(self, result: StepResult) -> None:
+        self.results.append(result)
+
+    def merge(self, other: "RunReport") -> None:
+        """Ajoute les resultats d'un autre rapport (runs fichier par fichier)."""
+        self.run_id = self.run_id or other.run_id
+        self.results.extend(other.results)
+        self.success_count += other.success_count
+        self.elapsed += other.elapsed
+        for key, value in other.write_stats.items():
+            self.write_stats[key] = self.write_stats.get(key, 0) + value
+        self.errors.extend(other.errors)
+        self.plan_error = self.plan_error or other.plan_error
+        self.empty = self.empty or other.empty
+        self.dry_run = self.dry_run or other.dry_run
+        for key, value in other.diff_stats.items():
+            self.diff_stats[key] = self.diff_stats.get(key, 0) + value
+
+    # --- Agregats ---
+
+    def step_totals(self) -> Dict[str, Dict[str, Any]]:
+        """Par etape : duree cumulee, fichiers traites, modifies, ignores et en erreur."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for result in self.results:
+            total = totals.setdefault(
+                result.step,
+                {"elapsed": 0.0, "files": 0, "changed": 0, "skipped": 0, "errors": 0},
+            )
+            total["elapsed"] += result.elapsed
+            total["files"] += 1
+            total["changed"] += result.changed
+            total["skipped"] += result.skipped
+            total["errors"] += not result.ok
+        return totals
+
+    def file_totals(self) -> Dict[str, Dict[str, Any]]:
+        """Par fichier : duree cumulee, nombre d'etapes, etapes modifiantes et en erreur."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for result in self.results:
+            total = totals.setdefault(
+                result.file, {"elapsed": 0.0, "steps": 0, "changed": 0, "errors": 0}
+            )
+            total["elapsed"] += result.elapsed
+            total["steps"] += 1
+            total["changed"] += result.changed
+            total["errors"] += not result.ok
+        return totals
+
+    def slowest_steps(self, limit: int = 5) -> List[Tuple[str, float]]:
+        """Etapes classees par duree cumulee decroissante."""
+        totals = self.step_totals()
+        ranked = sorted(totals, key=lambda step: totals[step]["elapsed"], reverse=True)
+        return [(step, totals[step]["elapsed"]) for step in ranked[:limit]]
+
+    def slowest_files(self, limit: int = 5) -> List[Tuple[str, float]]:
+        """Fichiers classes par duree cumulee decroissante."""
+        totals = self.file_totals()
+        ranked = sorted(totals, key=lambda path: totals[path]["elapsed"], reverse=True)
+        return [(path, totals[path]["elapsed"]) for path in ranked[:limit]]
+
+    @property
+    def failures(self) -> List[StepResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def changed_files(self) -> List[str]:
+        return list(dict.fromkeys(result.file for result in self.results if result.changed))
+
+    # --- Restitution ---
+
+    def summary_lines(self, limit: int = 5) -> List[str]:
+        """Resume lisible : totaux puis etapes et fichiers les plus lents."""
+        lines = [
+            f"Rapport du run {self.run_id or '-'}: {len(self.file_totals())} fichier(s), "
+            f"{len(self.changed_files)} modifie(s), {len(self.failures)} etape(s) en erreur, "
+            f"{self.elapsed:.2f}s"
+        ]
+        if self.results:
+            lines.append("Etapes les plus lentes:")
+            lines.extend(f"  {step}: {elapsed:.3f}s" for step, elapsed in self.slowest_steps(limit))
+            lines.append("Fichiers les plus lents:")
+            lines.extend(f"  {path}: {elapsed:.3f}s" for path, elapsed in self.slowest_files(limit))
+        return lines
+
+    def to_dict(self, limit: int = 5) -> Dict[str, Any]:
+        """Version serialisable (signaux de l'interface, export JSON)."""
+        return {
+            "run_id": self.run_id,
+            "ok": self.ok,
+            "plan_error": self.plan_error,
+            "empty": self.empty,
+            "dry_run": self.dry_run,
+            "diff_stats": dict(self.diff_stats),
+            "success_count": self.success_count,
+            "elapsed": self.elapsed,
+            "write_stats": dict(self.write_stats),
+            "errors": list(self.errors),
+            "steps": self.step_totals(),
+            "slowest_steps": self.slowest_steps(limit),
+            "slowest_files": self.slowest_files(limit),
+            "results": [result.to_dict() for result in self.results],
+        }
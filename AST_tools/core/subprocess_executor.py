@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Executeur partage pour les appels d'outils externes
+===================================================
+
+Les wrappers lancent leurs outils (ruff, pyupgrade, ...) a travers un executeur
+commun qui borne le nombre de processus externes simultanes, applique un delai
+maximal a chaque appel et permet de traiter une suite de taches en parallele
+tout en rendant les resultats dans l'ordre d'entree.
+
+Le nombre de processus simultanes vaut par defaut le nombre de coeurs ; il peut
+etre fixe par la variable d'environnement AST_TOOLS_MAX_PROCESSES ou par
+configure_executor().
+"""
+
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+MAX_PROCESSES_ENV = "AST_TOOLS_MAX_PROCESSES"
+
+
+def default_max_workers() -> int:
+    """Nombre de processus simultanes par defaut (variable d'environnement ou coeurs)."""
+    value = os.environ.get(MAX_PROCESSES_ENV)
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            print(f"[WARNING] {MAX_PROCESSES_ENV} invalide: {value!r}")
+    return os.cpu_count() or 1
+
+
+class SubprocessExecutor:
+    """
+    Executeur borne d'appels de sous-processus.
+
+    - run() lance une commande en attendant un emplacement libre : jamais plus
+      de max_workers processus externes ne tournent en meme temps.
+    - map() applique une fonction a une suite d'elements dans un pool de
+      threads ; au plus max_pending taches sont soumises d'avance (la suite
+      d'entree est consommee au rythme des resultats) et les resultats sont
+      rendus dans l'ordre d'entree.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or default_max_workers()
+        self.timeout = timeout
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+
+    def run(
+        self,
+        cmd: List[str],
+        input: Optional[str] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> subprocess.CompletedProcess:
+        """
+        Execute une commande (sortie capturee, texte UTF-8).
+
+        Leve subprocess.TimeoutExpired si la commande depasse son delai ; le
+        processus est alors tue par subprocess.run.
+        """
+        kwargs.setdefault("capture_output", True)
+        kwargs.setdefault("text", True)
+        kwargs.setdefault("encoding", "utf-8")
+        with self._slots:
+            return subprocess.run(cmd, input=input, timeout=timeout or self.timeout, **kwargs)
+
+    def map(self, func: Callable, items: Iterable) -> Iterator:
+        """
+        Applique func a chaque element en parallele, resultats dans l'ordre.
+
+        Une exception levee par func est propagee au moment ou son resultat
+        est atteint. Appele depuis une tache du pool, map() s'execute en
+        sequence pour ne jamais bloquer le pool sur lui-meme.
+        """
+        if getattr(self._local, "in_pool", False) or self.max_workers == 1:
+            yield from map(func, items)
+            return
+
+        pool = self._get_pool()
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(self._call_in_pool, func, item))
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def _call_in_pool(self, func: Callable, item):
+        self._local.in_pool = True
+        try:
+            return func(item)
+        finally:
+            self._local.in_pool = False
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ast_tools_subprocess"
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Arrete le pool de threads (les appels en cours se terminent)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> SubprocessExecutor:
+    """Retourne l'executeur partage par tous les wrappers du processus."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = SubprocessExecutor()
+        return _executor
+
+
+def configure_executor(
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    max_pending: Optional[int] = None,
+) -> SubprocessExecutor:
+    """Remplace l'executeur partage (par exemple pour changer la limite de concurrence)."""
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, SubprocessExecutor(max_workers, timeout, max_pending)
+    if previous is not None:
+        previous.shutdown()
+    return _executor
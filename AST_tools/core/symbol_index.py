@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Index des liaisons et des portees d'un fichier Python
+=====================================================
+
+Un seul parcours de l'arbre construit la table des symboles du fichier :
+portees (module, classe, fonction, lambda, comprehension), noms lies dans
+chaque portee (imports, definitions, affectations, parametres) et utilisations
+resolues selon les regles de Python (global / nonlocal, portees de classe
+invisibles depuis les fonctions imbriquees).
+
+Sont comptes comme utilisations : les noms lus ou supprimes (y compris la
+racine des attributs, `os` dans `os.path.join`), les noms cites dans les
+annotations en chaine ("Optional[Path]") et les noms exportes par `__all__`.
+
+L'index est partage : get_symbol_index() le met en cache par empreinte du
+contenu, les artisans et l'AnalyseurCode d'un meme code reutilisent le meme
+index au lieu de refaire la resolution des noms.
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Nombre d'index gardes en memoire (par empreinte de contenu)
+INDEX_CACHE_SIZE = 64
+
+# Exceptions qui marquent un import optionnel (try: import x / except ImportError)
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError"}
+
+Position = Tuple[int, int]
+
+
+class Binding:
+    """Un nom lie dans une portee."""
+
+    __slots__ = ("name", "kind", "node", "statement", "scope", "guarded", "used")
+
+    def __init__(self, name, kind, node, statement, scope, guarded=False):
+        self.name = name
+        # import, function, class, parameter, assignment
+        self.kind = kind
+        self.node = node
+        self.statement = statement
+        self.scope = scope
+        # Import place dans un try qui intercepte ImportError
+        self.guarded = guarded
+        self.used = False
+
+    @property
+    def lineno(self) -> int:
+        return getattr(self.statement, "lineno", 0)
+
+    def __repr__(self):
+        return f"Binding({self.kind} {self.name!r}, ligne {self.lineno})"
+
+
+class Scope:
+    """Portee : noms lies, declarations global/nonlocal et utilisations."""
+
+    __slots__ = ("kind", "name", "node", "parent", "bindings", "globals", "nonlocals", "uses")
+
+    def __init__(self, kind: str, name: str, node: ast.AST, parent: Optional["Scope"]):
+        self.kind = kind
+        self.name = name
+        self.node = node
+        self.parent = parent
+        self.bindings: Dict[str, List[Binding]] = {}
+        self.globals: Set[str] = set()
+        self.nonlocals: Set[str] = set()
+        self.uses: List[Tuple[str, Optional[Position]]] = []
+
+
+class SymbolIndex:
+    """
+    Table des symboles d'un module.
+
+    Attributs principaux :
+        module: portee du module ; scopes: toutes les portees
+        imports / definitions: liaisons d'imports / de fonctions et classes
+        calls: {nom: [ast.Call]} pour les appels d'un simple nom (f(...))
+        exported: noms cites dans __all__
+        has_star_import: presence d'un `from x import *`
+    """
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        self.scopes: List[Scope] = []
+        self.imports: List[Binding] = []
+        self.definitions: List[Binding] = []
+        self.calls: Dict[str, List[ast.Call]] = {}
+        self.exported: Set[str] = set()
+        self.has_star_import = False
+        self._resolved: Dict[Position, Optional[Binding]] = {}
+        self._blocks: Dict[int, list] = {}
+
+        builder = _IndexBuilder(self)
+        builder.visit(tree)
+        self.module = self.scopes[0]
+        self._resolve()
+
+    # --- Resolution ---
+
+    def _resolve(self) -> None:
+        for name in self.exported:
+            for binding in self.module.bindings.get(name, ()):
+                binding.used = True
+        for scope in self.scopes:
+            for name, position in scope.uses:
+                owner = self._owner(scope, name)
+                bindings = owner.bindings.get(name) if owner else None
+                for binding in bindings or ():
+                    binding.used = True
+                if position is not None:
+                    self._resolved[position] = bindings[-1] if bindings else None
+
+    def _owner(self, scope: Scope, name: str) -> Optional[Scope]:
+        """Portee qui lie `name` vu depuis `scope` (None : builtin ou inconnu)."""
+        if name in scope.globals:
+            return self.module if name in self.module.bindings else None
+        current = scope
+        first = True
+        while current is not None:
+            # Une portee de classe n'est visible que de son propre corps
+            if (first or current.kind != "class") and name in current.bindings:
+                return current
+            current = current.parent
+            first = False
+        return None
+
+    # --- Requetes ---
+
+    def binding_at(self, node: ast.AST) -> Optional[Binding]:
+        """Liaison designee par un ast.Name lu (None : builtin ou nom inconnu)."""
+        return self._resolved.get((node.lineno, node.col_offset))
+
+    def is_builtin_use(self, node: ast.AST) -> bool:
+        """Vrai si le nom lu n'est lie nulle part dans le fichier (builtin ou inconnu)."""
+        return self.binding_at(node) is None
+
+    def unused_imports(self) -> List[Binding]:
+        """Imports dont le nom n'est jamais utilise dans sa portee."""
+        return [binding for binding in self.imports if not binding.used]
+
+    def block_of(self, statement: ast.stmt) -> Optional[list]:
+        """Liste d'instructions (corps de module, de fonction, de if...) contenant l'instruction."""
+        return self._blocks.get(id(statement))
+
+    def functions(self) -> List[Binding]:
+        return [binding for binding in self.definitions if binding.kind == "function"]
+
+    def classes(self) -> List[Binding]:
+        return [binding for binding in self.definitions if binding.kind == "class"]
+
+
+class _IndexBuilder(ast.NodeVisitor):
+    """Parcours unique qui remplit un SymbolIndex."""
+
+    def __init__(self, index: SymbolIndex):
+        self.index = index
+        self.scope: Optional[Scope] = None
+        self.statement: Optional[ast.stmt] = None
+        self.guarded = 0
+
+    # --- Outils ---
+
+    def _push(self, kind: str, name: str, node: ast.AST) -> Scope:
+        scope = Scope(kind, name, node, self.scope)
+        self.index.scopes.append(scope)
+        self.scope = scope
+        return scope
+
+    def _bind(self, name: str, kind: str, node: ast.AST) -> Binding:
+        scope = self.scope
+        if name in scope.globals:
+            scope = self.index.scopes[0]
+        binding = Binding(name, kind, node, self.statement, scope, guarded=self.guarded > 0)
+        scope.bindings.setdefault(name, []).append(binding)
+        return binding
+
+    def _use(self, name: str, node: ast.AST) -> None:
+        self.scope.uses.append((name, (node.lineno, node.col_offset)))
+
+    def _visit_string_annotation(self, node: ast.Constant) -> None:
+        """Annotation en chaine : les noms qu'elle cite sont des utilisations."""
+        try:
+            expression = ast.parse(node.value.strip(), mode="eval")
+        except SyntaxError:
+            return
+        for child in ast.walk(expression):
+            if isinstance(child, ast.Name):
+                # Pas de position : le nom n'existe dans le fichier que sous forme de chaine
+                self.scope.uses.append((child.id, None))
+
+    def _visit_arguments(self, args: ast.arguments) -> None:
+        """Valeurs par defaut et annotations, evaluees dans la portee englobante."""
+        for default in [*args.defaults, *args.kw_defaults]:
+            if default is not None:
+                self.visit(default)
+        for arg in [*args.posonlyargs, *args.args, args.vararg, *args.kwonlyargs, args.kwarg]:
+            if arg is not None:
+                self._visit_annotation_node(arg.annotation)
+
+    def _visit_annotation_node(self, annotation: Optional[ast.expr]) -> None:
+        if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+            self._visit_string_annotation(annotation)
+        elif annotation is not None:
+            self.visit(annotation)
+            for child in ast.walk(annotation):
+                if isinstance(child, ast.Constant) and isinstance(child.value, str):
+                    # List["Path"], Optional["A"]
+                    self._visit_string_annotation(child)
+
+    def _bind_parameters(self, args: ast.arguments) -> None:
+        for arg in [*args.posonlyargs, *args.args, args.vararg, *args.kwonlyargs, args.kwarg]:
+            if arg is not None:
+                self._bind(arg.arg, "parameter", arg)
+
+    def generic_visit(self, node):
+        # Un seul passage sur les champs : visite des enfants et memorisation du
+        # bloc de chaque instruction (corps, else, finally...)
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                if value and isinstance(value[0], ast.stmt):
+                    for statement in value:
+                        self.index._blocks[id(statement)] = value
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+
+    def visit(self, node):
+        if isinstance(node, ast.stmt):
+            previous = self.statement
+            self.statement = node
+            try:
+                return super().visit(node)
+            finally:
+                self.statement = previous
+        return super().visit(node)
+
+    # --- Portees ---
+
+    def visit_Module(self, node):
+        self._push("module", "<module>", node)
+        self.generic_visit(node)
+
+    def _visit_function(self, node):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self._visit_arguments(node.args)
+        self._visit_annotation_node(node.returns)
+        self.index.definitions.append(self._bind(node.name, "function", node))
+
+        parent = self.scope
+        self._push("function", node.name, node)
+        self._bind_parameters(node.args)
+        for statement in node.body:
+            self.index._blocks[id(statement)] = node.body
+            self.visit(statement)
+        self.scope = parent
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Lambda(self, node):
+        self._visit_arguments(node.args)
+        parent = self.scope
+        self._push("lambda", "<lambda>", node)
+        self._bind_parameters(node.args)
+        self.visit(node.body)
+        self.scope = parent
+
+    def visit_ClassDef(self, node):
+        for expression in [*node.decorator_list, *node.bases, *node.keywords]:
+            self.visit(expression)
+        self.index.definitions.append(self._bind(node.name, "class", node))
+
+        parent = self.scope
+        self._push("class", node.name, node)
+        for statement in node.body:
+            self.index._blocks[id(statement)] = node.body
+            self.visit(statement)
+        self.scope = parent
+
+    def _visit_comprehension(self, node):
+        parent = self.scope
+        self._push("comprehension", type(node).__name__, node)
+        for generator in node.generators:
+            self.visit(generator)
+        for field in ("elt", "key", "value"):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+        self.scope = parent
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+    # --- Liaisons ---
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            binding = self._bind(alias.asname or alias.name.split(".")[0], "import", alias)
+            self.index.imports.append(binding)
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name == "*":
+                self.index.has_star_import = True
+                continue
+            binding = self._bind(alias.asname or alias.name, "import", alias)
+            self.index.imports.append(binding)
+
+    def visit_Global(self, node):
+        self.scope.globals.update(node.names)
+
+    def visit_Nonlocal(self, node):
+        self.scope.nonlocals.update(node.names)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Store):
+            self._bind(node.id, "assignment", node)
+        else:
+            self._use(node.id, node)
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self._bind(node.name, "assignment", node)
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node):
+        if node.name:
+            self._bind(node.name, "assignment", node)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node):
+        if node.name:
+            self._bind(node.name, "assignment", node)
+
+    def visit_MatchMapping(self, node):
+        if node.rest:
+            self._bind(node.rest, "assignment", node)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        self._visit_annotation_node(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+        self._collect_all(node.target, node.value)
+
+    def visit_Assign(self, node):
+        self.generic_visit(node)
+        for target in node.targets:
+            self._collect_all(target, node.value)
+
+    def visit_AugAssign(self, node):
+        self.generic_visit(node)
+        self._collect_all(node.target, node.value)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            self.index.calls.setdefault(node.func.id, []).append(node)
+        elif (
+            # __all__.extend([...]) / __all__.append("x")
+            isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name)
+            and node.func.value.id == "__all__"
+            and node.func.attr in ("extend", "append")
+        ):
+            for arg in node.args:
+                self._collect_all(node.func.value, arg)
+        self.generic_visit(node)
+
+    def _collect_all(self, target, value) -> None:
+        """Noms exportes par __all__ au niveau module."""
+        if not (isinstance(target, ast.Name) and target.id == "__all__"):
+            return
+        if self.scope is not self.index.scopes[0] or value is None:
+            return
+        elements = value.elts if isinstance(value, (ast.List, ast.Tuple, ast.Set)) else [value]
+        for element in elements:
+            if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                self.index.exported.add(element.value)
+
+    def visit_Try(self, node):
+        guarded = any(_catches_import_error(handler) for handler in node.handlers)
+        self.guarded += guarded
+        for statement in node.body:
+            self.visit(statement)
+        self.guarded -= guarded
+        for field in ("handlers", "orelse", "finalbody"):
+            for child in getattr(node, field):
+                self.visit(child)
+        for field in ("body", "orelse", "finalbody"):
+            for statement in getattr(node, field):
+                self.index._blocks[id(statement)] = getattr(node, field)
+
+    visit_TryStar = visit_Try
+
+
+def _catches_import_error(handler: ast.ExceptHandler) -> bool:
+    """Vrai pour `except:`, `except ImportError` et les tuples qui la contiennent."""
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    for exception in types:
+        name = (
+            exception.attr if isinstance(exception, ast.Attribute) else getattr(exception, "id", "")
+        )
+        if name in IMPORT_ERRORS or name in ("Exception", "BaseException"):
+            return True
+    return False
+
+
+_cache: "OrderedDict[str, SymbolIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def content_key(code: str) -> str:
+    """Empreinte du contenu utilisee comme cle de cache."""
+    return hashlib.sha1(code.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def get_symbol_index(code: str, tree: Optional[ast.Module] = None) -> SymbolIndex:
+    """
+    Index du code, construit une fois par contenu (cache LRU en memoire).
+
+    Args:
+        code: code source
+        tree: arbre deja analyse de ce code (evite un second ast.parse)
+
+    Raises:
+        SyntaxError: si le code n'est pas analysable
+    """
+    key = content_key(code)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    index = SymbolIndex(tree if tree is not None else ast.parse(code))
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Resolution et sondage des outils externes (ruff, pyupgrade, mypy, ...)
+======================================================================
+
+Chaque outil est resolu une seule fois : chemin absolu, chaine de version et
+options acceptees (extraites de --help). Le resultat est garde en memoire pour
+le processus et sur disque (cache JSON) ; l'entree disque est indexee par le
+PATH courant et invalidee des que la date de modification du binaire change.
+
+Un outil introuvable est aussi retenu en memoire (meme cle, donc par PATH) :
+les appels suivants ne refont ni recherche dans le PATH ni lecture du cache
+disque. Un outil installe en cours de session est vu apres un changement du
+PATH ou un appel a clear_memory_cache().
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import Dict, List, Optional, Sequence, Set
+
+from core.cache_utils import get_cache_dir, load_json_cache, save_json_cache
+
+PROBE_CACHE_FILENAME = "tool_probes.json"
+PROBE_CACHE_VERSION = 1
+PROBE_TIMEOUT = 10
+
+_FLAG_PATTERN = re.compile(r"(?<![\w-])(--[a-zA-Z][\w-]*)")
+_VERSION_PATTERN = re.compile(r"\d+(?:\.\d+)+")
+
+_memory_cache: Dict[str, Dict] = {}
+_missing_tools: Set[str] = set()  # cles des outils introuvables
+_cache_lock = threading.Lock()
+
+
+class ToolNotFoundError(LookupError):
+    """L'outil externe demande est introuvable dans le PATH."""
+
+
+def _cache_key(name: str, help_commands: Sequence[Sequence[str]]) -> str:
+    """Cle du cache : nom de l'outil, commandes d'aide et empreinte du PATH."""
+    path_hash = hashlib.sha1(os.environ.get("PATH", "").encode("utf-8")).hexdigest()[:16]
+    help_key = ";".join(" ".join(args) for args in help_commands)
+    return f"{name}|{help_key}|{path_hash}"
+
+
+def _probe_output(cmd: List[str]) -> str:
+    """Sortie (stdout + stderr) d'une commande de sondage, vide en cas d'echec."""
+    try:
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, encoding="utf-8", timeout=PROBE_TIMEOUT
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return (result.stdout or "") + (result.stderr or "")
+
+
+def probe_tool(
+    name: str, help_commands: Sequence[Sequence[str]] = (("--help",),)
+) -> Optional[Dict]:
+    """
+    Sonde un outil sans cache.
+
+    Returns:
+        dict: {"name", "path", "mtime", "version", "flags"} ou None si l'outil
+        est introuvable
+    """
+    path = shutil.which(name)
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+
+    version_output = _probe_output([path, "--version"]).strip()
+    match = _VERSION_PATTERN.search(version_output)
+
+    flags = set()
+    for args in help_commands:
+        flags.update(_FLAG_PATTERN.findall(_probe_output([path, *args])))
+
+    return {
+        "name": name,
+        "path": path,
+        "mtime": os.stat(path).st_mtime,
+        "version": match.group(0) if match else None,
+        "flags": sorted(flags),
+    }
+
+
+def _is_valid(info: Dict) -> bool:
+    """Une entree reste valide tant que le binaire n'a pas change."""
+    try:
+        return os.stat(info["path"]).st_mtime == info["mtime"]
+    except (OSError, KeyError, TypeError):
+        return False
+
+
+def resolve_tool(
+    name: str,
+    help_commands: Sequence[Sequence[str]] = (("--help",),),
+    required: bool = False,
+) -> Optional[Dict]:
+    """
+    Resout un outil via le cache memoire, puis le cache disque, puis un sondage.
+
+    Args:
+        name: nom de l'executable (ex: "ruff")
+        help_commands: arguments des commandes d'aide a analyser pour les options
+        required: lever ToolNotFoundError plutot que retourner None
+
+    Returns:
+        dict: informations de l'outil (voir probe_tool) ou None
+    """
+    key = _cache_key(name, help_commands)
+    with _cache_lock:
+        info = _memory_cache.get(key)
+        if info is not None and _is_valid(info):
+            return info
+        if key in _missing_tools:
+            info = None
+        else:
+            cache_path = get_cache_dir() / PROBE_CACHE_FILENAME
+            disk_cache = load_json_cache(cache_path)
+            if not isinstance(disk_cache, dict) or disk_cache.get("version") != PROBE_CACHE_VERSION:
+                disk_cache = {"version": PROBE_CACHE_VERSION, "tools": {}}
+
+            info = disk_cache["tools"].get(key)
+            if info is None or not _is_valid(info):
+                info = probe_tool(name, help_commands)
+                if info is not None:
+                    disk_cache["tools"][key] = info
+                    save_json_cache(cache_path, disk_cache)
+
+            if info is not None:
+                _memory_cache[key] = info
+            else:
+                _missing_tools.add(key)
+
+    if info is None and required:
+        raise ToolNotFoundError(f"Outil '{name}' introuvable dans le PATH")
+    return info
+
+
+def clear_memory_cache() -> None:
+    """Vide le cache memoire, outils introuvables compris (le cache disque reste valide)."""
+    with _cache_lock:
+        _memory_cache.clear()
+        _missing_tools.clear()
@@ -2,51 +2,79 @@
 """
 TransformationLoader - Version adaptee pour la nouvelle structure
 Gere les deux types de plugins : Wrappers et Artisans
+
+La decouverte des plugins s'appuie sur un manifeste persiste (JSON) indexe
+par la date de modification de chaque fichier : tant qu'un plugin n'a pas
+change, son nom de classe et ses metadonnees sont lus depuis le manifeste
+sans importer le module. Le module n'est importe qu'au premier appel de
+get_transformation().
+
+Les plugins qui se declarent reutilisables (attribut de classe reusable) sont
+mis en pool : une seule instance par thread de travail, initialisee une fois
+via setup() et liberee via teardown() a la fermeture du chargeur.
+
+Le prefiltre d'applicabilite de chaque plugin (attribut de classe prefilter)
+est aussi stocke dans le manifeste : get_prefilter() permet d'ecarter un
+fichier sans importer le plugin. De meme, l'entree "rules" indique si le
+plugin expose une regle pour le parcours partage (supports_rules()).
 """
 
 import importlib.util
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
-from core.plugins.wrappers.pyupgrade_wrapper import PyupgradeWrapper
+from core.cache_utils import get_cache_dir, load_json_cache, save_json_cache
+from core.plugins.base.prefilter import Prefilter
+from core.plugins.base.rule_dispatch import supports_rules
 
-# Imports des wrappers specifiques
-from core.plugins.wrappers.ruff_wrapper import RuffWrapper
+# Types de plugins scannes (sous-dossiers de core/plugins)
+PLUGIN_TYPES = ("wrappers", "artisans", "generators")
 
-# Registre des wrappers disponibles
-WRAPPER_REGISTRY = {
-    "ruff_wrapper": RuffWrapper,
-    "pyupgrade_wrapper": PyupgradeWrapper,
-}
+# Classes de base a ne jamais enregistrer comme plugin
+BASE_CLASS_NAMES = {"BaseTransformer", "BaseWrapper", "WrapperBase", "ArtisanBase"}
+
+# Version du format du manifeste (a incrementer si la structure change)
+MANIFEST_VERSION = 3
+MANIFEST_FILENAME = "plugin_manifest.json"
 
 
 class TransformationLoader:
     """Chargeur de transformations AST avec support des types."""
 
-    def __init__(self):
+    def __init__(self, manifest_path: Optional[Path] = None):
         self.plugins_dir = Path(__file__).parent / "plugins"
+        self.manifest_path = manifest_path or get_cache_dir() / MANIFEST_FILENAME
         self.loaded_transformations = {}
         self.transformation_types = {"wrappers": {}, "artisans": {}, "generators": {}, "all": {}}
         self.metadata_cache = {}
+        self._classes = {}
+        self._prefilters: Dict[str, Optional[Prefilter]] = {}
+        self._manifest_dirty = False
+        # Pool d'instances reutilisables : un dictionnaire par thread
+        self._pool_local = threading.local()
+        self._pooled_instances = []
+        self._pool_lock = threading.Lock()
         self._scan_all_transformations()
 
     def _scan_all_transformations(self):
         """Scanne les transformations par type."""
-        # Scanner les plugins wrapper
-        wrappers_dir = self.plugins_dir / "wrappers"
-        if wrappers_dir.exists():
-            self._scan_directory(wrappers_dir, "wrappers")
+        manifest = self._load_manifest()
+        previous_entries = manifest.get("plugins", {})
+        entries = {}
 
-        # Scanner les plugins artisan
-        artisans_dir = self.plugins_dir / "artisans"
-        if artisans_dir.exists():
-            self._scan_directory(artisans_dir, "artisans")
+        for transform_type in PLUGIN_TYPES:
+            directory = self.plugins_dir / transform_type
+            if directory.exists():
+                self._scan_directory(directory, transform_type, previous_entries, entries)
 
-        # Scanner les plugins generator
-        generators_dir = self.plugins_dir / "generators"
-        if generators_dir.exists():
-            self._scan_directory(generators_dir, "generators")
+        # Les fichiers supprimes disparaissent du manifeste
+        if set(entries) != set(previous_entries):
+            self._manifest_dirty = True
+        if self._manifest_dirty:
+            save_json_cache(self.manifest_path, {"version": MANIFEST_VERSION, "plugins": entries})
+            self._manifest_dirty = False
 
         # Fusionner dans all
         self.transformation_types["all"] = {
@@ -61,73 +89,233 @@ class TransformationLoader:
         if total > 0:
             print(f"+ Systeme modulaire actif ({total} transformations chargees)")
 
-    def _scan_directory(self, directory: Path, transform_type: str):
-        """Scanne un repertoire de transformations."""
-        if not directory.exists():
-            return
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Charge le manifeste persiste (vide s'il est absent ou obsolete)."""
+        manifest = load_json_cache(self.manifest_path)
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest
 
-        python_files = list(directory.glob("*.py"))
+    def _scan_directory(
+        self,
+        directory: Path,
+        transform_type: str,
+        previous_entries: Dict[str, Dict],
+        entries: Dict[str, Dict],
+    ):
+        """Scanne un repertoire de transformations."""
+        python_files = sorted(directory.glob("*.py"))
         transform_files = [f for f in python_files if not f.name.startswith("__")]
 
         for fichier in transform_files:
             nom_module = fichier.stem
+            key = f"{transform_type}/{fichier.name}"
             try:
-                loaded_class = self._load_transformation_module(nom_module, fichier, transform_type)
-                if loaded_class:
-                    self.transformation_types[transform_type][nom_module] = loaded_class
-
-                    # Cache metadata
-                    try:
-                        instance = loaded_class()
-                        if hasattr(instance, "get_metadata"):
-                            self.metadata_cache[nom_module] = instance.get_metadata()
-                    except Exception:
-                        pass
+                stat = fichier.stat()
+                entry = previous_entries.get(key)
+                if not (
+                    entry
+                    and entry.get("mtime") == stat.st_mtime
+                    and entry.get("size") == stat.st_size
+                ):
+                    # Fichier nouveau ou modifie : import pour reconstruire l'entree
+                    entry = self._build_manifest_entry(nom_module, fichier, transform_type, stat)
+                    self._manifest_dirty = True
+                entries[key] = entry
+
+                if entry.get("class_name"):
+                    self.transformation_types[transform_type][nom_module] = entry
+                    if entry.get("metadata"):
+                        self.metadata_cache[nom_module] = entry["metadata"]
 
             except Exception as e:
                 print(f"Avertissement: Impossible de charger {nom_module}: {e}")
 
+    def _build_manifest_entry(
+        self, nom_module: str, fichier_path: Path, transform_type: str, stat
+    ) -> Dict[str, Any]:
+        """Importe un module de plugin et construit son entree de manifeste."""
+        entry = {
+            "module": nom_module,
+            "path": str(fichier_path),
+            "type": transform_type,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "class_name": None,
+            "metadata": {},
+            "prefilter": None,
+            "rules": False,
+        }
+
+        # Le fichier a change : forcer la reexecution du module
+        sys.modules.pop(f"ast_tools.transformations.{transform_type}.{nom_module}", None)
+        loaded_class = self._load_transformation_module(nom_module, fichier_path, transform_type)
+        if loaded_class is None:
+            return entry
+
+        entry["class_name"] = loaded_class.__name__
+        self._classes[nom_module] = loaded_class
+
+        prefilter = getattr(loaded_class, "prefilter", None)
+        if isinstance(prefilter, Prefilter) and not prefilter.empty:
+            entry["prefilter"] = prefilter.to_dict()
+        entry["rules"] = supports_rules(loaded_class)
+
+        # Cache metadata
+        try:
+            instance = loaded_class()
+            if hasattr(instance, "get_metadata"):
+                entry["metadata"] = instance.get_metadata()
+        except Exception:
+            pass
+
+        return entry
+
     def _load_transformation_module(self, nom_module: str, fichier_path: Path, transform_type: str):
         """Charge un module de transformation."""
         full_module_name = f"ast_tools.transformations.{transform_type}.{nom_module}"
 
-        spec = importlib.util.spec_from_file_location(full_module_name, fichier_path)
-        if spec is None:
-            return None
+        module = sys.modules.get(full_module_name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(full_module_name, fichier_path)
+            if spec is None:
+                return None
 
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[full_module_name] = module
-        spec.loader.exec_module(module)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[full_module_name] = module
+            spec.loader.exec_module(module)
 
-        # Chercher la classe de transformation
+        # Chercher la classe de transformation, en priorite celles definies dans
+        # le module lui-meme (et non les classes de base importees)
+        candidates = []
         for attr_name in dir(module):
             attr = getattr(module, attr_name)
             if (
                 isinstance(attr, type)
                 and hasattr(attr, "transform")
                 and hasattr(attr, "get_metadata")
-                and attr.__name__ not in ["BaseTransformer", "WrapperBase", "ArtisanBase"]
+                and attr.__name__ not in BASE_CLASS_NAMES
             ):
+                candidates.append(attr)
+
+        for attr in candidates:
+            if attr.__module__ == module.__name__:
                 return attr
+        return candidates[0] if candidates else None
 
-        return None
+    def _get_class(self, name: str):
+        """Retourne la classe d'un plugin, en important son module au besoin."""
+        if name in self._classes:
+            return self._classes[name]
+
+        entry = self.loaded_transformations.get(name)
+        if not entry:
+            return None
+
+        loaded_class = self._load_transformation_module(
+            entry["module"], Path(entry["path"]), entry["type"]
+        )
+        if loaded_class is None or loaded_class.__name__ != entry["class_name"]:
+            return None
+
+        self._classes[name] = loaded_class
+        return loaded_class
 
     def list_transformations(self, transform_type: str = "all") -> List[str]:
         """Liste des transformations."""
         return list(self.transformation_types.get(transform_type, {}).keys())
 
     def get_transformation(self, name: str):
-        """Retourne une instance de transformation."""
+        """
+        Retourne une instance de transformation.
+
+        Pour un plugin reutilisable, l'instance est partagee par tous les appels
+        du thread courant ; sinon une nouvelle instance est creee. Dans les deux
+        cas setup() a deja ete appele. Rendre l'instance avec
+        release_transformation() une fois le travail termine.
+        """
         if name not in self.loaded_transformations:
             return None
+
+        pool = self._get_thread_pool()
+        if name in pool:
+            return pool[name]
+
         try:
-            return self.loaded_transformations[name]()
+            transformation_class = self._get_class(name)
+            if transformation_class is None:
+                print(f"Erreur chargement {name}: classe introuvable")
+                return None
+            instance = transformation_class()
+            if hasattr(instance, "setup"):
+                instance.setup()
         except Exception as e:
             print(f"Erreur instanciation {name}: {e}")
             return None
 
+        if getattr(instance, "reusable", False):
+            pool[name] = instance
+            with self._pool_lock:
+                self._pooled_instances.append(instance)
+        return instance
+
+    def release_transformation(self, instance) -> None:
+        """Libere une instance obtenue par get_transformation (sans effet si elle est en pool)."""
+        if instance is None or getattr(instance, "reusable", False):
+            return
+        self._teardown_instance(instance)
+
+    def shutdown(self) -> None:
+        """Appelle teardown() sur toutes les instances en pool, tous threads confondus."""
+        with self._pool_lock:
+            instances = self._pooled_instances
+            self._pooled_instances = []
+        for instance in instances:
+            self._teardown_instance(instance)
+        # Un nouveau threading.local vide d'un coup les pools de tous les threads
+        self._pool_local = threading.local()
+
+    def _get_thread_pool(self) -> Dict[str, Any]:
+        """Retourne le pool d'instances du thread courant."""
+        pool = getattr(self._pool_local, "instances", None)
+        if pool is None:
+            pool = self._pool_local.instances = {}
+        return pool
+
+    def _teardown_instance(self, instance) -> None:
+        """Appelle teardown() en ignorant les erreurs du plugin."""
+        if not hasattr(instance, "teardown"):
+            return
+        try:
+            instance.teardown()
+        except Exception as e:
+            print(f"Avertissement: teardown de {type(instance).__name__} en echec: {e}")
+
     def get_transformation_metadata(self, name: Optional[str] = None) -> Dict:
         """Retourne les metadonnees."""
         if name:
             return self.metadata_cache.get(name, {})
         return self.metadata_cache.copy()
+
+    def get_prefilter(self, name: str) -> Optional[Prefilter]:
+        """
+        Prefiltre d'applicabilite d'un plugin, lu depuis le manifeste (sans
+        importer le module). None si le plugin n'en declare pas.
+        """
+        if name not in self._prefilters:
+            entry = self.loaded_transformations.get(name) or {}
+            data = entry.get("prefilter")
+            try:
+                self._prefilters[name] = Prefilter.from_dict(data) if data else None
+            except (TypeError, ValueError) as e:
+                print(f"Avertissement: prefiltre invalide pour {name}: {e}")
+                self._prefilters[name] = None
+        return self._prefilters[name]
+
+    def supports_rules(self, name: str) -> bool:
+        """Indique, d'apres le manifeste, si le plugin expose une regle (make_rule)."""
+        return bool((self.loaded_transformations.get(name) or {}).get("rules"))
+
+    def is_loaded(self, name: str) -> bool:
+        """Indique si le module d'un plugin a deja ete importe."""
+        return name in self._classes
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Ecriture atomique et journalisee des fichiers transformes
+=========================================================
+
+Chaque fichier est ecrit dans un fichier temporaire du meme repertoire,
+synchronise sur disque (fsync) puis substitue a l'original par os.replace :
+un crash en cours d'execution laisse soit l'ancienne, soit la nouvelle version,
+jamais un fichier a moitie ecrit.
+
+Avant toute ecriture, le journal du run enregistre pour chaque fichier le hash
+de son contenu original et de son nouveau contenu ; les contenus originaux sont
+conserves une seule fois (compresses, adresses par leur hash). Un run complet
+peut ainsi etre annule avec rollback_run(). Les chemins sont journalises en
+absolu : l'annulation ne depend pas du repertoire courant.
+
+Seuls les KEEP_RUNS journaux les plus recents sont gardes (prune_runs(), appele
+au debut de chaque run) ; un run annule entierement perd son journal. Les
+contenus originaux qui ne sont plus cites par aucun journal sont supprimes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.cache_utils import get_cache_dir
+
+JOURNAL_SUBDIR = "journals"
+
+# Nombre de journaux de runs conserves
+KEEP_RUNS = 50
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_text(content: str, encoding: str = "utf-8") -> bytes:
+    """Encode un texte comme le ferait open(..., "w") (fins de ligne natives)."""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode(encoding)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Ecrit des octets de maniere atomique (fichier temporaire + fsync + os.replace).
+    Les permissions du fichier existant sont conservees.
+    """
+    path = Path(path)
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(path.parent)
+
+
+def atomic_write_text(path: Path, content: str, encoding: str = "utf-8") -> None:
+    """Version texte de atomic_write_bytes."""
+    atomic_write_bytes(path, encode_text(content, encoding))
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Synchronise l'entree de repertoire (POSIX uniquement, ignore ailleurs)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteBackJournal:
+    """
+    Journal d'un run : une ligne JSON par fichier ecrit.
+
+    Format d'une ligne : {"path", "original", "new"} ou original/new sont les
+    sha256 du contenu avant/apres (original vaut null pour un fichier cree).
+    La premiere ligne est un en-tete decrivant le run.
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        journal_dir: Optional[Path] = None,
+        description: str = "",
+    ):
+        self.journal_dir = Path(journal_dir) if journal_dir else get_cache_dir(JOURNAL_SUBDIR)
+        self.blobs_dir = self.journal_dir / "blobs"
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+        self.path = self.journal_dir / f"{self.run_id}.jsonl"
+        self.description = description
+        self.entries = 0
+
+    def record_batch(self, records: List[Dict]) -> None:
+        """
+        Enregistre un lot d'ecritures a venir (write-ahead) et le synchronise.
+
+        Chaque record contient path, original (octets ou None) et new (octets).
+        """
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        lines = []
+        if self.entries == 0 and not self.path.exists():
+            prune_runs(KEEP_RUNS - 1, self.journal_dir)
+            header = {
+                "run_id": self.run_id,
+                "description": self.description,
+                "started": datetime.now().isoformat(),
+            }
+            lines.append(json.dumps(header))
+
+        blobs = {}
+        for record in records:
+            original_hash = None
+            if record["original"] is not None:
+                original_hash = _sha256(record["original"])
+                blobs[original_hash] = record["original"]
+            lines.append(
+                json.dumps(
+                    {
+                        "path": str(Path(record["path"]).resolve()),
+                        "original": original_hash,
+                        "new": _sha256(record["new"]),
+                    }
+                )
+            )
+
+        # Le journal est ecrit avant les contenus : un contenu n'existe jamais
+        # sans journal qui le cite (voir collect_blobs)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for digest, data in blobs.items():
+            self._store_blob(digest, data)
+        self.entries += len(records)
+
+    def _store_blob(self, digest: str, data: bytes) -> None:
+        """Conserve un contenu original (une seule copie par hash)."""
+        blob_path = self.blobs_dir / f"{digest}.z"
+        if blob_path.exists():
+            return
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(blob_path, zlib.compress(data))
+
+    def read_blob(self, digest: str) -> bytes:
+        with open(self.blobs_dir / f"{digest}.z", "rb") as f:
+            return zlib.decompress(f.read())
+
+    def remove(self) -> None:
+        """Supprime le journal (les contenus originaux restent jusqu'a collect_blobs)."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def read_entries(self) -> List[Dict]:
+        """Retourne les entrees fichier du journal (sans l'en-tete)."""
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    # Derniere ligne tronquee par un crash : ignoree
+                    continue
+                if "path" in data:
+                    entries.append(data)
+        return entries
+
+
+class AtomicWriteBack:
+    """
+    Etape d'ecriture des resultats d'un run.
+
+    Les contenus transformes sont mis en attente avec stage() puis ecrits par
+    lots : journalisation du lot, puis ecriture atomique de chaque fichier.
+    Les fichiers dont le contenu ne change pas ne sont jamais reecrits.
+    """
+
+    def __init__(
+        self,
+        journal: Optional[WriteBackJournal] = None,
+        batch_size: int = 50,
+        encoding: str = "utf-8",
+    ):
+        self.journal = journal
+        self.batch_size = max(1, batch_size)
+        self.encoding = encoding
+        self.pending = []
+        self.errors = []
+        self.stats = {"written": 0, "unchanged": 0, "failed": 0}
+
+    def stage(self, path, new_content: str, original_content: Optional[str] = None) -> bool:
+        """
+        Met en attente l'ecriture d'un fichier.
+
+        Returns:
+            bool: False si le contenu est identique a l'original (rien a ecrire)
+        """
+        if original_content is not None and new_content == original_content:
+            self.stats["unchanged"] += 1
+            return False
+
+        self.pending.append((Path(path), new_content))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self) -> List[str]:
+        """
+        Ecrit le lot en attente. Retourne les erreurs de ce lot (toutes les
+        erreurs du run restent disponibles dans self.errors).
+        """
+        if not self.pending:
+            return []
+
+        batch, self.pending = self.pending, []
+        records = []
+        errors = []
+        for path, content in batch:
+            new_data = encode_text(content, self.encoding)
+            try:
+                original = path.read_bytes()
+            except FileNotFoundError:
+                original = None
+            except OSError as e:
+                errors.append(f"{path}: lecture impossible ({e})")
+                self.stats["failed"] += 1
+                continue
+            if original == new_data:
+                self.stats["unchanged"] += 1
+                continue
+            records.append({"path": path, "original": original, "new": new_data})
+
+        if self.journal is not None and records:
+            self.journal.record_batch(records)
+
+        for record in records:
+            try:
+                atomic_write_bytes(record["path"], record["new"])
+                self.stats["written"] += 1
+            except OSError as e:
+                errors.append(f"{record['path']}: ecriture impossible ({e})")
+                self.stats["failed"] += 1
+        self.errors.extend(errors)
+        return errors
+
+    def close(self) -> List[str]:
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # En cas d'exception, le lot en attente n'est pas ecrit
+        if exc_type is None:
+            self.flush()
+        else:
+            self.pending = []
+        return False
+
+
+def rollback_run(
+    run_id: str, journal_dir: Optional[Path] = None, force: bool = False
+) -> Dict[str, List[str]]:
+    """
+    Annule un run en restaurant les contenus originaux, du dernier au premier.
+
+    Un fichier modifie depuis le run (hash different du nouveau contenu
+    journalise) n'est pas restaure, sauf si force=True.
+    """
+    journal = WriteBackJournal(run_id=run_id, journal_dir=journal_dir)
+    result = {"restored": [], "deleted": [], "skipped": [], "errors": []}
+
+    for entry in reversed(journal.read_entries()):
+        path = Path(entry["path"])
+        try:
+            current = path.read_bytes() if path.exists() else None
+            if not force and (current is None or _sha256(current) != entry["new"]):
+                result["skipped"].append(str(path))
+                continue
+
+            if entry["original"] is None:
+                # Fichier cree par le run
+                if path.exists():
+                    path.unlink()
+                result["deleted"].append(str(path))
+            else:
+                atomic_write_bytes(path, journal.read_blob(entry["original"]))
+                result["restored"].append(str(path))
+        except OSError as e:
+            result["errors"].append(f"{path}: {e}")
+
+    if not result["skipped"] and not result["errors"]:
+        # Run entierement annule : son journal et ses contenus ne servent plus
+        journal.remove()
+        collect_blobs(journal.journal_dir)
+    return result
+
+
+def list_runs(journal_dir: Optional[Path] = None) -> List[str]:
+    """Liste les identifiants des runs journalises, du plus recent au plus ancien."""
+    directory = Path(journal_dir) if journal_dir else get_cache_dir(JOURNAL_SUBDIR)
+    if not directory.exists():
+        return []
+    return sorted((p.stem for p in directory.glob("*.jsonl")), reverse=True)
+
+
+def prune_runs(keep: int = KEEP_RUNS, journal_dir: Optional[Path] = None) -> List[str]:
+    """
+    Supprime les journaux au-dela des `keep` plus recents (date de
+    modification), puis les contenus originaux orphelins. Retourne les
+    identifiants des runs supprimes.
+    """
+    directory = Path(journal_dir) if journal_dir else get_cache_dir(JOURNAL_SUBDIR)
+    journals = []
+    for path in directory.glob("*.jsonl"):
+        try:
+            journals.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    journals.sort(reverse=True)
+    removed = []
+    for _, path in journals[max(0, keep) :]:
+        try:
+            path.unlink()
+            removed.append(path.stem)
+        except OSError:
+            continue
+    if removed:
+        collect_blobs(directory)
+    return removed
+
+
+def collect_blobs(journal_dir: Optional[Path] = None) -> int:
+    """Supprime les contenus originaux cites par aucun journal. Retourne leur nombre."""
+    directory = Path(journal_dir) if journal_dir else get_cache_dir(JOURNAL_SUBDIR)
+    blobs_dir = directory / "blobs"
+    if not blobs_dir.exists():
+        return 0
+    cited = set()
+    for path in directory.glob("*.jsonl"):
+        for entry in WriteBackJournal(run_id=path.stem, journal_dir=directory).read_entries():
+            if entry.get("original"):
+                cited.add(entry["original"])
+    removed = 0
+    for blob in blobs_dir.glob("*.z"):
+        if blob.stem in cited:
+            continue
+        try:
+            blob.unlink()
+            removed += 1
+        except OSError:
+            continue
+    return removed
@@ -27,105 +27,112 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from core import mypy_daemon
+from core.ruff_integration import ruff_runner
+from core.ruff_integration.issue_store import IssueStore
+from core.tool_probe import ToolNotFoundError
+from gui.widgets.diagnostics_table import DiagnosticsTableWidget
+
+# Fichiers par appel de Ruff : les diagnostics s'affichent au fil des paquets
+STREAM_CHUNK_FILES = 200
+
 
 class RuffWorker(QThread):
-    """Worker pour executer Ruff en arriere-plan."""
+    """
+    Worker pour executer Ruff en arriere-plan.
+
+    La selection est passee a Ruff en quelques gros paquets (un seul appel pour
+    la plupart des selections) ; les diagnostics JSON sont redistribues par
+    fichier. Ils sont emis par paquet (diagnostics_batch) et ranges au fil de
+    l'eau dans `store` ; le signal final ne porte que des compteurs.
+    """
 
     progress = Signal(str)
     finished = Signal(dict)
     file_progress = Signal(int, int)  # current, total
+    diagnostics_batch = Signal(dict)  # {fichier: diagnostics} pour chaque paquet
 
-    def __init__(self, files, command="check", auto_fix=False):
+    def __init__(self, files, command="check", auto_fix=False, use_cache=True):
         super().__init__()
         self.files = files
         self.command = command
         self.auto_fix = auto_fix  # Nouveau parametre pour --fix
+        self.use_cache = use_cache  # Diagnostics des fichiers inchanges servis par le cache
+        self.store = IssueStore()  # Diagnostics du run, en colonnes
 
     def run(self):
         """Execute Ruff sur les fichiers."""
-        results = {"files": [], "total_issues": 0, "fixed_issues": 0}
+        results = {
+            "files_analyzed": 0,
+            "total_issues": 0,
+            "fixed_files": 0,
+            "formatted": 0,
+            "failed": 0,
+        }
         total_files = len(self.files)
 
-        for index, file in enumerate(self.files, 1):
-            self.file_progress.emit(index, total_files)
-            self.progress.emit(f"Analyse de {os.path.basename(file)}... ({index}/{total_files})")
-
-            try:
-                if self.command == "check":
-                    # Construire la commande avec ou sans --fix
-                    cmd = ["ruff", "check", file]
-                    if self.auto_fix:
-                        cmd.append("--fix")
-
-                    # Premiere execution pour obtenir les stats
-                    result = subprocess.run(
-                        [*cmd, "--format", "json"],
-                        capture_output=True,
-                        text=True,
-                        timeout=30,
-                    )
-
-                    file_result = {
-                        "file": file,
-                        "output": result.stdout,
-                        "errors": result.stderr,
-                        "fixed": self.auto_fix,
-                    }
-
-                    # Compter les issues
-                    try:
-                        if result.stdout.strip():
-                            issues = json.loads(result.stdout)
-                            if isinstance(issues, list):
-                                results["total_issues"] += len(issues)
-                    except json.JSONDecodeError:
-                        pass
-
-                    # Si on a fait un fix, obtenir le nombre de corrections
-                    if self.auto_fix and result.returncode == 0:
-                        # Ruff retourne 0 si des corrections ont ete appliquees
-                        file_result["fix_status"] = "success"
-                        # Compter approximativement les corrections
-                        if "Fixed" in result.stderr:
-                            # Extraire le nombre si possible
-                            results["fixed_issues"] += 1
-
-                    results["files"].append(file_result)
-
-                elif self.command == "format":
-                    result = subprocess.run(
-                        ["ruff", "format", file],
-                        capture_output=True,
-                        text=True,
-                        timeout=30,
-                    )
-                    results["files"].append(
-                        {
-                            "file": file,
-                            "formatted": result.returncode == 0,
-                            "output": result.stdout,
-                        }
-                    )
-
-            except subprocess.TimeoutExpired:
-                results["files"].append({"file": file, "error": "Timeout (>30s)"})
-            except Exception as e:
-                results["files"].append({"file": file, "error": str(e)})
+        try:
+            if self.command == "check":
+                cache = ruff_runner.open_diagnostics_cache() if self.use_cache else None
+                chunks = ruff_runner.iter_check(
+                    self.files, fix=self.auto_fix, cache=cache, max_files=STREAM_CHUNK_FILES
+                )
+            else:
+                chunks = ruff_runner.iter_format(self.files, max_files=STREAM_CHUNK_FILES)
+
+            for chunk, chunk_results in chunks:
+                batch = {}
+                for file in chunk:
+                    file_result = chunk_results[file]
+                    if file_result["error"]:
+                        results["failed"] += 1
+                    if self.command == "check":
+                        if file_result["diagnostics"]:
+                            batch[file] = file_result["diagnostics"]
+                            self.store.add(file, file_result["diagnostics"])
+                        results["total_issues"] += len(file_result["diagnostics"])
+                        results["fixed_files"] += bool(file_result["fixed"])
+                    elif file_result["formatted"]:
+                        results["formatted"] += 1
+
+                if batch:
+                    self.diagnostics_batch.emit(batch)
+
+                results["files_analyzed"] += len(chunk)
+                done = results["files_analyzed"]
+                self.file_progress.emit(done, total_files)
+                self.progress.emit(f"Ruff {self.command}: {done}/{total_files} fichier(s)")
+
+            if self.command == "check" and cache is not None:
+                results["cache_hits"] = cache.hits
+                results["cache_misses"] = cache.misses
+
+        except ToolNotFoundError:
+            self.progress.emit("[X] Ruff non installe. Installez avec: pip install ruff")
+        except Exception as e:
+            self.progress.emit(f"[X] Erreur Ruff: {e}")
 
         self.finished.emit(results)
 
 
 class MypyWorker(QThread):
-    """Worker pour executer mypy en arriere-plan."""
+    """
+    Worker pour executer mypy en arriere-plan.
+
+    Avec dmypy installe, la selection est envoyee en une requete a un demon
+    par racine de projet (etat incremental garde entre les clics) ; sinon
+    mypy est lance a froid fichier par fichier.
+    """
 
     progress = Signal(str)
     finished = Signal(dict)
     file_progress = Signal(int, int)
 
-    def __init__(self, files, strict_mode=False):
+    def __init__(self, files, strict_mode=False, use_daemon=True):
         super().__init__()
         self.files = files
         self.strict_mode = strict_mode
+        self.use_daemon = use_daemon
 
     def run(self):
         """Execute mypy sur les fichiers."""
@@ -135,6 +142,55 @@ class MypyWorker(QThread):
             "total_warnings": 0,
             "total_notes": 0,
         }
+
+        if self.use_daemon and mypy_daemon.dmypy_available():
+            self._run_daemon(results)
+        else:
+            self._run_cold(results)
+
+        self.finished.emit(results)
+
+    def _run_daemon(self, results):
+        """Une requete dmypy par racine de projet pour toute la selection."""
+        flags = ["--strict"] if self.strict_mode else []
+        total_files = len(self.files)
+        done = 0
+
+        for root, files in mypy_daemon.group_by_root(self.files).items():
+            self.progress.emit(
+                f"Verification des types (dmypy) de {len(files)} fichier(s) dans {root}..."
+            )
+            try:
+                result = mypy_daemon.get_daemon(root, flags).check(files)
+            except subprocess.TimeoutExpired:
+                results["files"].extend({"file": file, "error": "Timeout dmypy"} for file in files)
+                continue
+            except Exception as e:
+                results["files"].extend({"file": file, "error": str(e)} for file in files)
+                continue
+
+            # 0 : aucun probleme, 1 : erreurs de types, 2 : echec du demon
+            if result.returncode >= 2:
+                self.progress.emit(f"[X] dmypy: {result.stderr.strip() or result.stdout.strip()}")
+
+            for file, file_result in mypy_daemon.split_output(result.stdout, files, root).items():
+                results["files"].append(
+                    {
+                        "file": file,
+                        "output": file_result["output"],
+                        "errors": result.stderr if result.returncode >= 2 else "",
+                        "return_code": result.returncode,
+                    }
+                )
+                results["total_errors"] += file_result["errors"]
+                results["total_warnings"] += file_result["warnings"]
+                results["total_notes"] += file_result["notes"]
+
+            done += len(files)
+            self.file_progress.emit(done, total_files)
+
+    def _run_cold(self, results):
+        """Un appel mypy a froid par fichier (dmypy absent)."""
         total_files = len(self.files)
 
         for index, file in enumerate(self.files, 1):
@@ -144,13 +200,7 @@ class MypyWorker(QThread):
             )
 
             try:
-                cmd = [
-                    "mypy",
-                    "--no-error-summary",
-                    "--show-column-numbers",
-                    "--no-pretty",
-                    "--show-error-codes",
-                ]
+                cmd = ["mypy", *mypy_daemon.MYPY_OUTPUT_FLAGS]
 
                 if self.strict_mode:
                     cmd.append("--strict")
@@ -185,8 +235,6 @@ class MypyWorker(QThread):
             except Exception as e:
                 results["files"].append({"file": file, "error": str(e)})
 
-        self.finished.emit(results)
-
 
 class RuffIntegrationTab(QWidget):
     """Onglet d'integration Ruff avec selection recursive et auto-fix."""
@@ -196,6 +244,7 @@ class RuffIntegrationTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.last_analysis_data = {}
+        self.issue_store = IssueStore()  # Diagnostics de la derniere analyse Ruff
         self.current_worker = None
         self.setup_ui()
         self.check_tools_availability()
@@ -375,11 +424,18 @@ class RuffIntegrationTab(QWidget):
         right_panel = QGroupBox("Resultats")
         right_layout = QVBoxLayout(right_panel)
 
-        # Zone de texte pour les resultats
+        # Table des diagnostics (remplie au fil des paquets) au-dessus du journal
+        results_splitter = QSplitter(Qt.Vertical)
+        self.diagnostics_table = DiagnosticsTableWidget()
+        results_splitter.addWidget(self.diagnostics_table)
+
+        # Zone de texte pour le journal
         self.output_text = QTextEdit()
         self.output_text.setReadOnly(True)
         self.output_text.setFont(self.font())
-        right_layout.addWidget(self.output_text)
+        results_splitter.addWidget(self.output_text)
+        results_splitter.setSizes([400, 200])
+        right_layout.addWidget(results_splitter)
 
         # NOUVEAU: Bouton Copy to clipboard
         copy_layout = QHBoxLayout()
@@ -428,12 +484,18 @@ class RuffIntegrationTab(QWidget):
         self.mypy_strict_btn.clicked.connect(self.run_mypy_strict)
         self.copy_btn.clicked.connect(self.copy_to_clipboard)
 
+    def shutdown(self):
+        """Arrete les demons dmypy lances par l'onglet (fermeture)."""
+        if self.current_worker and self.current_worker.isRunning():
+            self.current_worker.wait(5000)
+        mypy_daemon.shutdown_all()
+
     def check_tools_availability(self):
-        """Verifie si Ruff est installe."""
+        """Verifie si Ruff est installe (sondage mis en cache)."""
         try:
-            result = subprocess.run(["ruff", "--version"], capture_output=True, text=True)
-            self.log_message(f"[OK] Ruff disponible: {result.stdout.strip()}")
-        except (FileNotFoundError, subprocess.SubprocessError, Exception):
+            info = ruff_runner.ruff_info()
+            self.log_message(f"[OK] Ruff disponible: {info['version']} ({info['path']})")
+        except ToolNotFoundError:
             self.log_message("[X] Ruff non installe. Installez avec: pip install ruff")
             self.check_btn.setEnabled(False)
             self.check_fix_btn.setEnabled(False)
@@ -467,23 +529,7 @@ class RuffIntegrationTab(QWidget):
 
         self.log_message(f"Recherche des fichiers Python dans: {folder}")
 
-        py_files = []
-        excluded_dirs = {
-            ".venv",
-            "venv",
-            "__pycache__",
-            ".git",
-            "node_modules",
-            ".ruff_cache",
-        }
-
-        for root, dirs, files in os.walk(folder):
-            dirs[:] = [d for d in dirs if d not in excluded_dirs]
-
-            for file in files:
-                if file.endswith(".py"):
-                    full_path = os.path.join(root, file)
-                    py_files.append(full_path)
+        py_files = ruff_runner.collect_python_files(folder)
 
         added_count = 0
         for file_path in py_files:
@@ -562,9 +608,11 @@ class RuffIntegrationTab(QWidget):
         self.log_message(f"Demarrage de l'analyse sur {len(files)} fichier(s)...")
         self.log_message("[INFO] Mode: Diagnostic seulement (pas de correction)")
 
+        self.diagnostics_table.clear()
         self.current_worker = RuffWorker(files, "check", auto_fix=False)
         self.current_worker.progress.connect(self.log_message)
         self.current_worker.file_progress.connect(self.update_progress)
+        self.current_worker.diagnostics_batch.connect(self.diagnostics_table.add_diagnostics)
         self.current_worker.finished.connect(self.on_check_finished)
         self.current_worker.start()
 
@@ -593,9 +641,11 @@ class RuffIntegrationTab(QWidget):
         self.log_message(f"Demarrage de l'analyse avec correction sur {len(files)} fichier(s)...")
         self.log_message("[INFO] Mode: Analyse et correction automatique (--fix)")
 
+        self.diagnostics_table.clear()
         self.current_worker = RuffWorker(files, "check", auto_fix=True)
         self.current_worker.progress.connect(self.log_message)
         self.current_worker.file_progress.connect(self.update_progress)
+        self.current_worker.diagnostics_batch.connect(self.diagnostics_table.add_diagnostics)
         self.current_worker.finished.connect(self.on_check_fix_finished)
         self.current_worker.start()
 
@@ -661,53 +711,73 @@ class RuffIntegrationTab(QWidget):
         """Traite les resultats de l'analyse SANS fix."""
         self.show_progress(False)
 
+        store = self.issue_store = self.current_worker.store
         self.last_analysis_data = {
             "timestamp": datetime.now().isoformat(),
             "total_issues": results["total_issues"],
-            "files_analyzed": len(results["files"]),
-            "results": results,
+            "files_analyzed": results["files_analyzed"],
+            "categories": store.count_by_category(),
+            "severity_summary": store.severity_summary(),
+            "rules": store.count_by_code(),
         }
 
         self.log_message(f"\n{'=' * 50}")
         self.log_message("ANALYSE TERMINEE (Diagnostic)")
-        self.log_message(f"Fichiers analyses: {len(results['files'])}")
+        self.log_message(f"Fichiers analyses: {results['files_analyzed']}")
         self.log_message(f"Problemes trouves: {results['total_issues']}")
+        for category, count in sorted(store.count_by_category().items(), key=lambda c: -c[1]):
+            self.log_message(f"  {category}: {count}")
+        if results["failed"]:
+            self.log_message(f"[X] {results['failed']} fichier(s) non analyse(s)")
+        cache_text = self.format_cache_stats(results)
+        if cache_text:
+            self.log_message(f"Cache: {cache_text}")
 
         if results["total_issues"] > 0:
             self.log_message("[TIP] Utilisez 'Analyser et Fix' pour corriger automatiquement")
 
         self.stats_label.setText(
-            f"Statistiques: {len(results['files'])} fichiers, {results['total_issues']} probleme(s)"
+            f"Statistiques: {results['files_analyzed']} fichiers, "
+            f"{results['total_issues']} probleme(s)"
+            + (f", cache {cache_text}" if cache_text else "")
         )
 
         if results["total_issues"] > 0:
             self.ai_plan_ready.emit(self.last_analysis_data)
             self.log_message("[DATA] Donnees pretes pour generation du plan IA")
 
+    def format_cache_stats(self, results):
+        """Texte du taux de succes du cache de diagnostics (vide sans cache)."""
+        hits = results.get("cache_hits", 0)
+        total = hits + results.get("cache_misses", 0)
+        if not total:
+            return ""
+        return f"{hits}/{total} fichier(s) inchange(s) ({100 * hits / total:.0f}%)"
+
     def on_check_fix_finished(self, results):
         """NOUVEAU: Traite les resultats de l'analyse AVEC fix."""
         self.show_progress(False)
 
+        store = self.issue_store = self.current_worker.store
+        fixed_files = results["fixed_files"]
         self.last_analysis_data = {
             "timestamp": datetime.now().isoformat(),
             "total_issues": results["total_issues"],
-            "fixed_issues": results.get("fixed_issues", 0),
-            "files_analyzed": len(results["files"]),
-            "results": results,
+            "fixed_files": fixed_files,
+            "files_analyzed": results["files_analyzed"],
+            "rules": store.count_by_code(),
         }
 
         self.log_message(f"\n{'=' * 50}")
         self.log_message("ANALYSE ET CORRECTION TERMINEE")
-        self.log_message(f"Fichiers traites: {len(results['files'])}")
+        self.log_message(f"Fichiers traites: {results['files_analyzed']}")
         self.log_message(f"Problemes restants: {results['total_issues']}")
 
-        # Compter les fichiers corriges
-        fixed_files = sum(1 for f in results["files"] if f.get("fixed"))
         if fixed_files > 0:
             self.log_message(f"[OK] {fixed_files} fichier(s) corrige(s) avec succes")
 
         self.stats_label.setText(
-            f"Statistiques: {len(results['files'])} fichiers traites, "
+            f"Statistiques: {results['files_analyzed']} fichiers traites, "
             f"{fixed_files} corrige(s), "
             f"{results['total_issues']} probleme(s) restant(s)"
         )
@@ -721,8 +791,8 @@ class RuffIntegrationTab(QWidget):
         """Traite les resultats du formatage."""
         self.show_progress(False)
 
-        success = sum(1 for r in results["files"] if r.get("formatted", False))
-        failed = len(results["files"]) - success
+        success = results["formatted"]
+        failed = results["failed"]
 
         self.log_message(f"\n{'=' * 50}")
         self.log_message("FORMATAGE TERMINE")
@@ -749,8 +819,10 @@ class RuffIntegrationTab(QWidget):
             return
 
         try:
+            # Diagnostics serialises seulement a l'export (forme compacte du store)
+            export = {**self.last_analysis_data, "issues": self.issue_store.to_dict()}
             with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(self.last_analysis_data, f, indent=2)
+                json.dump(export, f, indent=2)
 
             self.log_message(f"[OK] Resultats exportes: {file_path}")
         except Exception as e:
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Table des diagnostics Ruff (modele/vue Qt)
+==========================================
+
+Les diagnostics arrivent par paquets (un signal par paquet de fichiers) et sont
+ajoutes a un modele de table leger : chaque ligne est un tuple compact et la
+vue Qt ne dessine que les lignes visibles. Le tri et le filtre passent par un
+QSortFilterProxyModel, sans reconstruire de texte.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+# Colonnes affichees : (titre, cle du tuple de ligne)
+COLUMNS = ("Fichier", "Ligne", "Col", "Code", "Message", "Fix")
+COL_FILE, COL_LINE, COL_COLUMN, COL_CODE, COL_MESSAGE, COL_FIX = range(len(COLUMNS))
+
+# Nombre maximal de lignes gardees en memoire (les suivantes sont seulement comptees)
+DEFAULT_MAX_ROWS = 50_000
+
+Row = Tuple[str, int, int, str, str, bool]
+
+
+def diagnostic_rows(file: str, diagnostics: Iterable[Dict]) -> List[Row]:
+    """Convertit les diagnostics JSON de Ruff d'un fichier en lignes compactes."""
+    rows = []
+    for diagnostic in diagnostics:
+        location = diagnostic.get("location") or {}
+        rows.append(
+            (
+                file,
+                location.get("row") or 0,
+                location.get("column") or 0,
+                # Les erreurs de syntaxe n'ont pas de code
+                diagnostic.get("code") or "syntax",
+                diagnostic.get("message", ""),
+                diagnostic.get("fix") is not None,
+            )
+        )
+    return rows
+
+
+class DiagnosticsTableModel(QAbstractTableModel):
+    """Modele de table alimente par paquets de lignes."""
+
+    def __init__(self, parent=None, max_rows: int = DEFAULT_MAX_ROWS):
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self.dropped = 0
+        self._rows: List[Row] = []
+
+    def rowCount(self, parent=QModelIndex()):  # noqa: B008 - signature Qt
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):  # noqa: B008 - signature Qt
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == COL_FIX:
+                return "oui" if row[COL_FIX] else ""
+            return row[column]
+        if role == Qt.UserRole:
+            # Valeur brute pour le tri (numerique pour ligne/colonne)
+            return row[column]
+        if role == Qt.ToolTipRole and column in (COL_FILE, COL_MESSAGE):
+            return row[column]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def append_rows(self, rows: List[Row]) -> None:
+        """Ajoute un paquet de lignes (au-dela de max_rows, elles sont seulement comptees)."""
+        room = self.max_rows - len(self._rows)
+        if room < len(rows):
+            self.dropped += len(rows) - max(room, 0)
+            rows = rows[: max(room, 0)]
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """Vide le modele."""
+        self.beginResetModel()
+        self._rows = []
+        self.dropped = 0
+        self.endResetModel()
+
+    def total(self) -> int:
+        """Nombre de diagnostics recus (affiches + ignores)."""
+        return len(self._rows) + self.dropped
+
+
+class DiagnosticsFilterProxy(QSortFilterProxyModel):
+    """Tri sur les valeurs brutes et filtre texte sur fichier, code et message."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.UserRole)
+        self._needle = ""
+
+    def set_filter_text(self, text: str) -> None:
+        self._needle = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._needle:
+            return True
+        row = self.sourceModel()._rows[source_row]
+        return any(
+            self._needle in str(row[column]).lower() for column in (COL_FILE, COL_CODE, COL_MESSAGE)
+        )
+
+
+class DiagnosticsTableWidget(QWidget):
+    """Vue triable et filtrable des diagnostics, alimentee par add_diagnostics()."""
+
+    def __init__(self, parent=None, max_rows: Optional[int] = None):
+        super().__init__(parent)
+        self.model = DiagnosticsTableModel(self, max_rows or DEFAULT_MAX_ROWS)
+        self.proxy = DiagnosticsFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filtrer (fichier, code, message)...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.count_label = QLabel("0 diagnostic(s)")
+        self.count_label.setStyleSheet("color: gray; font-size: 10px;")
+        filter_layout.addWidget(self.filter_edit)
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setSortingEnabled(True)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.view.verticalHeader().setVisible(False)
+        # Hauteur de ligne fixe : la vue ne mesure pas chaque ligne
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.horizontalHeader().setSectionResizeMode(COL_MESSAGE, QHeaderView.Stretch)
+        self.view.horizontalHeader().setStretchLastSection(False)
+        layout.addWidget(self.view)
+
+        self.filter_edit.textChanged.connect(self._on_filter_changed)
+
+    def add_diagnostics(self, batch: Dict[str, List[Dict]]) -> None:
+        """Ajoute un paquet {fichier: diagnostics} recu d'un worker."""
+        rows = []
+        for file, diagnostics in batch.items():
+            rows.extend(diagnostic_rows(file, diagnostics))
+        self.model.append_rows(rows)
+        self._update_count()
+
+    def clear(self) -> None:
+        """Vide la table (nouvelle analyse)."""
+        self.model.clear()
+        self._update_count()
+
+    def _on_filter_changed(self, text):
+        self.proxy.set_filter_text(text)
+        self._update_count()
+
+    def _update_count(self):
+        shown = self.proxy.rowCount()
+        text = f"{shown}/{self.model.rowCount()} diagnostic(s)"
+        if self.model.dropped:
+            text += f" ({self.model.dropped} non affiche(s), limite {self.model.max_rows})"
+        self.count_label.setText(text)
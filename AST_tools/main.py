@@ -44,6 +44,9 @@ from core.global_logger import log_end, log_start
 
 # Imports Pydantic
 from core.models import TransformationPlanModel
+from core.ruff_integration.plan_builder import plan_from_store, save_generated_plan
+from core.run_report import RunReport
+from core.write_back import WriteBackJournal
 from professional_file_filter import ProfessionalFileFilter
 
 # Import pour l'integration Ruff
@@ -52,6 +55,9 @@ try:
 except ImportError:
     RuffIntegrationTab = None
 
+# Taille maximale du texte affiche dans le panneau d'apercu
+MAX_PREVIEW_CHARS = 200_000
+
 # Demarrage du log de l'execution
 log_start("AST_tools - Nouvelle execution")
 
@@ -78,29 +84,54 @@ class TransformationWorker(QThread):
 
             self.log_message.emit(f"Debut des transformations sur {total_files} fichier(s)")
 
-            for i, file_path in enumerate(self.target_files):
-                if self.is_cancelled:
-                    self.log_message.emit("Transformations annulees par l'utilisateur")
-                    break
+            # Un seul journal pour tout le run : annulable en une fois
+            journal = WriteBackJournal(description=os.path.basename(self.plan_path))
+            # Rapport cumule des fichiers (durees par plugin et par fichier)
+            rapport = RunReport(run_id=journal.run_id)
 
+            # Instructions generator : une seule fois pour tout le run
+            generation = self.orchestrateur.executer_generateurs(
+                self.plan_path, self.target_files, journal=journal
+            )
+            rapport.merge(generation)
+            for erreur in generation.errors:
+                self.log_message.emit(f"  [ECHEC] generation: {erreur}")
+            for resultat in generation.results:
+                self.log_message.emit(f"  [GENERE] {os.path.basename(resultat.file)}")
+
+            # Un seul appel pour tout le run : plan charge et outils verifies une
+            # fois, les wrappers traitent les fichiers par lots
+            def progression(file_path, erreurs, reussites):
+                self.stats["files_processed"] += 1
                 filename = os.path.basename(file_path)
-                progress = int(((i + 1) / total_files) * 100)
+                progress = int(self.stats["files_processed"] / total_files * 100)
                 self.progress_update.emit(progress, filename)
-
-                # Note: La methode executer_plan de l'orchestrateur devrait etre adaptee
-                # pour retourner un boolean de succes et des logs detailles.
-                # Pour l'instant, on suppose qu'elle modifie le fichier sur place.
-                success = self.orchestrateur.executer_plan(self.plan_path, [file_path])
-
-                self.stats["files_processed"] += 1
-                if success:
+                if reussites:
                     self.stats["files_successful"] += 1
                     self.log_message.emit(f"  [SUCCES] {filename}")
                 else:
                     self.stats["files_failed"] += 1
                     self.log_message.emit(f"  [ECHEC] {filename}")
+                return not self.is_cancelled
+
+            resultat = self.orchestrateur.executer_plan(
+                self.plan_path,
+                self.target_files,
+                journal=journal,
+                generateurs=False,
+                progression=progression,
+            )
+            rapport.merge(resultat)
+            if resultat.plan_error:
+                self.log_message.emit(f"  [ECHEC] {resultat.plan_error}")
+            if self.is_cancelled:
+                self.log_message.emit("Transformations annulees par l'utilisateur")
 
-                self.msleep(50)  # Petite pause pour la reactivite de l'UI
+            for ligne in rapport.summary_lines():
+                self.log_message.emit(ligne)
+            self.stats["slowest_plugins"] = rapport.slowest_steps()
+            self.stats["slowest_files"] = rapport.slowest_files()
+            self.stats["report"] = rapport.to_dict()
 
             if self.is_cancelled:
                 self.transformation_complete.emit(False, "Transformations annulees", self.stats)
@@ -115,6 +146,50 @@ class TransformationWorker(QThread):
         self.is_cancelled = True
 
 
+class PreviewWorker(QThread):
+    """Execute le plan en dry-run et emet le diff de chaque fichier modifie."""
+
+    file_diff_ready = Signal(str, str, int, int)  # chemin, diff, ajouts, suppressions
+    log_message = Signal(str)
+    preview_complete = Signal(dict)
+
+    def __init__(self, orchestrateur, plan_path, target_files, parent=None):
+        super().__init__(parent)
+        self.orchestrateur = orchestrateur
+        self.plan_path = plan_path
+        self.target_files = target_files
+        self.is_cancelled = False
+
+    def run(self):
+        summary = {"files": 0, "changed": 0, "added": 0, "removed": 0, "errors": 0}
+        try:
+            # Generateur paresseux : un seul fichier en memoire a la fois
+            for file_diff in self.orchestrateur.previsualiser_plan(
+                self.plan_path, self.target_files
+            ):
+                if self.is_cancelled:
+                    break
+                summary["files"] += 1
+                if file_diff.error:
+                    summary["errors"] += 1
+                    self.log_message.emit(
+                        f"  [ERREUR] {os.path.basename(file_diff.path)}: {file_diff.error}"
+                    )
+                elif file_diff.changed:
+                    summary["changed"] += 1
+                    summary["added"] += file_diff.added
+                    summary["removed"] += file_diff.removed
+                    self.file_diff_ready.emit(
+                        file_diff.path, file_diff.diff_text, file_diff.added, file_diff.removed
+                    )
+        except Exception as e:
+            self.log_message.emit(f"ERREUR CRITIQUE dans l'apercu: {e}")
+        self.preview_complete.emit(summary)
+
+    def cancel(self):
+        self.is_cancelled = True
+
+
 # --- Fenetre Principale ---
 class ASTMainWindow(QMainWindow):
     """Fenetre principale AST Tools en PySide6."""
@@ -127,6 +202,8 @@ class ASTMainWindow(QMainWindow):
         self.current_plan = None
         self.current_preview_file = None
         self.transformation_worker = None
+        self.preview_worker = None
+        self.preview_chars = 0
 
         self.setup_window()
         self.create_interface()
@@ -189,9 +266,15 @@ class ASTMainWindow(QMainWindow):
 
         action_layout = QHBoxLayout()
         self.validate_btn = QPushButton("Valider Plan")
+        self.preview_btn = QPushButton("Apercu (dry-run)")
+        self.preview_btn.setEnabled(False)
+        self.undo_btn = QPushButton("Annuler le dernier run")
+        self.undo_btn.setEnabled(False)
         self.execute_btn = QPushButton("EXECUTER TRANSFORMATIONS")
         self.execute_btn.setEnabled(False)
         action_layout.addWidget(self.validate_btn)
+        action_layout.addWidget(self.preview_btn)
+        action_layout.addWidget(self.undo_btn)
         action_layout.addStretch()
         action_layout.addWidget(self.execute_btn)
         main_layout.addLayout(action_layout)
@@ -302,6 +385,8 @@ class ASTMainWindow(QMainWindow):
         self.clear_files_btn.clicked.connect(self.clear_target_files)
         self.validate_btn.clicked.connect(self.validate_plan)
         self.execute_btn.clicked.connect(self.execute_transformations)
+        self.preview_btn.clicked.connect(self.start_preview)
+        self.undo_btn.clicked.connect(self.undo_last_run)
         self.files_list.currentItemChanged.connect(self.on_file_selection_changed)
         self.refresh_content_btn.clicked.connect(self.refresh_current_file_content)
 
@@ -419,6 +504,7 @@ class ASTMainWindow(QMainWindow):
     def update_execute_button(self):
         can_execute = bool(self.target_files and self.current_plan)
         self.execute_btn.setEnabled(can_execute)
+        self.preview_btn.setEnabled(can_execute)
 
     def validate_plan(self):
         # ... Logique de validation
@@ -448,6 +534,44 @@ class ASTMainWindow(QMainWindow):
         self.show_progress_interface(True)
         self.worker.start()
 
+    def start_preview(self):
+        """Lance le dry-run du plan et remplit le panneau d'apercu fichier par fichier."""
+        if not all([self.orchestrateur, self.current_plan, self.target_files]):
+            QMessageBox.warning(self, "Avertissement", "Plan ou fichiers manquants")
+            return
+
+        self.preview_text.clear()
+        self.preview_chars = 0
+        self.preview_btn.setEnabled(False)
+        self.preview_worker = PreviewWorker(
+            self.orchestrateur, self.plan_line_edit.text(), list(self.target_files)
+        )
+        self.preview_worker.file_diff_ready.connect(self.on_file_diff_ready)
+        self.preview_worker.log_message.connect(self.log_message)
+        self.preview_worker.preview_complete.connect(self.on_preview_complete)
+        self.preview_worker.start()
+
+    def on_file_diff_ready(self, path, diff_text, added, removed):
+        """Ajoute le diff d'un fichier a l'apercu (affichage borne en taille)."""
+        self.log_message(f"  [DIFF] {os.path.basename(path)}: +{added} -{removed}")
+        if self.preview_chars >= MAX_PREVIEW_CHARS:
+            return
+        remaining = MAX_PREVIEW_CHARS - self.preview_chars
+        if len(diff_text) > remaining:
+            diff_text = diff_text[:remaining] + "\n... (apercu tronque)\n"
+        self.preview_chars += len(diff_text)
+        self.preview_text.append(diff_text)
+
+    def on_preview_complete(self, summary):
+        self.update_execute_button()
+        report = (
+            f"Apercu: {summary['changed']}/{summary['files']} fichier(s) modifie(s), "
+            f"+{summary['added']} -{summary['removed']} ligne(s), {summary['errors']} erreur(s)"
+        )
+        self.log_message(report)
+        if summary["changed"] == 0:
+            self.preview_text.setPlainText("Aucune modification prevue par ce plan.")
+
     def show_progress_interface(self, show):
         self.progress_bar.setVisible(show)
         self.cancel_btn.setVisible(show)
@@ -466,6 +590,32 @@ class ASTMainWindow(QMainWindow):
         QMessageBox.information(self, "Termine", report)
         self.log_message("=== RAPPORT FINAL ===")
         self.log_message(report)
+        self.undo_btn.setEnabled(bool(self.orchestrateur and self.orchestrateur.dernier_run_id))
+
+    def undo_last_run(self):
+        """Restaure les fichiers ecrits par le dernier run a partir de son journal."""
+        if not self.orchestrateur or not self.orchestrateur.dernier_run_id:
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Confirmation",
+            f"Restaurer les fichiers du run {self.orchestrateur.dernier_run_id}?",
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        result = self.orchestrateur.annuler_execution()
+        self.undo_btn.setEnabled(False)
+        report = (
+            f"Restaures: {len(result['restored']) + len(result['deleted'])}, "
+            f"Ignores (modifies depuis): {len(result['skipped'])}, "
+            f"Erreurs: {len(result['errors'])}"
+        )
+        for error in result["errors"]:
+            self.log_message(f"  [ERREUR] {error}")
+        self.log_message(report)
+        self.refresh_current_file_content()
 
     def on_file_selection_changed(self, current_item, previous_item):
         if current_item:
@@ -495,16 +645,59 @@ class ASTMainWindow(QMainWindow):
 
     # ... (autres methodes comme refresh_plugins, etc.)
 
+    def closeEvent(self, event):
+        """Libere les plugins en pool et les demons dmypy avant de fermer la fenetre."""
+        if self.orchestrateur:
+            self.orchestrateur.fermer()
+        if getattr(self, "ruff_tab", None) is not None:
+            self.ruff_tab.shutdown()
+        super().closeEvent(event)
+
     def handle_ai_plan_ready(self, analysis_data):
         """Gere les donnees d'analyse Ruff pour generer un plan de transformation"""
         self.log_message("=" * 50)
         self.log_message("ANALYSE RUFF POUR IA COMPLETEE")
         self.log_message(f"Problemes detectes: {analysis_data['total_issues']}")
 
-        if analysis_data["total_issues"] > 0:
-            self.log_message("Donnees pretes pour generation du plan de transformation")
-            # Optionnel : basculer vers l'onglet Transformations
-            self.tab_widget.setCurrentIndex(0)
+        if analysis_data["total_issues"] == 0:
+            return
+
+        # Diagnostics ranges par l'onglet au fil de l'analyse (le signal ne porte que le resume)
+        resultat = plan_from_store(self.ruff_tab.issue_store)
+        if resultat is None:
+            self.log_message("Aucun probleme corrigeable automatiquement: pas de plan genere")
+            return
+
+        plan, cibles = resultat
+        # Meme plan : meme fichier ; les plus anciens sont supprimes
+        plan_path = str(save_generated_plan(plan, protected=self.plan_line_edit.text() or None))
+        self.log_message(f"Plan genere: {plan_path}")
+        for instruction in plan.transformations:
+            self.log_message(f"  - {instruction.description}")
+
+        reply = QMessageBox.question(
+            self,
+            "Plan Ruff",
+            f"Un plan de {len(plan.transformations)} instruction(s) a ete genere pour "
+            f"{len(cibles)} fichier(s).\n\nCharger ce plan a la place du plan actuel et "
+            "remplacer la liste des fichiers par ses fichiers cibles ?",
+        )
+        if reply != QMessageBox.Yes:
+            self.log_message("Plan genere non charge (disponible dans le cache des plans)")
+            return
+
+        # Le plan cible ses fichiers instruction par instruction : la liste ne
+        # contient que les fichiers concernes, traites en un seul run
+        self.target_files.clear()
+        self.files_list.clear()
+        for file_path in cibles:
+            self.target_files.append(file_path)
+            self.files_list.addItem(QListWidgetItem(os.path.basename(file_path)))
+
+        self.plan_line_edit.setText(plan_path)
+        self.load_plan_info(plan_path)
+        self.update_execute_button()
+        self.tab_widget.setCurrentIndex(0)
 
 
 def main():
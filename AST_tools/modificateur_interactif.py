@@ -2,20 +2,41 @@
 # FICHIER : modificateur_interactif.py (Version complete et corrigee)
 # ===================================================================
 import ast
+import inspect
 import json
 import os
 import sys
-from typing import List
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
 
 from pydantic import ValidationError
 
+from core.diff_engine import FileDiff
 from core.global_logger import (
     log_success,
     log_warning,
 )
 
 # Imports Pydantic
-from core.models import TransformationPlanModel
+from core.models import TARGET_FILES_PARAM, TransformationPlanModel
+from core.plugins.base.generation import (
+    GeneratedFile,
+    check_collisions,
+    render_items,
+    supports_generation,
+)
+from core.plugins.base.rule_dispatch import apply_rules
+from core.project_index import ProjectIndex
+from core.replacement_engine import get_replacer
+from core.run_report import RunReport, StepResult, text_size
+from core.symbol_index import get_symbol_index
+from core.tool_probe import ToolNotFoundError
+from core.write_back import AtomicWriteBack, WriteBackJournal, atomic_write_text, rollback_run
+
+# Nombre de fichiers transformes ensemble lors d'un apercu (dry-run)
+TAILLE_LOT_APERCU = 50
 
 # ... (Toute autre detection d'environnement que vous avez) ...
 print("*** Environnement Terminal detecte ***")
@@ -28,10 +49,12 @@ class AnalyseurCode:
     """Analyseur de code Python utilisant AST."""
 
     def __init__(self):
+        # Index du projet (mode projet) : conserve par reset()
+        self.index_projet = None
         self.reset()
 
     def reset(self):
-        """Remet a zero l'analyseur."""
+        """Remet a zero l'analyseur (analyse d'un code)."""
         self.fonctions = []
         self.classes = []
         self.imports = []
@@ -39,18 +62,21 @@ class AnalyseurCode:
         self.erreurs = []
 
     def analyser_code(self, code_source):
-        """Analyse le code source Python."""
+        """Analyse le code source Python (table des symboles partagee avec les artisans)."""
         try:
             self.reset()
-            arbre = ast.parse(code_source)
-            for noeud in ast.walk(arbre):
-                if isinstance(noeud, ast.FunctionDef):
-                    self.fonctions.append({"nom": noeud.name, "ligne": noeud.lineno})
-                elif isinstance(noeud, ast.ClassDef):
-                    self.classes.append({"nom": noeud.name, "ligne": noeud.lineno})
-                elif isinstance(noeud, ast.Call):
-                    if isinstance(noeud.func, ast.Name) and noeud.func.id == "print":
-                        self.print_calls.append({"ligne": noeud.lineno})
+            index = get_symbol_index(code_source)
+            for binding in index.definitions:
+                cible = self.fonctions if binding.kind == "function" else self.classes
+                cible.append({"nom": binding.name, "ligne": binding.lineno})
+            for binding in index.imports:
+                self.imports.append(
+                    {"nom": binding.name, "ligne": binding.lineno, "utilise": binding.used}
+                )
+            # Seuls les appels au print builtin (pas un print redefini)
+            for appel in index.calls.get("print", []):
+                if index.is_builtin_use(appel.func):
+                    self.print_calls.append({"ligne": appel.lineno})
             return True
         except Exception as e:
             self.erreurs.append(f"Erreur analyse: {e}")
@@ -61,10 +87,63 @@ class AnalyseurCode:
         return {
             "fonctions": len(self.fonctions),
             "classes": len(self.classes),
+            "imports": len(self.imports),
+            "imports_inutilises": sum(1 for i in self.imports if not i["utilise"]),
             "print_calls": len(self.print_calls),
             "erreurs": len(self.erreurs),
         }
 
+    # --- Mode projet ---
+
+    def indexer_projet(self, racine, db_path=None, jobs=None):
+        """
+        Indexe (ou met a jour) tous les fichiers Python d'une arborescence.
+
+        Les symboles sont enregistres dans une base SQLite sur disque ; seuls
+        les fichiers modifies depuis le dernier passage sont re-analyses.
+
+        Returns:
+            Statistiques de la mise a jour (voir ProjectIndex.update)
+        """
+        racine = Path(racine).resolve()
+        if self.index_projet is None or self.index_projet.root != racine:
+            if self.index_projet is not None:
+                self.index_projet.close()
+            self.index_projet = ProjectIndex(racine, db_path=db_path, jobs=jobs)
+        stats = self.index_projet.update()
+        print(
+            f"Index du projet {racine}: {stats['files']} fichier(s), "
+            f"{stats['analysed']} analyse(s), {stats['removed']} retire(s), "
+            f"{stats['errors']} en erreur"
+        )
+        return stats
+
+    def _index_requis(self):
+        if self.index_projet is None:
+            raise RuntimeError("Aucun projet indexe : appeler indexer_projet() d'abord")
+        return self.index_projet
+
+    def lister_symboles(self, kind, nom=None):
+        """Symboles du projet d'un type donne (function, class, import, print)."""
+        return self._index_requis().find(kind=kind, name=nom)
+
+    def rechercher_symboles(self, texte, kind=None, limite=100):
+        """Symboles du projet dont le nom contient `texte`."""
+        return self._index_requis().search(texte, kind=kind, limit=limite)
+
+    def obtenir_rapport_projet(self):
+        """Rapport du projet indexe : symboles par type et fichiers en erreur."""
+        index = self._index_requis()
+        comptes = index.counts()
+        return {
+            "fichiers": comptes.pop("files"),
+            "fonctions": comptes.get("function", 0),
+            "classes": comptes.get("class", 0),
+            "imports": comptes.get("import", 0),
+            "print_calls": comptes.get("print", 0),
+            "erreurs": len(index.errors()),
+        }
+
 
 # ==============================================================================
 # CLASSE TransformateurAST (NECESSAIRE)
@@ -92,6 +171,47 @@ class TransformateurAST(ast.NodeTransformer):
         return node
 
 
+def _appeler_transform(transformer, code_source, params=None):
+    """
+    Appelle transformer.transform en lui passant les parametres de l'instruction
+    si sa signature les accepte (wrappers), sinon avec le seul code source.
+    """
+    if params and _accepte_params(type(transformer)):
+        return transformer.transform(code_source, params)
+    return transformer.transform(code_source)
+
+
+def _cibles_instruction(params, sources):
+    """
+    Indices des sources visees par une instruction et parametres pour le plugin.
+
+    Le parametre reserve TARGET_FILES_PARAM restreint l'instruction a certains
+    fichiers (chemins compares sous forme absolue normalisee) ; il est retire
+    des parametres transmis au plugin.
+    """
+    if TARGET_FILES_PARAM not in params:
+        return list(range(len(sources))), params
+    cibles = {os.path.normcase(os.path.abspath(p)) for p in params[TARGET_FILES_PARAM]}
+    indices = [
+        i
+        for i, (fichier, _) in enumerate(sources)
+        if os.path.normcase(os.path.abspath(fichier)) in cibles
+    ]
+    return indices, {k: v for k, v in params.items() if k != TARGET_FILES_PARAM}
+
+
+@lru_cache(maxsize=None)
+def _accepte_params(transformer_class) -> bool:
+    """Indique si transform() accepte un second argument (resultat mis en cache par classe)."""
+    try:
+        parametres = inspect.signature(transformer_class.transform).parameters
+    except (TypeError, ValueError):
+        return False
+    return len(parametres) > 2 or any(
+        p.kind == inspect.Parameter.VAR_POSITIONAL for p in parametres.values()
+    )
+
+
 # ==============================================================================
 # ORCHESTRATEUR PRINCIPAL (CORRIGÉ)
 # ==============================================================================
@@ -102,6 +222,7 @@ class OrchestrateurAST:
         self.mode_colab = mode_colab
         self.analyseur = AnalyseurCode()  # Cette ligne a besoin que AnalyseurCode existe
         self.historique = []
+        self.dernier_run_id = None
 
         self.transformation_loader = None
         self._init_modular_system()
@@ -128,13 +249,8 @@ class OrchestrateurAST:
         except Exception as e:
             log_warning(f"Erreur systeme modulaire: {e}")
 
-    def executer_plan(self, chemin_plan_json: str, fichiers_cibles: List[str]) -> bool:
-        """
-        Execute un plan de transformation valide par Pydantic.
-        Retourne True si succes, False sinon.
-        """
-        self.log_message(f"Execution du plan : {os.path.basename(chemin_plan_json)}")
-
+    def charger_plan(self, chemin_plan_json: str) -> Optional[TransformationPlanModel]:
+        """Charge et valide un plan JSON. Retourne None (apres log) en cas d'erreur."""
         try:
             with open(chemin_plan_json, encoding="utf-8") as f:
                 donnees_json = json.load(f)
@@ -144,58 +260,788 @@ class OrchestrateurAST:
 
         except FileNotFoundError:
             self.log_message(f"ERREUR: Fichier de plan introuvable : {chemin_plan_json}")
-            return False
+            return None
         except ValidationError as e:
             self.log_message("ERREUR: Le plan JSON est invalide et ne peut pas etre execute.")
             self.log_message(f"Details de l'erreur: {e}")
-            return False
+            return None
         except Exception as e:
             self.log_message(f"ERREUR inattendue lors de la lecture du plan : {e}")
-            return False
+            return None
+
+        # Echec immediat si un outil externe requis par le plan est absent
+        manquants = self.verifier_outils(plan)
+        if manquants:
+            for message in manquants:
+                self.log_message(f"ERREUR: {message}")
+            self.log_message("ERREUR: Le plan ne peut pas etre execute (outil manquant).")
+            return None
 
         self.log_message(f"Plan '{plan.name}' v{plan.version} valide avec succes.")
+        return plan
+
+    def verifier_outils(self, plan: TransformationPlanModel) -> List[str]:
+        """
+        Verifie que les outils externes des wrappers utilises par le plan sont
+        installes (resolution mise en cache). Retourne les messages d'erreur.
+        """
+        if not self.transformation_loader:
+            return []
+
+        manquants = []
+        noms = {i.plugin_name for i in plan.transformations if i.type == "appel_plugin"}
+        for nom in sorted(n for n in noms if n):
+            transformer = self.transformation_loader.get_transformation(nom)
+            if transformer is None or not hasattr(transformer, "check_available"):
+                continue
+            try:
+                transformer.check_available()
+            except ToolNotFoundError as e:
+                manquants.append(f"{nom}: {e}")
+            finally:
+                self.transformation_loader.release_transformation(transformer)
+        return manquants
+
+    def executer_plan(
+        self,
+        chemin_plan_json: str,
+        fichiers_cibles: List[str],
+        dry_run: bool = False,
+        journal: Optional[WriteBackJournal] = None,
+        batch_size: int = 50,
+        generateurs: bool = True,
+        progression: Optional[Callable[[str, List[str], int], Optional[bool]]] = None,
+    ) -> RunReport:
+        """
+        Execute un plan de transformation valide par Pydantic.
+
+        Chaque fichier est lu une fois, toutes les instructions lui sont
+        appliquees en memoire, puis le resultat est ecrit de maniere atomique
+        par lots (uniquement s'il a change). Les ecritures sont journalisees
+        dans `journal` (un nouveau journal est cree si absent) : le run peut
+        etre annule avec annuler_execution().
+
+        En mode dry_run, le plan est execute en memoire et seuls les diffs sont
+        journalises (aucun fichier n'est ecrit).
+
+        Avec generateurs=False, les instructions generator sont ignorees : un
+        run decoupe en plusieurs appels (un par fichier) les execute une seule
+        fois avec executer_generateurs().
+
+        `progression(fichier, erreurs, reussites)` est appelee apres chaque
+        fichier traite ; si elle retourne False, le run s'arrete a la fin du lot
+        en cours (les fichiers deja transformes sont ecrits).
+
+        Retourne toujours le RunReport du run (un StepResult par fichier et par
+        etape, classement des etapes et fichiers les plus lents). Plan invalide
+        (plan_error), plan sans instruction a appliquer (empty) et dry_run sont
+        des champs du rapport ; il est vrai si le run a reussi (RunReport.ok).
+        """
+        if dry_run:
+            return self._executer_plan_dry_run(chemin_plan_json, fichiers_cibles)
+
+        self.log_message(f"Execution du plan : {os.path.basename(chemin_plan_json)}")
+
+        rapport = RunReport()
+        plan = self.charger_plan(chemin_plan_json)
+        if plan is None:
+            rapport.plan_error = f"Plan invalide: {chemin_plan_json}"
+            return rapport
 
         if not plan.transformations:
             self.log_message("AVERTISSEMENT: Le plan ne contient aucune instruction.")
-            return True
+            rapport.empty = True
+            return rapport
+        if not generateurs and all(i.type == "generator" for i in plan.transformations):
+            # Rien a appliquer aux fichiers : la generation est faite une fois par run
+            rapport.empty = True
+            return rapport
 
         self.log_message(
             f"{len(plan.transformations)} instruction(s) a executer sur {len(fichiers_cibles)} fichier(s)."
         )
-
-        success_count = 0
         for i, instruction in enumerate(plan.transformations, 1):
             self.log_message(
-                f"\n        --- Instruction {i}/{len(plan.transformations)}: {instruction.description} ---"
+                f"        --- Instruction {i}/{len(plan.transformations)}: {instruction.description} ---"
+            )
+            if instruction.type not in ("appel_plugin", "remplacement_simple", "generator"):
+                self.log_message(f"AVERTISSEMENT: Type d'instruction inconnu '{instruction.type}'.")
+
+        if journal is None:
+            journal = WriteBackJournal(
+                description=f"{plan.name} ({os.path.basename(chemin_plan_json)})"
             )
+        self.dernier_run_id = journal.run_id
+
+        debut_run = time.perf_counter()
+        rapport.run_id = journal.run_id
+        success_count = 0
+        with AtomicWriteBack(journal=journal, batch_size=batch_size) as write_back:
+            if generateurs:
+                success_count += self._ecrire_generateurs(
+                    plan, fichiers_cibles, write_back, rapport
+                )
+
+            # Par lots : les wrappers traitent tout un lot en un seul appel d'outil
+            continuer = True
+            for debut in range(0, len(fichiers_cibles), max(1, batch_size)):
+                if not continuer:
+                    self.log_message("Execution interrompue.")
+                    break
+                lot = fichiers_cibles[debut : debut + max(1, batch_size)]
+                sources = []
+                for fichier in lot:
+                    try:
+                        with open(fichier, encoding="utf-8") as f:
+                            sources.append((fichier, f.read()))
+                    except Exception as e:
+                        self.log_message(f"ERREUR: Lecture impossible de {fichier}: {e}")
+                        rapport.add(StepResult(fichier, "lecture", error=str(e)))
+                        if progression is not None and progression(fichier, [str(e)], 0) is False:
+                            continuer = False
 
-            if instruction.type == "appel_plugin":
-                for fichier in fichiers_cibles:
-                    if self.appliquer_transformation_modulaire(
-                        fichier, fichier, instruction.plugin_name
+                resultats = self._executer_pipeline_lot(plan, sources, True, rapport)
+                for (fichier, code_source), (code, erreurs, reussites) in zip(sources, resultats):
+                    for erreur in erreurs:
+                        self.log_message(
+                            f"ERREUR pendant la transformation de {os.path.basename(fichier)}: {erreur}"
+                        )
+                    success_count += reussites
+                    write_back.stage(fichier, code, code_source)
+                    if (
+                        progression is not None
+                        and progression(fichier, erreurs, reussites) is False
                     ):
-                        success_count += 1
-            elif instruction.type == "remplacement_simple":
-                self.log_message("INFO: Le type 'remplacement_simple' n'est pas encore implemente.")
-            else:
-                self.log_message(f"AVERTISSEMENT: Type d'instruction inconnu '{instruction.type}'.")
+                        continuer = False
 
+        for erreur in write_back.errors:
+            self.log_message(f"ERREUR d'ecriture: {erreur}")
+        self.log_message(
+            f"{write_back.stats['written']} fichier(s) ecrit(s), "
+            f"{write_back.stats['unchanged']} inchange(s) (run {journal.run_id})."
+        )
+        rapport.success_count = success_count
+        rapport.write_stats = dict(write_back.stats)
+        rapport.errors.extend(write_back.errors)
+        rapport.elapsed = time.perf_counter() - debut_run
+        for ligne in rapport.summary_lines():
+            self.log_message(ligne)
         self.log_message("Plan de transformation termine.")
-        return success_count > 0
+        return rapport
+
+    def executer_generateurs(
+        self,
+        chemin_plan_json: str,
+        fichiers_cibles: List[str],
+        journal: Optional[WriteBackJournal] = None,
+        batch_size: int = 50,
+    ) -> RunReport:
+        """
+        Execute une seule fois les instructions generator d'un plan, dans le
+        journal du run (a utiliser avec executer_plan(..., generateurs=False)
+        quand le run appelle executer_plan fichier par fichier).
+        """
+        if journal is None:
+            journal = WriteBackJournal(description=os.path.basename(chemin_plan_json))
+        rapport = RunReport(run_id=journal.run_id)
+        plan = self.charger_plan(chemin_plan_json)
+        if plan is None:
+            rapport.plan_error = f"Plan invalide: {chemin_plan_json}"
+            return rapport
+
+        debut = time.perf_counter()
+        with AtomicWriteBack(journal=journal, batch_size=batch_size) as write_back:
+            rapport.success_count = self._ecrire_generateurs(
+                plan, fichiers_cibles, write_back, rapport
+            )
+        for erreur in write_back.errors:
+            self.log_message(f"ERREUR d'ecriture: {erreur}")
+        rapport.write_stats = dict(write_back.stats)
+        rapport.errors.extend(write_back.errors)
+        rapport.elapsed = time.perf_counter() - debut
+        return rapport
+
+    def apercu_generateurs(self, plan, fichiers_cibles: List[str]) -> List[FileDiff]:
+        """
+        Fichiers que les instructions generator du plan creeraient, en memoire.
+
+        Un FileDiff par fichier genere (contenu actuel si le fichier existe
+        deja et peut etre ecrase) ; en cas d'erreur, le lot n'est pas genere et
+        seules les erreurs sont renvoyees (FileDiff dont le chemin est
+        l'instruction).
+        """
+        if not any(i.type == "generator" for i in plan.transformations):
+            return []
+        fichiers, erreurs, _ = self._rendre_generateurs(plan, fichiers_cibles)
+        if erreurs:
+            return [FileDiff("generation", "", "", error=erreur) for erreur in erreurs]
+        diffs = []
+        for genere in fichiers:
+            original = ""
+            if genere.path.is_file():
+                try:
+                    original = genere.path.read_text(encoding="utf-8")
+                except (OSError, UnicodeDecodeError):
+                    pass
+            diffs.append(FileDiff(str(genere.path), original, genere.content))
+        return diffs
+
+    def _rendre_generateurs(
+        self, plan, fichiers_cibles: List[str]
+    ) -> Tuple[List[GeneratedFile], List[str], int]:
+        """
+        Genere en memoire les fichiers de toutes les instructions `generator`
+        du plan, puis verifie les collisions sur l'ensemble du lot.
+
+        Returns:
+            (fichiers, erreurs, nombre d'instructions reussies)
+        """
+        fichiers, erreurs, reussites = [], [], 0
+        for instruction in plan.transformations:
+            if instruction.type != "generator":
+                continue
+            generator = (
+                self.transformation_loader.get_transformation(instruction.plugin_name)
+                if self.transformation_loader
+                else None
+            )
+            try:
+                if generator is None or not supports_generation(generator):
+                    erreurs.append(
+                        f"{instruction.description}: '{instruction.plugin_name}' "
+                        "n'est pas un generateur disponible"
+                    )
+                    continue
+                generes, echecs = render_items(
+                    generator,
+                    instruction.params,
+                    label=instruction.description,
+                    step=instruction.plugin_name,
+                )
+            except Exception as e:
+                erreurs.append(f"{instruction.description}: {e}")
+                continue
+            finally:
+                if generator is not None:
+                    self.transformation_loader.release_transformation(generator)
+            fichiers.extend(generes)
+            erreurs.extend(echecs)
+            reussites += not echecs
+
+        erreurs.extend(check_collisions(fichiers, protected=fichiers_cibles))
+        return fichiers, erreurs, reussites
+
+    def _ecrire_generateurs(
+        self, plan, fichiers_cibles: List[str], write_back, rapport: Optional[RunReport] = None
+    ) -> int:
+        """
+        Met en attente d'ecriture les fichiers generes par le plan.
+
+        Le lot est tout ou rien : a la moindre erreur (rendu, collision),
+        aucun fichier n'est genere. Retourne le nombre d'instructions reussies.
+        """
+        if not any(i.type == "generator" for i in plan.transformations):
+            return 0
+
+        fichiers, erreurs, reussites = self._rendre_generateurs(plan, fichiers_cibles)
+        if erreurs:
+            for erreur in erreurs:
+                self.log_message(f"ERREUR de generation: {erreur}")
+            self.log_message(
+                f"AVERTISSEMENT: Aucun fichier genere ({len(erreurs)} erreur(s) sur le lot)."
+            )
+            if rapport is not None:
+                rapport.errors.extend(erreurs)
+            return 0
+
+        for genere in fichiers:
+            genere.path.parent.mkdir(parents=True, exist_ok=True)
+            write_back.stage(genere.path, genere.content)
+            if rapport is not None:
+                rapport.add(
+                    StepResult(
+                        file=str(genere.path),
+                        step=genere.step,
+                        elapsed=genere.elapsed,
+                        bytes_out=text_size(genere.content),
+                        changed=True,
+                    )
+                )
+        self.log_message(f"{len(fichiers)} fichier(s) genere(s).")
+        return reussites
+
+    def _executer_pipeline(self, plan, code_source: str, fichier: str, verbose: bool = False):
+        """
+        Applique toutes les instructions du plan a un code en memoire.
+
+        Une instruction en echec laisse le code inchange et n'interrompt pas les
+        suivantes. Retourne (code, erreurs, nombre d'instructions reussies).
+        """
+        return self._executer_pipeline_lot(plan, [(fichier, code_source)], verbose)[0]
+
+    def _executer_pipeline_lot(
+        self,
+        plan,
+        sources: List[Tuple[str, str]],
+        verbose: bool = False,
+        rapport: Optional[RunReport] = None,
+    ) -> List[Tuple[str, List[str], int]]:
+        """
+        Version par lot de _executer_pipeline : chaque instruction est appliquee
+        a tous les codes du lot avant de passer a la suivante. Les instructions
+        consecutives d'artisans exposant une regle sont fusionnees en un seul
+        parcours de l'arbre par fichier (voir _appliquer_regles_lot).
+
+        Args:
+            sources: liste de (fichier, code source)
+            rapport: si fourni, recoit un StepResult par (fichier, groupe d'instructions)
+
+        Returns:
+            Une entree (code, erreurs, reussites) par source, dans le meme ordre.
+        """
+        codes = [code for _, code in sources]
+        erreurs = [[] for _ in sources]
+        reussites = [0] * len(sources)
+        if not sources:
+            return []
+
+        for groupe in self._grouper_instructions(plan.transformations):
+            avant = list(codes)
+            nb_erreurs = [len(e) for e in erreurs]
+            # Duree par fichier (None : fichier non traite par le groupe)
+            temps = [None] * len(sources)
+            self._appliquer_groupe(groupe, sources, codes, erreurs, reussites, temps, verbose)
+            if rapport is not None:
+                self._enregistrer_etape(
+                    rapport, groupe, sources, avant, codes, erreurs, nb_erreurs, temps
+                )
+
+        return list(zip(codes, erreurs, reussites))
+
+    def _appliquer_groupe(
+        self,
+        groupe,
+        sources: List[Tuple[str, str]],
+        codes: List[str],
+        erreurs: List[List[str]],
+        reussites: List[int],
+        temps: List[Optional[float]],
+        verbose: bool = False,
+    ) -> None:
+        """Applique un groupe d'instructions (voir _grouper_instructions) a tout le lot."""
+        if len(groupe) > 1:
+            self._appliquer_regles_lot(groupe, sources, codes, erreurs, reussites, temps, verbose)
+            return
+        instruction = groupe[0]
+        if instruction.type == "remplacement_simple":
+            self._appliquer_remplacements(
+                instruction, sources, codes, erreurs, reussites, temps, verbose
+            )
+            return
+        indices, params = _cibles_instruction(instruction.params, sources)
+        indices, ignores = self._filtrer_applicables(
+            instruction.plugin_name, indices, codes, verbose
+        )
+        for i in ignores:
+            # Rien a modifier : l'instruction reussit sans appel au plugin
+            reussites[i] += 1
+        if not indices:
+            return
+        if verbose:
+            cible = (
+                os.path.basename(sources[indices[0]][0])
+                if len(indices) == 1
+                else f"{len(indices)} fichier(s)"
+            )
+            self.log_message(f"  -> Application de '{instruction.plugin_name}' sur {cible}")
+        durees = []
+        try:
+            resultats = self._transformer_lot(
+                instruction.plugin_name, [codes[i] for i in indices], params, durees
+            )
+        except Exception as e:
+            resultats = [e] * len(indices)
+
+        for k, (i, resultat) in enumerate(zip(indices, resultats)):
+            temps[i] = durees[k] if k < len(durees) else 0.0
+            if isinstance(resultat, Exception):
+                erreurs[i].append(f"{instruction.description}: {resultat}")
+            else:
+                codes[i] = resultat
+                reussites[i] += 1
+
+    def _enregistrer_etape(
+        self, rapport, groupe, sources, avant, codes, erreurs, nb_erreurs, temps
+    ) -> None:
+        """Ajoute au rapport un StepResult par fichier vise par le groupe."""
+        etape = "+".join(dict.fromkeys(i.plugin_name or i.type for i in groupe))
+        cibles = set()
+        for instruction in groupe:
+            cibles.update(_cibles_instruction(instruction.params, sources)[0])
+        for i in sorted(cibles):
+            erreur = "; ".join(erreurs[i][nb_erreurs[i] :]) or None
+            rapport.add(
+                StepResult(
+                    file=sources[i][0],
+                    step=etape,
+                    elapsed=temps[i] or 0.0,
+                    bytes_in=text_size(avant[i]),
+                    bytes_out=text_size(codes[i]),
+                    changed=codes[i] != avant[i],
+                    error=erreur,
+                    skipped=temps[i] is None and erreur is None,
+                )
+            )
+
+    def _grouper_instructions(self, instructions) -> List[list]:
+        """
+        Regroupe les instructions appel_plugin consecutives dont le plugin expose
+        une regle (sans autre parametre que TARGET_FILES_PARAM). Les autres
+        instructions appliquees aux fichiers (appel_plugin, remplacement_simple)
+        forment chacune un groupe.
+        """
+        groupes = []
+        fusion_precedente = False
+        for instruction in instructions:
+            if instruction.type not in ("appel_plugin", "remplacement_simple"):
+                continue
+            fusionnable = (
+                instruction.type == "appel_plugin"
+                and self.transformation_loader is not None
+                and self.transformation_loader.supports_rules(instruction.plugin_name)
+                and not set(instruction.params) - {TARGET_FILES_PARAM}
+            )
+            if fusionnable and fusion_precedente:
+                groupes[-1].append(instruction)
+            else:
+                groupes.append([instruction])
+            fusion_precedente = fusionnable
+        return groupes
+
+    def _appliquer_regles_lot(
+        self,
+        groupe,
+        sources: List[Tuple[str, str]],
+        codes: List[str],
+        erreurs: List[List[str]],
+        reussites: List[int],
+        temps: List[Optional[float]],
+        verbose: bool = False,
+    ) -> None:
+        """
+        Applique plusieurs instructions d'artisans en un seul parcours par fichier.
+
+        Chaque fichier recoit les regles des instructions qui le visent (cibles
+        et prefiltre). Si le parcours unique echoue (modifications en conflit,
+        code non analysable), les instructions du fichier sont reappliquees une
+        par une comme sans fusion. codes, erreurs, reussites et temps (duree par
+        fichier) sont mis a jour sur place.
+        """
+        applicables = [[] for _ in sources]
+        for instruction in groupe:
+            indices, _ = _cibles_instruction(instruction.params, sources)
+            indices, ignores = self._filtrer_applicables(
+                instruction.plugin_name, indices, codes, verbose
+            )
+            for i in ignores:
+                reussites[i] += 1
+            for i in indices:
+                applicables[i].append(instruction)
+        fichiers = sum(1 for instructions in applicables if instructions)
+        if not fichiers:
+            return
+
+        noms = list(dict.fromkeys(instruction.plugin_name for instruction in groupe))
+        if verbose:
+            self.log_message(
+                f"  -> Parcours unique pour {', '.join(repr(nom) for nom in noms)} "
+                f"sur {fichiers} fichier(s)"
+            )
+        transformers = {}
+        try:
+            for nom in noms:
+                transformer = self.transformation_loader.get_transformation(nom)
+                if transformer is not None:
+                    transformers[nom] = transformer
+
+            for i, instructions in enumerate(applicables):
+                manquantes = [x for x in instructions if x.plugin_name not in transformers]
+                for instruction in manquantes:
+                    erreurs[i].append(
+                        f"{instruction.description}: "
+                        f"Transformation '{instruction.plugin_name}' non trouvee"
+                    )
+                instructions = [x for x in instructions if x.plugin_name in transformers]
+                if not instructions:
+                    continue
+                debut = time.perf_counter()
+                try:
+                    codes[i] = apply_rules(
+                        codes[i], [transformers[x.plugin_name] for x in instructions]
+                    )
+                    reussites[i] += len(instructions)
+                    temps[i] = time.perf_counter() - debut
+                    continue
+                except Exception as e:
+                    if verbose:
+                        self.log_message(
+                            f"  [INFO] {os.path.basename(sources[i][0])}: parcours unique "
+                            f"impossible ({e}), application instruction par instruction"
+                        )
+                for instruction in instructions:
+                    try:
+                        codes[i] = _appeler_transform(
+                            transformers[instruction.plugin_name], codes[i]
+                        )
+                        reussites[i] += 1
+                    except Exception as e:
+                        erreurs[i].append(f"{instruction.description}: {e}")
+                temps[i] = time.perf_counter() - debut
+        finally:
+            for transformer in transformers.values():
+                self.transformation_loader.release_transformation(transformer)
+
+    def _appliquer_remplacements(
+        self,
+        instruction,
+        sources: List[Tuple[str, str]],
+        codes: List[str],
+        erreurs: List[List[str]],
+        reussites: List[int],
+        temps: List[Optional[float]],
+        verbose: bool = False,
+    ) -> None:
+        """
+        Applique une instruction remplacement_simple a tous les codes du lot :
+        tous ses motifs en un seul parcours par fichier (voir replacement_engine).
+        """
+        indices, params = _cibles_instruction(instruction.params, sources)
+        try:
+            replacer = get_replacer(params)
+        except ValueError as e:
+            for i in indices:
+                erreurs[i].append(f"{instruction.description}: {e}")
+            return
+        total = 0
+        for i in indices:
+            debut = time.perf_counter()
+            codes[i], nombre = replacer.replace(codes[i])
+            temps[i] = time.perf_counter() - debut
+            reussites[i] += 1
+            total += nombre
+        if verbose and indices:
+            self.log_message(
+                f"  -> Remplacement simple: {total} occurrence(s) dans {len(indices)} fichier(s)"
+            )
+
+    def _filtrer_applicables(
+        self, transformation_name, indices: List[int], codes: List[str], verbose: bool = False
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Separe les codes que le plugin peut modifier de ceux qu'il ne peut pas
+        modifier, d'apres son prefiltre (lu dans le manifeste, sans import ni
+        analyse du code). Retourne (indices retenus, indices ignores).
+        """
+        prefilter = (
+            self.transformation_loader.get_prefilter(transformation_name)
+            if self.transformation_loader
+            else None
+        )
+        if prefilter is None:
+            return indices, []
+
+        retenus, ignores = [], []
+        for i in indices:
+            (retenus if prefilter.matches(codes[i]) else ignores).append(i)
+        if verbose and ignores:
+            self.log_message(
+                f"  -> '{transformation_name}': {len(ignores)} fichier(s) non concerne(s) (prefiltre)"
+            )
+        return retenus, ignores
+
+    def _transformer_lot(
+        self, transformation_name, codes: List[str], params=None, durees=None
+    ) -> List:
+        """
+        Applique un plugin a plusieurs codes en memoire.
+
+        Les plugins qui proposent transform_many (wrappers) sont appeles une fois
+        pour tout le lot. Retourne, pour chaque code, le code transforme ou
+        l'exception levee. Si `durees` est une liste, elle recoit la duree de
+        traitement de chaque code (un appel groupe est reparti selon la taille).
+        """
+        if not self.transformation_loader:
+            raise RuntimeError("Systeme modulaire non disponible")
+
+        transformer = self.transformation_loader.get_transformation(transformation_name)
+        if not transformer:
+            raise LookupError(f"Transformation '{transformation_name}' non trouvee")
+
+        try:
+            if len(codes) > 1 and hasattr(transformer, "transform_many"):
+                debut = time.perf_counter()
+                resultats = transformer.transform_many(codes, params)
+                if durees is not None:
+                    ecoule = time.perf_counter() - debut
+                    total = sum(len(code) for code in codes) or 1
+                    durees.extend(ecoule * len(code) / total for code in codes)
+                return resultats
+
+            resultats = []
+            for code in codes:
+                debut = time.perf_counter()
+                try:
+                    resultats.append(_appeler_transform(transformer, code, params))
+                except Exception as e:
+                    resultats.append(e)
+                if durees is not None:
+                    durees.append(time.perf_counter() - debut)
+            return resultats
+        finally:
+            self.transformation_loader.release_transformation(transformer)
+
+    def previsualiser_plan(
+        self, chemin_plan_json: str, fichiers_cibles: List[str]
+    ) -> Iterator[FileDiff]:
+        """
+        Execute le plan en memoire et genere un FileDiff par fichier.
+
+        Generateur paresseux : chaque fichier est lu, transforme puis rendu avant
+        de passer au suivant, le diff n'etant calcule qu'a la demande. Aucun
+        fichier n'est ecrit.
+        """
+        plan = self.charger_plan(chemin_plan_json)
+        if plan is None:
+            return
+
+        for debut in range(0, len(fichiers_cibles), TAILLE_LOT_APERCU):
+            yield from self.transformer_fichiers(
+                plan, fichiers_cibles[debut : debut + TAILLE_LOT_APERCU]
+            )
+        # Fichiers crees par les instructions generator (diff depuis un fichier vide)
+        yield from self.apercu_generateurs(plan, fichiers_cibles)
+
+    def transformer_fichier(self, plan: TransformationPlanModel, fichier: str) -> FileDiff:
+        """
+        Applique un plan deja charge a un fichier, en memoire uniquement.
+
+        Les erreurs de lecture ou d'instruction sont reportees dans FileDiff.error.
+        """
+        return self.transformer_fichiers(plan, [fichier])[0]
+
+    def transformer_fichiers(
+        self, plan: TransformationPlanModel, fichiers: List[str]
+    ) -> List[FileDiff]:
+        """Version par lot de transformer_fichier (un appel d'outil par wrapper et par lot)."""
+        diffs = {}
+        sources = []
+        for fichier in fichiers:
+            try:
+                with open(fichier, encoding="utf-8") as f:
+                    sources.append((fichier, f.read()))
+            except Exception as e:
+                diffs[fichier] = FileDiff(fichier, "", "", error=f"Lecture impossible: {e}")
+
+        resultats = self._executer_pipeline_lot(plan, sources)
+        for (fichier, code_source), (code, erreurs, _) in zip(sources, resultats):
+            diffs[fichier] = FileDiff(fichier, code_source, code, error="; ".join(erreurs) or None)
+        return [diffs[fichier] for fichier in fichiers]
+
+    def annuler_execution(self, run_id: Optional[str] = None, force: bool = False) -> dict:
+        """
+        Annule un run journalise (par defaut le dernier run de cet orchestrateur)
+        en restaurant les contenus originaux des fichiers ecrits.
+        """
+        run_id = run_id or self.dernier_run_id
+        if not run_id:
+            self.log_message("AVERTISSEMENT: Aucun run a annuler.")
+            return {"restored": [], "deleted": [], "skipped": [], "errors": []}
+
+        resultat = rollback_run(run_id, force=force)
+        self.log_message(
+            f"Rollback du run {run_id}: {len(resultat['restored'])} fichier(s) restaure(s), "
+            f"{len(resultat['skipped'])} ignore(s) (modifies depuis), "
+            f"{len(resultat['errors'])} erreur(s)."
+        )
+        return resultat
+
+    def _executer_plan_dry_run(
+        self, chemin_plan_json: str, fichiers_cibles: List[str]
+    ) -> RunReport:
+        """Journalise les statistiques de diff du plan sans ecrire de fichier."""
+        self.log_message(f"Dry-run du plan : {os.path.basename(chemin_plan_json)}")
+
+        rapport = RunReport()
+        rapport.dry_run = True
+        plan = self.charger_plan(chemin_plan_json)
+        if plan is None:
+            rapport.plan_error = f"Plan invalide: {chemin_plan_json}"
+            return rapport
+
+        debut = time.perf_counter()
+        for debut_lot in range(0, len(fichiers_cibles), TAILLE_LOT_APERCU):
+            for file_diff in self.transformer_fichiers(
+                plan, fichiers_cibles[debut_lot : debut_lot + TAILLE_LOT_APERCU]
+            ):
+                rapport.add(
+                    StepResult(
+                        file_diff.path, "apercu", changed=file_diff.changed, error=file_diff.error
+                    )
+                )
+                nom = os.path.basename(file_diff.path)
+                if file_diff.error:
+                    self.log_message(f"  [ERREUR] {nom}: {file_diff.error}")
+                elif file_diff.changed:
+                    rapport.diff_stats["added"] += file_diff.added
+                    rapport.diff_stats["removed"] += file_diff.removed
+                    self.log_message(f"  [DIFF] {nom}: +{file_diff.added} -{file_diff.removed}")
+
+        for file_diff in self.apercu_generateurs(plan, fichiers_cibles):
+            rapport.add(
+                StepResult(file_diff.path, "generation", changed=True, error=file_diff.error)
+            )
+            if file_diff.error:
+                self.log_message(f"  [ERREUR] generation: {file_diff.error}")
+            else:
+                self.log_message(
+                    f"  [GEN] {file_diff.path}: +{file_diff.added} -{file_diff.removed}"
+                )
+        rapport.elapsed = time.perf_counter() - debut
+
+        apercus = [r for r in rapport.results if r.step == "apercu"]
+        modifies = sum(1 for r in apercus if r.changed and r.ok)
+        self.log_message(
+            f"Dry-run termine: {modifies}/{len(apercus)} fichier(s) modifie(s), "
+            f"+{rapport.diff_stats['added']} -{rapport.diff_stats['removed']} ligne(s), "
+            f"{len(rapport.failures)} erreur(s)."
+        )
+        return rapport
 
     def appliquer_transformation_modulaire(
-        self, fichier_source, fichier_sortie, transformation_name
-    ):
-        """Applique une transformation modulaire."""
+        self, fichier_source, fichier_sortie, transformation_name, params=None
+    ) -> StepResult:
+        """
+        Applique une transformation modulaire.
+
+        Retourne le StepResult de l'etape (vrai si elle a reussi).
+        """
         if not self.transformation_loader:
             self.log_message("ERREUR: Systeme modulaire non disponible")
-            return False
+            return StepResult(
+                fichier_source, transformation_name, error="Systeme modulaire non disponible"
+            )
 
         transformer = self.transformation_loader.get_transformation(transformation_name)
         if not transformer:
             self.log_message(f"ERREUR: Transformation '{transformation_name}' non trouvee")
-            return False
+            return StepResult(
+                fichier_source,
+                transformation_name,
+                error=f"Transformation '{transformation_name}' non trouvee",
+            )
 
+        debut = time.perf_counter()
+        code_source = ""
         try:
             with open(fichier_source, encoding="utf-8") as f:
                 code_source = f.read()
@@ -203,18 +1049,39 @@ class OrchestrateurAST:
             self.log_message(
                 f"  -> Application de '{transformation_name}' sur {os.path.basename(fichier_source)}"
             )
-            code_transforme = transformer.transform(code_source)
+            code_transforme = _appeler_transform(transformer, code_source, params)
 
-            with open(fichier_sortie, "w", encoding="utf-8") as f:
-                f.write(code_transforme)
+            # Ecriture atomique, evitee si le contenu est inchange
+            if fichier_sortie != fichier_source or code_transforme != code_source:
+                atomic_write_text(fichier_sortie, code_transforme)
 
-            return True
+            return StepResult(
+                fichier_source,
+                transformation_name,
+                elapsed=time.perf_counter() - debut,
+                bytes_in=text_size(code_source),
+                bytes_out=text_size(code_transforme),
+                changed=code_transforme != code_source,
+            )
 
         except Exception as e:
             self.log_message(
                 f"ERREUR pendant la transformation de {os.path.basename(fichier_source)}: {e}"
             )
-            return False
+            return StepResult(
+                fichier_source,
+                transformation_name,
+                elapsed=time.perf_counter() - debut,
+                bytes_in=text_size(code_source),
+                error=str(e),
+            )
+        finally:
+            self.transformation_loader.release_transformation(transformer)
+
+    def fermer(self):
+        """Libere les instances de plugins en pool (appelle leur teardown)."""
+        if self.transformation_loader:
+            self.transformation_loader.shutdown()
 
     def lister_transformations_modulaires(self):
         """Liste les transformations modulaires si disponibles."""
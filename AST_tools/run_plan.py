@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Execution d'un plan de transformation en ligne de commande (sans interface)
+===========================================================================
+
+    python -m AST_tools.run_plan plan.json src/ --jobs 8
+    python run_plan.py plan.json "src/**/*.py" --exclude "tests/*" --dry-run --format ndjson
+
+Les fichiers sont transformes en parallele (un processus par job, chacun avec
+son propre OrchestrateurAST) puis ecrits par le processus principal avec
+l'ecriture atomique journalisee de core.write_back : un run peut donc etre
+annule avec --rollback RUN_ID.
+
+Les instructions generator du plan sont rendues une seule fois, par le
+processus principal, et ecrites dans le meme run (listees comme les autres
+resultats, avec "generated": true).
+
+Ce module n'importe jamais PySide6. Les messages du moteur sont envoyes sur
+stderr ; stdout ne contient que les resultats (texte, JSON ou NDJSON).
+
+Codes de sortie :
+    0  succes (ou aucune modification prevue avec --check)
+    1  au moins un fichier en erreur
+    2  arguments ou plan invalides, aucun fichier trouve
+    3  --check : des fichiers seraient modifies
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_project_root = Path(__file__).parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+EXIT_OK = 0
+EXIT_FILE_ERRORS = 1
+EXIT_USAGE = 2
+EXIT_CHANGES_PENDING = 3
+
+DEFAULT_INCLUDE = ["*.py"]
+DEFAULT_EXCLUDE = [
+    ".git",
+    ".hg",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".ast_cache",
+    ".mypy_cache",
+    ".ruff_cache",
+    "build",
+    "dist",
+]
+
+# Etat d'un processus de travail (initialise une fois par processus)
+_worker = {}
+
+
+# ==============================================================================
+# Selection des fichiers
+# ==============================================================================
+def _matches(rel_path: str, patterns: Iterable[str]) -> bool:
+    """Teste un chemin relatif (format posix) contre des motifs fnmatch."""
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def collect_files(paths: List[str], include: List[str], exclude: List[str]) -> List[str]:
+    """
+    Resout les chemins de la ligne de commande en une liste de fichiers.
+
+    Un chemin peut etre un fichier (toujours retenu), un repertoire (parcouru
+    recursivement, les sous-repertoires exclus ne sont pas visites) ou un motif
+    glob (`src/**/*.py`). Les filtres include/exclude s'appliquent au nom du
+    fichier ou a son chemin relatif a la racine parcourue.
+    """
+    found = []
+    seen = set()
+
+    def add(path: str):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            found.append(path)
+
+    for entry in paths:
+        if os.path.isfile(entry):
+            add(entry)
+            continue
+
+        if os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                rel_root = os.path.relpath(root, entry).replace(os.sep, "/")
+                rel_root = "" if rel_root == "." else rel_root + "/"
+                dirs[:] = sorted(d for d in dirs if not _matches(rel_root + d, exclude))
+                for name in sorted(files):
+                    rel_path = rel_root + name
+                    if _matches(rel_path, include) and not _matches(rel_path, exclude):
+                        add(os.path.join(root, name))
+            continue
+
+        for match in sorted(glob.glob(entry, recursive=True)):
+            rel_path = match.replace(os.sep, "/")
+            if os.path.isfile(match) and not _matches(rel_path, exclude):
+                add(match)
+
+    return found
+
+
+# ==============================================================================
+# Travail par fichier
+# ==============================================================================
+def _init_worker(plan_path: str, quiet: bool, jobs: int = 1):
+    """Initialise l'orchestrateur et le plan d'un processus de travail."""
+    # Les messages du moteur ne doivent jamais polluer stdout (deja redirige
+    # dans le processus principal et les processus crees par fork)
+    if sys.stdout is sys.__stdout__:
+        sys.stdout = open(os.devnull, "w") if quiet else sys.stderr
+
+    if jobs > 1:
+        from core.subprocess_executor import configure_executor, default_max_workers
+
+        # Les jobs se partagent la limite d'outils externes simultanes (coeurs par defaut)
+        configure_executor(max(1, default_max_workers() // jobs))
+
+    from modificateur_interactif import OrchestrateurAST
+
+    orchestrateur = OrchestrateurAST()
+    _worker["orchestrateur"] = orchestrateur
+    _worker["plan"] = orchestrateur.charger_plan(plan_path)
+
+
+def _process_files(task) -> List[Dict]:
+    """Transforme un paquet de fichiers en memoire et retourne des resultats serialisables."""
+    paths, include_diff, keep_content = task
+    results = []
+    for file_diff in _worker["orchestrateur"].transformer_fichiers(_worker["plan"], paths):
+        result = file_diff.to_dict(include_diff=include_diff)
+        if keep_content and file_diff.changed and not file_diff.error:
+            result["content"] = file_diff.transformed
+        results.append(result)
+    return results
+
+
+def iter_results(
+    plan_path: str,
+    files: List[str],
+    jobs: int = 1,
+    include_diff: bool = False,
+    keep_content: bool = True,
+    quiet: bool = False,
+    batch_size: int = 50,
+) -> Iterator[Dict]:
+    """
+    Genere le resultat de chaque fichier, dans l'ordre de la liste d'entree.
+
+    Les fichiers sont traites par paquets (au plus batch_size) : les wrappers
+    d'outils externes sont appeles une fois par paquet. Avec jobs > 1, les
+    paquets sont repartis entre processus ; le contenu transforme n'est
+    renvoye que pour les fichiers modifies.
+    """
+    jobs = max(1, jobs)
+    size = max(1, min(batch_size, -(-len(files) // (jobs * 4))))
+    tasks = [
+        (files[start : start + size], include_diff, keep_content)
+        for start in range(0, len(files), size)
+    ]
+    if jobs == 1:
+        _init_worker(plan_path, quiet)
+        for results in map(_process_files, tasks):
+            yield from results
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(plan_path, quiet, jobs)
+    ) as executor:
+        for results in executor.map(_process_files, tasks):
+            yield from results
+
+
+# ==============================================================================
+# Sorties
+# ==============================================================================
+def _print_text(result: Dict, out, show_diff: bool):
+    if result["error"]:
+        status = "ERREUR"
+    elif result.get("generated"):
+        status = "GENERE"
+    elif result["changed"]:
+        status = "MODIFIE"
+    else:
+        status = "INCHANGE"
+    line = f"[{status}] {result['path']}"
+    if result["changed"]:
+        line += f" (+{result['added']} -{result['removed']})"
+    if result["error"]:
+        line += f": {result['error']}"
+    print(line, file=out)
+    if show_diff and result.get("diff"):
+        out.write(result["diff"])
+
+
+def _print_summary_text(summary: Dict, out):
+    print(
+        f"{summary['files']} fichier(s), {summary['changed']} modifie(s) "
+        f"(+{summary['added']} -{summary['removed']}), {summary['errors']} erreur(s), "
+        f"{summary['written']} ecrit(s)",
+        file=out,
+    )
+    if summary.get("run_id"):
+        print(f"Run {summary['run_id']} (annulable avec --rollback)", file=out)
+
+
+# ==============================================================================
+# Point d'entree
+# ==============================================================================
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="run_plan",
+        description="Execute un plan de transformation JSON sur des fichiers, sans interface.",
+    )
+    parser.add_argument("plan", nargs="?", help="Plan de transformation JSON")
+    parser.add_argument(
+        "paths", nargs="*", help="Fichiers, repertoires ou motifs glob (src/**/*.py)"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Nombre de processus (defaut: 1)")
+    parser.add_argument(
+        "--include",
+        action="append",
+        help="Motif des fichiers a inclure (repetable, defaut: *.py)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Motif de fichiers ou repertoires a exclure (repetable)",
+    )
+    parser.add_argument(
+        "--no-default-excludes",
+        action="store_true",
+        help="Ne pas exclure .git, venv, __pycache__, build, ...",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="N'ecrire aucun fichier")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Comme --dry-run, code de sortie 3 si des fichiers seraient modifies",
+    )
+    parser.add_argument(
+        "--diff", action="store_true", help="Inclure le diff unifie dans les resultats"
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json", "ndjson"),
+        default="text",
+        help="Format des resultats sur stdout",
+    )
+    parser.add_argument("-o", "--output", help="Ecrire les resultats dans ce fichier")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Taille des paquets de fichiers (transformation et ecriture)",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="Masquer les messages du moteur")
+    parser.add_argument(
+        "--rollback", metavar="RUN_ID", help="Annuler un run precedent puis quitter"
+    )
+    return parser
+
+
+def _rollback(run_id: str, out, output_format: str) -> int:
+    from core.write_back import rollback_run
+
+    result = rollback_run(run_id)
+    if output_format == "text":
+        print(
+            f"Run {run_id}: {len(result['restored']) + len(result['deleted'])} restaure(s), "
+            f"{len(result['skipped'])} ignore(s), {len(result['errors'])} erreur(s)",
+            file=out,
+        )
+        for error in result["errors"]:
+            print(f"[ERREUR] {error}", file=out)
+    else:
+        print(json.dumps({"run_id": run_id, **result}), file=out)
+    return EXIT_FILE_ERRORS if result["errors"] else EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    log_stream = open(os.devnull, "w") if args.quiet else sys.stderr
+    try:
+        with contextlib.redirect_stdout(log_stream):
+            return _run(args, parser, out)
+    finally:
+        if args.output:
+            out.close()
+        if args.quiet:
+            log_stream.close()
+
+
+def _run(args, parser, out) -> int:
+    if args.rollback:
+        return _rollback(args.rollback, out, args.format)
+
+    if not args.plan or not args.paths:
+        parser.print_usage(sys.stderr)
+        print("run_plan: erreur: un plan et au moins un chemin sont requis", file=sys.stderr)
+        return EXIT_USAGE
+
+    # Validation du plan avant de demarrer les processus
+    from modificateur_interactif import OrchestrateurAST
+
+    orchestrateur = OrchestrateurAST()
+    plan = orchestrateur.charger_plan(args.plan)
+    if plan is None:
+        return EXIT_USAGE
+
+    include = args.include or DEFAULT_INCLUDE
+    exclude = args.exclude + ([] if args.no_default_excludes else DEFAULT_EXCLUDE)
+    files = collect_files(args.paths, include, exclude)
+    generates = any(i.type == "generator" for i in plan.transformations)
+    if not files and not generates:
+        print("run_plan: erreur: aucun fichier a traiter", file=sys.stderr)
+        return EXIT_USAGE
+
+    from core.write_back import AtomicWriteBack, WriteBackJournal
+
+    dry_run = args.dry_run or args.check
+    journal = None if dry_run else WriteBackJournal(description=os.path.basename(args.plan))
+    summary = {"files": 0, "changed": 0, "added": 0, "removed": 0, "errors": 0, "written": 0}
+    all_results = []
+
+    def report(result: Dict):
+        summary["files"] += 1
+        summary["errors"] += bool(result["error"])
+        if result["changed"]:
+            summary["changed"] += 1
+            summary["added"] += result["added"]
+            summary["removed"] += result["removed"]
+
+        if args.format == "ndjson":
+            print(json.dumps(result), file=out, flush=True)
+        elif args.format == "json":
+            all_results.append(result)
+        else:
+            _print_text(result, out, args.diff)
+
+    with AtomicWriteBack(journal=journal, batch_size=args.batch_size) as write_back:
+        for result in iter_results(
+            args.plan,
+            files,
+            jobs=max(1, args.jobs),
+            include_diff=args.diff,
+            keep_content=not dry_run,
+            quiet=args.quiet,
+            batch_size=args.batch_size,
+        ):
+            content = result.pop("content", None)
+            if content is not None:
+                write_back.stage(result["path"], content)
+            report(result)
+
+        # Generation : un seul rendu pour tout le run, tout ou rien
+        for file_diff in orchestrateur.apercu_generateurs(plan, files) if generates else []:
+            if not dry_run and not file_diff.error and file_diff.changed:
+                Path(file_diff.path).parent.mkdir(parents=True, exist_ok=True)
+                write_back.stage(file_diff.path, file_diff.transformed)
+            report({**file_diff.to_dict(include_diff=args.diff), "generated": True})
+
+    for error in write_back.errors:
+        print(f"[ERREUR] {error}", file=sys.stderr)
+    summary["errors"] += write_back.stats["failed"]
+    summary["written"] = write_back.stats["written"]
+    summary["run_id"] = journal.run_id if journal and journal.entries else None
+    summary["dry_run"] = dry_run
+
+    if args.format == "ndjson":
+        print(json.dumps({"summary": summary}), file=out)
+    elif args.format == "json":
+        json.dump({"summary": summary, "files": all_results}, out, indent=2)
+        out.write("\n")
+    else:
+        _print_summary_text(summary, out)
+
+    if summary["errors"]:
+        return EXIT_FILE_ERRORS
+    if args.check and summary["changed"]:
+        return EXIT_CHANGES_PENDING
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
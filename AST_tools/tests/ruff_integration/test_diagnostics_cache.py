@@ -0,0 +1,135 @@
+# tests/ruff_integration/test_diagnostics_cache.py
+"""
+Tests pour le cache incremental des diagnostics Ruff
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.ruff_integration import ruff_runner
+from core.ruff_integration.diagnostics_cache import DiagnosticsCache
+
+requires_ruff = pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff non installe")
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+class TestDiagnosticsCache:
+    """Tests de DiagnosticsCache."""
+
+    def test_invalidation_par_contenu_version_et_configuration(self, tmp_path, cache_dir):
+        """Une entree n'est servie que si contenu, version, options et configuration sont inchanges."""
+        projet = tmp_path / "projet"
+        projet.mkdir()
+        fichier = projet / "m.py"
+        fichier.write_text("import os\n", encoding="utf-8")
+
+        cache = DiagnosticsCache("0.12.7", ["--select", "F401"])
+        cache.store(str(fichier), [{"code": "F401"}])
+        cache.save()
+
+        relu = DiagnosticsCache("0.12.7", ["--select", "F401"])
+        assert relu.lookup([str(fichier)]) == ({str(fichier): [{"code": "F401"}]}, [])
+        assert relu.hit_rate() == 1.0
+
+        assert DiagnosticsCache("0.13.0", ["--select", "F401"]).lookup([str(fichier)])[1]
+        assert DiagnosticsCache("0.12.7").lookup([str(fichier)])[1]
+
+        (projet / "ruff.toml").write_text("line-length = 80\n", encoding="utf-8")
+        assert DiagnosticsCache("0.12.7", ["--select", "F401"]).lookup([str(fichier)])[1]
+
+        fichier.write_text("import sys\n", encoding="utf-8")
+        cache = DiagnosticsCache("0.12.7", ["--select", "F401"])
+        assert cache.lookup([str(fichier)]) == ({}, [str(fichier)])
+        assert cache.hit_rate() == 0.0
+
+    def test_cle_de_lookup_reprise_par_store(self, tmp_path, cache_dir, monkeypatch):
+        """Un fichier modifie pendant l'analyse n'est pas servi ; un seul hachage par fichier."""
+        fichier = tmp_path / "m.py"
+        fichier.write_text("import os\n", encoding="utf-8")
+        cache = DiagnosticsCache("0.12.7")
+        appels = []
+        file_key = cache.file_key
+        monkeypatch.setattr(cache, "file_key", lambda f: appels.append(f) or file_key(f))
+
+        assert cache.lookup([str(fichier)]) == ({}, [str(fichier)])
+        fichier.write_text("import sys\n", encoding="utf-8")  # modifie pendant l'analyse
+        cache.store(str(fichier), [{"code": "F401", "message": "os"}])
+        assert appels == [str(fichier)]
+        cache.save()
+
+        assert DiagnosticsCache("0.12.7").lookup([str(fichier)]) == ({}, [str(fichier)])
+
+    def test_sauvegarde_incrementale(self, tmp_path, cache_dir):
+        """save() n'ecrit que les entrees enregistrees depuis la derniere sauvegarde."""
+        fichiers = []
+        for i in range(1_000):
+            fichier = tmp_path / f"m{i}.py"
+            fichier.write_text(f"x = {i}\n", encoding="utf-8")
+            fichiers.append(str(fichier))
+        cache = DiagnosticsCache("0.12.7")
+        for fichier in fichiers:
+            cache.store(fichier, [])
+        assert cache.save()
+
+        relu = DiagnosticsCache("0.12.7")
+        Path(fichiers[0]).write_text("import os\n", encoding="utf-8")
+        hits, misses = relu.lookup(fichiers)
+        assert len(hits) == 999 and misses == fichiers[:1]
+        relu.store(fichiers[0], [{"code": "F401"}])
+        avant = relu.connection.total_changes
+        assert relu.save()
+        assert relu.connection.total_changes - avant == 1
+        assert DiagnosticsCache("0.12.7").lookup(fichiers[:1])[0] == {
+            fichiers[0]: [{"code": "F401"}]
+        }
+
+        relu.clear()
+        assert DiagnosticsCache("0.12.7").lookup(fichiers[:2])[1] == fichiers[:2]
+
+    @requires_ruff
+    def test_seuls_les_fichiers_modifies_sont_analyses(self, tmp_path, cache_dir):
+        """Deuxieme analyse : Ruff ne recoit que le fichier modifie."""
+        fichiers = []
+        for i in range(3):
+            fichier = tmp_path / f"m{i}.py"
+            fichier.write_text("import os\n", encoding="utf-8")
+            fichiers.append(str(fichier))
+        args = ["--select", "F401"]
+
+        list(
+            ruff_runner.iter_check(
+                fichiers, extra_args=args, cache=ruff_runner.open_diagnostics_cache(args)
+            )
+        )
+
+        Path(fichiers[1]).write_text("x = 1\n", encoding="utf-8")
+        appels = []
+        run = subprocess.run
+
+        def run_compte(cmd, *a, **kw):
+            appels.append(cmd)
+            return run(cmd, *a, **kw)
+
+        cache = ruff_runner.open_diagnostics_cache(args)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(subprocess, "run", run_compte)
+            paquets = list(ruff_runner.iter_check(fichiers, extra_args=args, cache=cache))
+
+        assert len(appels) == 1 and appels[0][-1:] == [fichiers[1]]
+        assert (cache.hits, cache.misses) == (2, 1)
+        resultats = {f: r for _, paquet in paquets for f, r in paquet.items()}
+        assert resultats[fichiers[0]]["cached"]
+        assert [d["code"] for d in resultats[fichiers[0]]["diagnostics"]] == ["F401"]
+        assert [d["code"] for d in resultats[fichiers[2]]["diagnostics"]] == ["F401"]
+        assert resultats[fichiers[1]]["diagnostics"] == []
@@ -0,0 +1,71 @@
+# tests/ruff_integration/test_issue_store.py
+"""
+Tests pour le stockage compact des diagnostics Ruff
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.ruff_integration.issue_store import IssueStore, issue_category, issue_severity
+
+
+def _diagnostic(code, row=1, fix=False):
+    return {
+        "code": code,
+        "location": {"row": row, "column": 1},
+        "message": f"message {code}",
+        "fix": {"applicability": fix, "edits": []} if fix else None,
+    }
+
+
+class TestIssueStore:
+    """Tests de IssueStore."""
+
+    def test_agregats_par_regle_categorie_fichier_et_severite(self):
+        """Les index donnent les regroupements sans reparcourir les diagnostics."""
+        store = IssueStore()
+        store.add("a.py", [_diagnostic("F401", fix="safe"), _diagnostic("E501", 2)])
+        store.add(
+            "b.py", [_diagnostic("F401"), _diagnostic(None, 3), _diagnostic("UP006", fix="unsafe")]
+        )
+        store.add("c.py", [])
+
+        assert len(store) == 5
+        assert store.codes == ["F401", "E501", "syntax", "UP006"]
+        assert store.count_by_code() == {"F401": 2, "E501": 1, "syntax": 1, "UP006": 1}
+        assert store.count_by_file() == {"a.py": 2, "b.py": 3, "c.py": 0}
+        assert store.count_by_category() == {
+            "Erreurs Python": 3,
+            "Style et Formatage": 1,
+            "Autres": 1,
+        }
+        assert store.severity_summary() == {"error": 3, "warning": 1, "info": 1}
+        assert list(store.rows_for_code("F401")) == [0, 2]
+        assert store.rows_for_category("Erreurs Python") == [0, 2, 3]
+        assert store.issue(3)["code"] is None
+        assert store.issue(0)["fixable"]
+        # Correction "unsafe" : non appliquee par ruff check --fix
+        assert store.issue(4)["applicability"] == "unsafe" and not store.issue(4)["fixable"]
+        assert store.fixable(4, accepted=("safe", "unsafe"))
+
+    def test_serialisation_compacte(self):
+        """to_dict / from_dict conservent colonnes et index."""
+        store = IssueStore()
+        store.add("a.py", [_diagnostic("F401", 4), _diagnostic("E501", 9)])
+        data = json.loads(json.dumps(store.to_dict()))
+        relu = IssueStore.from_dict(data)
+
+        assert relu.count_by_code() == store.count_by_code()
+        assert list(relu.rows_for_file("a.py")) == [0, 1]
+        assert relu.issue(1) == store.issue(1)
+
+    def test_categories_et_severites(self):
+        """Les regles de classement suivent la premiere lettre du code."""
+        assert issue_category("N802") == "Nommage"
+        assert issue_category("syntax") == "Erreurs Python"
+        assert issue_severity("E902") == "error"
+        assert issue_severity("W291") == "warning"
+        assert issue_severity("D100") == "info"
@@ -0,0 +1,149 @@
+# tests/ruff_integration/test_plan_builder.py
+"""
+Tests pour la generation de plans depuis les diagnostics Ruff
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.models import TARGET_FILES_PARAM
+from core.ruff_integration import ruff_runner
+from core.ruff_integration.issue_store import IssueStore
+from core.ruff_integration.plan_builder import plan_from_store, save_generated_plan, save_plan
+
+requires_ruff = pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff non installe")
+
+
+def _store_ruff(fichiers, regles):
+    """IssueStore construit depuis la sortie JSON de ruff check."""
+    store = IssueStore()
+    for chunk, resultats in ruff_runner.iter_check(fichiers, extra_args=["--select", regles]):
+        for fichier in chunk:
+            store.add(fichier, resultats[fichier]["diagnostics"])
+    return store
+
+
+def _diagnostic(code, fix):
+    return {
+        "code": code,
+        "location": {"row": 1, "column": 1},
+        "message": code,
+        "fix": {"edits": []} if fix else None,
+    }
+
+
+class TestPlanFromStore:
+    """Tests de plan_from_store."""
+
+    @requires_ruff
+    def test_une_instruction_ruff_et_une_par_artisan(self, tmp_path):
+        """Diagnostics reels : T201 (correction "unsafe") va a l'artisan, avant Ruff."""
+        sources = {
+            "a.py": 'import os\nprint("a")\n',
+            "b.py": "def f():\n    x = 1\n",
+            "c.py": "y = 1\n",
+        }
+        fichiers = []
+        for nom, code in sources.items():
+            fichier = tmp_path / nom
+            fichier.write_text(code, encoding="utf-8")
+            fichiers.append(str(fichier))
+        store = _store_ruff(fichiers, "F401,F841,T201")
+        assert store.issue(store.rows_for_code("T201")[0])["applicability"] == "unsafe"
+
+        plan, cibles = plan_from_store(store)
+
+        assert cibles == fichiers[:1]
+        logging_, ruff = plan.transformations
+        assert logging_.plugin_name == "print_to_logging_transform"
+        assert logging_.params == {TARGET_FILES_PARAM: fichiers[:1]}
+        assert ruff.plugin_name == "ruff_wrapper"
+        # F841 n'a qu'une correction "unsafe" : hors plan sans unsafe_fixes
+        assert ruff.params["select"] == ["F401"]
+        assert ruff.params[TARGET_FILES_PARAM] == fichiers[:1]
+
+        plan, cibles = plan_from_store(store, ruff_params={"unsafe_fixes": True})
+        assert cibles == fichiers[:2]
+        assert plan.transformations[-1].params["select"] == ["F401", "F841"]
+
+    @requires_ruff
+    def test_artisan_seulement_pour_les_regles_qu_il_corrige(self, tmp_path):
+        """D100 n'est pas confie a l'artisan docstrings ; D103 l'est, et il est corrige."""
+        from core.plugins.artisans.add_docstrings_transform import AddDocstringsTransform
+
+        module = tmp_path / "module.py"
+        module.write_text("x = 1\n", encoding="utf-8")
+        fonctions = tmp_path / "fonctions.py"
+        fonctions.write_text("async def f():\n    pass\n", encoding="utf-8")
+        store = _store_ruff([str(module), str(fonctions)], "D100,D103")
+        assert sorted(store.count_by_code()) == ["D100", "D103"]
+
+        plan, cibles = plan_from_store(store)
+
+        assert cibles == [str(fonctions)]
+        (instruction,) = plan.transformations
+        assert instruction.plugin_name == "add_docstrings_transform"
+        fonctions.write_text(
+            AddDocstringsTransform().transform(fonctions.read_text(encoding="utf-8")),
+            encoding="utf-8",
+        )
+        assert "D103" not in _store_ruff([str(fonctions)], "D103").count_by_code()
+
+    def test_aucun_plan_sans_probleme_traitable(self):
+        """Sans regle corrigeable ni artisan, aucun plan n'est produit."""
+        store = IssueStore()
+        store.add("a.py", [_diagnostic("E501", False)])
+        assert plan_from_store(store) is None
+
+    @requires_ruff
+    def test_plan_execute_en_une_passe(self, tmp_path, monkeypatch):
+        """Le plan genere corrige les fichiers vises sans toucher les autres."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        fichiers = []
+        for i, code in enumerate(["import os\nx = 1\n", "import sys\n", "y  =  2\n"]):
+            fichier = tmp_path / f"m{i}.py"
+            fichier.write_text(code, encoding="utf-8")
+            fichiers.append(str(fichier))
+
+        store = _store_ruff(fichiers[:1], "F")
+        plan, cibles = plan_from_store(store)
+        assert cibles == fichiers[:1]
+
+        plan_path = tmp_path / "plan.json"
+        save_plan(plan, str(plan_path))
+        assert OrchestrateurAST().executer_plan(str(plan_path), fichiers)
+
+        assert Path(fichiers[0]).read_text(encoding="utf-8") == "x = 1\n"
+        # Hors cible : l'import inutilise de m1.py reste en place
+        assert Path(fichiers[1]).read_text(encoding="utf-8") == "import sys\n"
+
+
+class TestSaveGeneratedPlan:
+    """Tests du rangement des plans generes."""
+
+    def test_plan_identique_reutilise_et_anciens_purges(self, tmp_path):
+        """Meme plan : meme fichier ; au-dela de keep, les plus anciens sont supprimes."""
+        plans = []
+        for code in ("E701", "E702", "E703"):
+            store = IssueStore()
+            store.add("a.py", [_diagnostic(code, True)])
+            plans.append(plan_from_store(store)[0])
+
+        premier = save_generated_plan(plans[0], directory=tmp_path, keep=2)
+        assert save_generated_plan(plans[0], directory=tmp_path, keep=2) == premier
+        os.utime(premier, (1, 1))
+        deuxieme = save_generated_plan(plans[1], directory=tmp_path, keep=2, protected=premier)
+        troisieme = save_generated_plan(plans[2], directory=tmp_path, keep=2, protected=premier)
+
+        # Le plus ancien est garde tant qu'il est charge dans l'interface
+        assert sorted(tmp_path.iterdir()) == sorted([premier, deuxieme, troisieme])
+        save_generated_plan(plans[2], directory=tmp_path, keep=2)
+        assert sorted(tmp_path.iterdir()) == sorted([deuxieme, troisieme])
@@ -0,0 +1,132 @@
+# tests/ruff_integration/test_ruff_runner.py
+"""
+Tests pour l'execution groupee de Ruff (un appel par paquet de fichiers)
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.ruff_integration import ruff_runner
+
+requires_ruff = pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff non installe")
+
+
+@pytest.fixture
+def appels_ruff(monkeypatch, tmp_path):
+    """Compte les appels a subprocess.run une fois Ruff resolu et sonde."""
+    monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    ruff_runner.ruff_info()
+    appels = []
+    run = subprocess.run
+
+    def run_compte(cmd, *args, **kwargs):
+        appels.append(cmd)
+        return run(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", run_compte)
+    return appels
+
+
+def _ecrire(tmp_path, contenus):
+    fichiers = []
+    for i, contenu in enumerate(contenus):
+        fichier = tmp_path / f"m{i}.py"
+        fichier.write_text(contenu, encoding="utf-8")
+        fichiers.append(str(fichier))
+    return fichiers
+
+
+class TestDecoupage:
+    """Tests du decoupage en paquets."""
+
+    def test_paquets_bornes(self):
+        """Chaque paquet respecte la longueur maximale, l'ordre est conserve."""
+        fichiers = [f"f{i:02d}.py" for i in range(10)]
+        paquets = ruff_runner.chunk_files(fichiers, max_chars=16)
+        assert [f for paquet in paquets for f in paquet] == fichiers
+        assert all(sum(len(f) + 1 for f in paquet) <= 16 for paquet in paquets)
+        assert ruff_runner.chunk_files(fichiers) == [fichiers]
+
+    def test_paquets_bornes_en_nombre_de_fichiers(self):
+        """max_files limite la taille des paquets pour rendre les resultats au fil de l'eau."""
+        fichiers = [f"f{i}.py" for i in range(5)]
+        assert ruff_runner.chunk_files(fichiers, max_files=2) == [
+            ["f0.py", "f1.py"],
+            ["f2.py", "f3.py"],
+            ["f4.py"],
+        ]
+
+    def test_collecte_recursive_sans_dossiers_exclus(self, tmp_path):
+        """Les fichiers Python sont collectes recursivement, hors .venv, __pycache__, ..."""
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / ".venv").mkdir()
+        for chemin in ("a.py", "pkg/b.py", "pkg/notes.txt", ".venv/c.py"):
+            (tmp_path / chemin).write_text("", encoding="utf-8")
+
+        trouves = ruff_runner.collect_python_files(str(tmp_path))
+        assert sorted(Path(f).relative_to(tmp_path).as_posix() for f in trouves) == [
+            "a.py",
+            "pkg/b.py",
+        ]
+        assert ruff_runner.collect_python_files(str(tmp_path / "a.py")) == [str(tmp_path / "a.py")]
+
+
+class TestCheck:
+    """Tests de ruff check groupe."""
+
+    @requires_ruff
+    def test_un_appel_redistribue_par_fichier(self, tmp_path, appels_ruff):
+        """Un seul appel, les diagnostics reviennent a leur fichier (erreur de syntaxe comprise)."""
+        fichiers = _ecrire(tmp_path, ["import os\n", "x = 1\n", "def (:\n"])
+        paquets = list(ruff_runner.iter_check(fichiers, extra_args=["--select", "F401"]))
+
+        assert len(appels_ruff) == 1
+        [(paquet, resultats)] = paquets
+        assert paquet == fichiers
+        assert [d["code"] for d in resultats[fichiers[0]]["diagnostics"]] == ["F401"]
+        assert resultats[fichiers[1]]["diagnostics"] == []
+        assert resultats[fichiers[2]]["diagnostics"][0]["code"] is None
+        assert all(r["error"] is None for r in resultats.values())
+
+    @requires_ruff
+    def test_fix_detecte_les_fichiers_modifies(self, tmp_path, appels_ruff):
+        """--fix : seuls les fichiers reellement reecrits sont marques corriges."""
+        fichiers = _ecrire(tmp_path, ["import os\nx = 1\n", "x = 1\n"])
+        resultats = ruff_runner.check_chunk(fichiers, fix=True, extra_args=["--select", "F401"])
+
+        assert resultats[fichiers[0]]["fixed"]
+        assert not resultats[fichiers[1]]["fixed"]
+        assert Path(fichiers[0]).read_text(encoding="utf-8") == "x = 1\n"
+
+
+class TestFormat:
+    """Tests de ruff format groupe."""
+
+    @requires_ruff
+    def test_echec_limite_au_fichier_invalide(self, tmp_path, appels_ruff):
+        """Un fichier invalide n'empeche pas le formatage des autres."""
+        fichiers = _ecrire(tmp_path, ["x  =  1\n", "def (:\n"])
+        resultats = ruff_runner.format_chunk(fichiers)
+
+        assert len(appels_ruff) == 1
+        assert resultats[fichiers[0]] == {"formatted": True, "error": None}
+        assert not resultats[fichiers[1]]["formatted"]
+        assert Path(fichiers[0]).read_text(encoding="utf-8") == "x = 1\n"
+
+    @requires_ruff
+    def test_erreur_attribuee_au_chemin_exact(self, tmp_path, monkeypatch):
+        """L'erreur de ba.py n'est pas attribuee a a.py (chemins compares, pas sous-chaines)."""
+        (tmp_path / "a.py").write_text("x  =  1\n", encoding="utf-8")
+        (tmp_path / "ba.py").write_text("def (:\n", encoding="utf-8")
+        # Ruff affiche les chemins relatifs au dossier courant
+        monkeypatch.chdir(tmp_path)
+        resultats = ruff_runner.format_chunk(["a.py", str(tmp_path / "ba.py")])
+
+        assert resultats["a.py"] == {"formatted": True, "error": None}
+        assert not resultats[str(tmp_path / "ba.py")]["formatted"]
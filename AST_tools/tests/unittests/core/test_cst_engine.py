@@ -0,0 +1,82 @@
+# tests/unittests/core/test_cst_engine.py
+"""
+Tests unitaires pour le moteur de reecriture preservant le format
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.artisans.add_docstrings_transform import AddDocstringsTransform
+from core.plugins.artisans.print_to_logging_transform import PrintToLoggingTransform
+from core.plugins.artisans.unused_import_remover import UnusedImportRemover
+from core.plugins.base.cst_engine import EditConflictError, SourceRewriter
+
+CODE = '''"""Module."""
+
+import os, sys  # systeme
+import json
+
+
+def f(x):   # espaces conserves
+    print("é", x, sep="-")  # trace
+    return sys.argv
+'''
+
+
+class TestSourceRewriter:
+    """Tests de SourceRewriter."""
+
+    def test_collages_minimaux(self):
+        """Seules les portions modifiees changent, positions UTF-8 comprises."""
+        rewriter = SourceRewriter(CODE)
+        appel = rewriter.tree.body[3].body[0].value
+        rewriter.replace(appel.func, "logging.info")
+        rewriter.insert_after(appel.args[1], " + 1")
+
+        assert rewriter.apply() == CODE.replace(
+            'print("é", x, sep="-")', 'logging.info("é", x + 1, sep="-")'
+        )
+
+    def test_suppression_d_instructions(self):
+        """Ligne entiere (commentaire compris) ou instruction separee par ';'."""
+        rewriter = SourceRewriter("import a  # c\nx = 1; import b\nimport c; y = 2\n")
+        for node in rewriter.tree.body:
+            if node.__class__.__name__ == "Import":
+                rewriter.remove_statement(node)
+        assert rewriter.apply() == "x = 1\ny = 2\n"
+
+    def test_conflit(self):
+        """Deux modifications qui se chevauchent sont refusees."""
+        rewriter = SourceRewriter("x = 1\n")
+        rewriter.replace_span(0, 3, "y =")
+        rewriter.replace_span(2, 5, "= 2")
+        with pytest.raises(EditConflictError):
+            rewriter.apply()
+
+
+class TestArtisansPreserventLeFormat:
+    """Les artisans ne modifient que les lignes concernees."""
+
+    def test_print_vers_logging(self):
+        resultat = PrintToLoggingTransform().transform(CODE)
+        assert resultat == CODE.replace(
+            '"""Module."""\n', '"""Module."""\nimport logging\n'
+        ).replace('print("é", x, sep="-")', 'logging.info("é", x)')
+
+    def test_docstrings(self):
+        resultat = AddDocstringsTransform().transform(CODE)
+        assert resultat == CODE.replace(
+            "# espaces conserves\n", '# espaces conserves\n    """Fonction f."""\n'
+        )
+
+    def test_imports_inutilises(self):
+        resultat = UnusedImportRemover().transform(CODE)
+        assert resultat == CODE.replace(
+            "import os, sys  # systeme\nimport json\n", "import sys  # systeme\n"
+        )
+        code_future = "from __future__ import annotations\nimport os.path\nos.path.join\n"
+        assert UnusedImportRemover().transform(code_future) == code_future
@@ -0,0 +1,105 @@
+# tests/unittests/core/test_diff_engine.py
+"""
+Tests unitaires pour le moteur de diff et le mode dry-run de l'orchestrateur
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.diff_engine import FileDiff, summarize_diffs
+
+PLAN_PRINT = {
+    "name": "Plan dry-run",
+    "description": "Conversion print vers logging",
+    "transformations": [
+        {
+            "type": "appel_plugin",
+            "description": "print -> logging",
+            "plugin_name": "print_to_logging_transform",
+        }
+    ],
+}
+
+
+@pytest.fixture
+def orchestrateur(tmp_path, monkeypatch):
+    """Orchestrateur utilisant un cache isole."""
+    monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    from modificateur_interactif import OrchestrateurAST
+
+    return OrchestrateurAST()
+
+
+class TestFileDiff:
+    """Tests pour FileDiff."""
+
+    def test_statistiques(self):
+        """Les lignes ajoutees et supprimees sont comptees."""
+        diff = FileDiff("a.py", "a = 1\nb = 2\n", "a = 1\nb = 3\nc = 4\n")
+        assert diff.changed
+        assert diff.added == 2
+        assert diff.removed == 1
+        assert "+b = 3" in diff.diff_text
+        assert diff.diff_text.startswith("--- a/a.py")
+
+    def test_statistiques_conformes_au_diff_affiche(self):
+        """Les compteurs sont ceux des lignes +/- du diff unifie (en-tetes exclus)."""
+        original = "".join(f"x{i % 7} = {i}\n" for i in range(2_000))
+        transforme = original.replace("x3 = ", "y3 = ").replace("--", "")
+        transforme = "---\n" + transforme + "+++\n"
+        diff = FileDiff("a.py", original, transforme)
+        lignes = diff.diff_text.splitlines()[2:]
+        assert diff.added == sum(ligne.startswith("+") for ligne in lignes) > 0
+        assert diff.removed == sum(ligne.startswith("-") for ligne in lignes) > 0
+
+    def test_fichier_inchange(self):
+        """Un fichier inchange n'a ni diff ni statistiques."""
+        diff = FileDiff("a.py", "x = 1\n", "x = 1\n")
+        assert not diff.changed
+        assert diff.diff_text == ""
+        assert diff.to_dict() == {
+            "path": "a.py",
+            "changed": False,
+            "added": 0,
+            "removed": 0,
+            "error": None,
+        }
+
+    def test_summarize_diffs(self):
+        """L'agregation consomme un generateur sans le materialiser."""
+        diffs = (FileDiff(f"{i}.py", "x\n", "y\n" if i % 2 else "x\n") for i in range(4))
+        summary = summarize_diffs(diffs)
+        assert summary == {"files": 4, "changed": 2, "added": 2, "removed": 2, "errors": 0}
+
+
+class TestDryRun:
+    """Tests du mode dry-run de l'orchestrateur."""
+
+    def test_previsualiser_sans_ecriture(self, tmp_path, orchestrateur):
+        """Le dry-run produit les diffs sans modifier les fichiers."""
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(json.dumps(PLAN_PRINT), encoding="utf-8")
+        cible = tmp_path / "cible.py"
+        cible.write_text('print("hello")\n', encoding="utf-8")
+
+        diffs = orchestrateur.previsualiser_plan(str(plan_path), [str(cible)])
+        file_diff = next(diffs)
+
+        assert file_diff.changed
+        assert "logging.info" in file_diff.transformed
+        assert cible.read_text(encoding="utf-8") == 'print("hello")\n'
+
+    def test_executer_plan_dry_run(self, tmp_path, orchestrateur):
+        """executer_plan(dry_run=True) n'ecrit aucun fichier."""
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(json.dumps(PLAN_PRINT), encoding="utf-8")
+        cible = tmp_path / "cible.py"
+        cible.write_text('print("hello")\n', encoding="utf-8")
+
+        assert orchestrateur.executer_plan(str(plan_path), [str(cible)], dry_run=True)
+        assert cible.read_text(encoding="utf-8") == 'print("hello")\n'
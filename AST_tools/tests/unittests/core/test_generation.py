@@ -0,0 +1,174 @@
+# tests/unittests/core/test_generation.py
+"""
+Tests unitaires pour les instructions generator (generation de fichiers par lot)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.base.generation import check_collisions, render_items
+from core.plugins.generators.module_generator import ModuleGenerator
+from core.plugins.generators import test_generator
+
+
+def ecrire_plan(tmp_path, instructions):
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text(
+        json.dumps({"name": "Plan", "description": "generation", "transformations": instructions}),
+        encoding="utf-8",
+    )
+    return str(plan_path)
+
+
+class TestRenderItems:
+    """Tests du rendu et des collisions, sans ecriture."""
+
+    def test_un_fichier_par_element(self, tmp_path):
+        """Le nom de fichier est complete par l'element et les valeurs par defaut."""
+        params = {
+            "output_dir": str(tmp_path),
+            "filename": "tests/test_${module_name}.py",
+            "items": [{"module_name": "billing"}, {"class_name": "Api"}],
+        }
+        fichiers, erreurs = render_items(test_generator.TestFileGenerator(), params, label="tests")
+        assert erreurs == []
+        assert [f.path for f in fichiers] == [
+            tmp_path / "tests" / "test_billing.py",
+            tmp_path / "tests" / "test_my_module.py",
+        ]
+        assert "class TestApi(unittest.TestCase):" in fichiers[1].content
+
+    def test_element_invalide_et_chemin_hors_dossier(self, tmp_path):
+        """Parametre manquant et chemin sortant de output_dir sont des erreurs par element."""
+        params = {
+            "output_dir": str(tmp_path),
+            "filename": "${dossier}/${name}.py",
+            "items": [{"name": "a"}, {"name": "a", "dossier": ".."}, {"name": "b", "dossier": "x"}],
+        }
+        fichiers, erreurs = render_items(ModuleGenerator(), params, label="svc")
+        assert [f.path for f in fichiers] == [tmp_path / "x" / "b.py"]
+        assert erreurs[0].startswith("svc[0]: parametre manquant")
+        assert erreurs[1].startswith("svc[1]:") and "sort du dossier" in erreurs[1]
+
+    def test_collisions(self, tmp_path):
+        """Doublons, fichiers existants et fichiers cibles du plan sont refuses."""
+        (tmp_path / "existant.py").write_text("", encoding="utf-8")
+        params = {
+            "output_dir": str(tmp_path),
+            "items": [{"name": "existant"}, {"name": "nouveau"}, {"name": "nouveau"}],
+        }
+        fichiers, _ = render_items(ModuleGenerator(), params, label="svc")
+        erreurs = check_collisions(fichiers)
+        assert len(erreurs) == 2
+        assert "existe deja" in erreurs[0] and "deja genere par svc[1]" in erreurs[1]
+
+        params["overwrite"] = True
+        params["items"] = [{"name": "existant"}]
+        fichiers, _ = render_items(ModuleGenerator(), params)
+        assert check_collisions(fichiers) == []
+        assert check_collisions(fichiers, protected=[str(tmp_path / "existant.py")])
+
+
+class TestInstructionGenerator:
+    """Tests de l'execution des instructions generator par l'orchestrateur."""
+
+    def test_lot_ecrit_puis_annule(self, tmp_path, monkeypatch):
+        """Modules et tests d'un lot sont ecrits en un run, annulable en une fois."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        noms = [f"service_{i}" for i in range(200)]
+        sortie = tmp_path / "projet"
+        plan = ecrire_plan(
+            tmp_path,
+            [
+                {
+                    "type": "generator",
+                    "description": "services",
+                    "plugin_name": "module_generator",
+                    "params": {"output_dir": str(sortie), "items": [{"name": n} for n in noms]},
+                },
+                {
+                    "type": "generator",
+                    "description": "tests",
+                    "plugin_name": "test_generator",
+                    "params": {
+                        "output_dir": str(sortie / "tests"),
+                        "items": [{"module_name": n, "class_name": "Service"} for n in noms],
+                    },
+                },
+            ],
+        )
+
+        orchestrateur = OrchestrateurAST()
+        assert orchestrateur.executer_plan(plan, [])
+        assert len(list(sortie.glob("*.py"))) == 200
+        assert len(list((sortie / "tests").glob("test_*.py"))) == 200
+        assert "class Service_7Service:" in (sortie / "service_7.py").read_text(encoding="utf-8")
+
+        resultat = orchestrateur.annuler_execution()
+        assert len(resultat["deleted"]) == 400
+        assert list(sortie.rglob("*.py")) == []
+
+    def test_collision_aucun_fichier_ecrit(self, tmp_path, monkeypatch):
+        """Une collision dans le lot empeche toute generation (tout ou rien)."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        (tmp_path / "b.py").write_text("x = 1\n", encoding="utf-8")
+        plan = ecrire_plan(
+            tmp_path,
+            [
+                {
+                    "type": "generator",
+                    "description": "services",
+                    "plugin_name": "module_generator",
+                    "params": {
+                        "output_dir": str(tmp_path),
+                        "items": [{"name": "a"}, {"name": "b"}],
+                    },
+                }
+            ],
+        )
+
+        assert not OrchestrateurAST().executer_plan(plan, [])
+        assert not (tmp_path / "a.py").exists()
+        assert (tmp_path / "b.py").read_text(encoding="utf-8") == "x = 1\n"
+
+    def test_run_fichier_par_fichier(self, tmp_path, monkeypatch):
+        """Run decoupe par fichier (interface) : generation unique, apercu des fichiers crees."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from core.write_back import WriteBackJournal
+        from modificateur_interactif import OrchestrateurAST
+
+        cibles = []
+        for nom in ("a.py", "b.py"):
+            (tmp_path / nom).write_text('print("x")\n', encoding="utf-8")
+            cibles.append(str(tmp_path / nom))
+        sortie = tmp_path / "genere"
+        plan = ecrire_plan(
+            tmp_path,
+            [
+                {
+                    "type": "generator",
+                    "description": "services",
+                    "plugin_name": "module_generator",
+                    "params": {"output_dir": str(sortie), "items": [{"name": "billing"}]},
+                }
+            ],
+        )
+
+        orchestrateur = OrchestrateurAST()
+        apercu = list(orchestrateur.previsualiser_plan(plan, cibles))
+        assert apercu[-1].path == str(sortie / "billing.py") and apercu[-1].added > 0
+        assert not sortie.exists()
+
+        journal = WriteBackJournal()
+        generation = orchestrateur.executer_generateurs(plan, cibles, journal=journal)
+        assert generation and generation.write_stats["written"] == 1
+        for cible in cibles:
+            assert orchestrateur.executer_plan(plan, [cible], journal=journal, generateurs=False)
+        assert [p.name for p in sortie.glob("*.py")] == ["billing.py"]
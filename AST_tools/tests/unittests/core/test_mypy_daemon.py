@@ -0,0 +1,104 @@
+# tests/unittests/core/test_mypy_daemon.py
+"""
+Tests unitaires pour les demons dmypy par racine de projet
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core import mypy_daemon, tool_probe
+
+# Faux dmypy : journalise ses arguments et signale une erreur sur a.py
+FAUX_DMYPY = """#!/bin/sh
+echo "$@" >> "$DMYPY_JOURNAL"
+case " $* " in
+  *" run "*) echo "Daemon started"; echo "a.py:2:5: error: Incompatible types [assignment]"; exit 1;;
+esac
+"""
+
+
+@pytest.fixture
+def faux_dmypy(tmp_path, monkeypatch):
+    """Un dmypy factice seul dans le PATH, avec un cache isole."""
+    if os.name == "nt":
+        pytest.skip("script shell non executable sous Windows")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    outil = bin_dir / "dmypy"
+    outil.write_text(FAUX_DMYPY, encoding="utf-8")
+    outil.chmod(0o755)
+    journal = tmp_path / "journal.txt"
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setenv("DMYPY_JOURNAL", str(journal))
+    monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    tool_probe.clear_memory_cache()
+    yield journal
+    mypy_daemon.shutdown_all()
+    tool_probe.clear_memory_cache()
+
+
+def _projet(tmp_path):
+    projet = tmp_path / "projet"
+    (projet / "pkg").mkdir(parents=True)
+    (projet / "pyproject.toml").write_text("", encoding="utf-8")
+    fichiers = [projet / "a.py", projet / "pkg" / "b.py"]
+    for fichier in fichiers:
+        fichier.write_text("x = 1\n", encoding="utf-8")
+    return projet, [str(f) for f in fichiers]
+
+
+class TestRacines:
+    """Tests de la detection des racines de projet."""
+
+    def test_regroupement_par_racine(self, tmp_path):
+        """Les fichiers d'un meme projet partagent la racine portant pyproject.toml."""
+        projet, fichiers = _projet(tmp_path)
+        assert mypy_daemon.group_by_root(fichiers) == {str(projet): fichiers}
+
+    def test_repartition_de_la_sortie(self, tmp_path):
+        """Les diagnostics reviennent a leur fichier, ceux des modules importes sont ignores."""
+        projet, fichiers = _projet(tmp_path)
+        sortie = "\n".join(
+            [
+                "a.py:2:5: error: Incompatible types [assignment]",
+                "pkg/b.py:1: note: Revealed type",
+                "autre.py:3:1: error: Ignored [misc]",
+                "Success: no issues found",
+            ]
+        )
+        resultats = mypy_daemon.split_output(sortie, fichiers, str(projet))
+        assert resultats[fichiers[0]]["errors"] == 1
+        assert resultats[fichiers[1]] == {
+            "output": "pkg/b.py:1: note: Revealed type",
+            "errors": 0,
+            "warnings": 0,
+            "notes": 1,
+        }
+
+
+class TestDmypyDaemon:
+    """Tests du demon (dmypy factice)."""
+
+    def test_une_requete_par_racine_et_arret(self, tmp_path, faux_dmypy):
+        """Toute la selection part en une requete ; le demon est reutilise puis arrete."""
+        projet, fichiers = _projet(tmp_path)
+        demon = mypy_daemon.get_daemon(str(projet), ["--strict"])
+        assert mypy_daemon.get_daemon(str(projet), ["--strict"]) is demon
+
+        resultat = demon.check(fichiers)
+        demon.check(fichiers)
+        assert resultat.returncode == 1
+        sortie = mypy_daemon.split_output(resultat.stdout, fichiers, str(projet))
+        assert sortie[fichiers[0]]["errors"] == 1
+
+        mypy_daemon.shutdown_all()
+        appels = faux_dmypy.read_text(encoding="utf-8").splitlines()
+        requetes = [a for a in appels if " run " in f" {a} "]
+        assert len(requetes) == 2
+        assert requetes[0].endswith(" ".join(["--strict", *fichiers]))
+        assert appels[-1] == f"--status-file {demon.status_file} stop"
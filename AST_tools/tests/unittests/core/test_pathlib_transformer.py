@@ -0,0 +1,137 @@
+# tests/unittests/core/test_pathlib_transformer.py
+"""
+Tests unitaires pour la conversion os.path -> pathlib
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.artisans.pathlib_transformer_optimized import PathlibTransformer
+
+
+def convertir(code):
+    return PathlibTransformer().transform(code)
+
+
+class TestPathlibTransformer:
+    """Tests de la reecriture des appels os.path."""
+
+    def test_appels_convertis_et_import_ajoute(self):
+        """Tests et stat convertis, join / dirname seulement dedans ; import apres la docstring."""
+        code = (
+            '"""Module."""\n'
+            "import os\n"
+            "\n"
+            "base = os.path.dirname(__file__)\n"
+            "if os.path.isfile(os.path.join(os.path.dirname(__file__), 'a.txt')):\n"
+            "    taille = os.path.getsize(__file__)\n"
+        )
+        assert convertir(code) == (
+            '"""Module."""\n'
+            "from pathlib import Path\n"
+            "import os\n"
+            "\n"
+            "base = os.path.dirname(__file__)\n"
+            "if Path(Path(__file__).parent, 'a.txt').is_file():\n"
+            "    taille = Path(__file__).stat().st_size\n"
+        )
+
+    def test_chaines_et_commentaires_intacts(self):
+        """Les occurrences dans les chaines et les commentaires ne sont pas touchees."""
+        code = 'import os\nmsg = "os.path.join(a, b)"  # os.path.exists(x)\n'
+        assert convertir(code) == code
+
+    def test_formes_d_import(self):
+        """os.path designe par alias, from os import path ou from os.path import."""
+        code = (
+            "import os.path as osp\n"
+            "from os import path\n"
+            "from os.path import join\n"
+            "a = osp.exists('data')\n"
+            "b = path.basename('a/b.txt')\n"
+            "c = join('data', 'b.txt')\n"
+        )
+        resultat = convertir(code)
+        assert "a = Path('data').exists()\n" in resultat
+        assert "b = Path('a/b.txt').name\n" in resultat
+        # join au premier niveau : une chaine reste une chaine
+        assert "c = join('data', 'b.txt')\n" in resultat
+        assert resultat.startswith("from pathlib import Path\n")
+
+    def test_cas_non_convertis(self):
+        """os redefini, Path deja pris, fonction sans equivalent : rien ne change."""
+        assert convertir("os = Fake()\nos.path.exists(x)\n") == "os = Fake()\nos.path.exists(x)\n"
+        code = "import os\nfrom mylib import Path\nos.path.exists(x)\n"
+        assert convertir(code) == code
+        code = "import os\nos.path.splitext(x)\nos.path.abspath(x)\n"
+        assert convertir(code) == code
+
+    def test_appel_imbrique_dans_une_expression(self):
+        """L'argument d'une autre fonction est repris tel quel, join compris."""
+        code = "import os\nfrom pathlib import Path\nos.path.exists(f(os.path.join('a', 'b')))\n"
+        assert convertir(code) == (
+            "import os\nfrom pathlib import Path\nPath(f(os.path.join('a', 'b'))).exists()\n"
+        )
+
+    def test_arguments_variables(self):
+        """exists, isfile, isdir et basename sont convertis quel que soit l'argument."""
+        code = (
+            "import os\n"
+            "a = os.path.exists(chemin)\n"
+            "b = os.path.isfile(os.path.join(BASE, nom))\n"
+            "c = os.path.isdir(self.racine)\n"
+            "d = os.path.basename(os.path.dirname(args.fichier))\n"
+            "e = os.path.getsize(chemin)\n"
+            "f = os.path.join(BASE, 'x')\n"
+        )
+        assert convertir(code) == (
+            "from pathlib import Path\n"
+            "import os\n"
+            "a = Path(chemin).exists()\n"
+            "b = Path(BASE, nom).is_file()\n"
+            "c = Path(self.racine).is_dir()\n"
+            "d = Path(args.fichier).parent.name\n"
+            "e = os.path.getsize(chemin)\n"
+            "f = os.path.join(BASE, 'x')\n"
+        )
+
+    def test_resultats_differents_non_convertis(self):
+        """Valeurs connues dont le resultat differe, bytes, descripteur : os.path garde."""
+        appels = [
+            "os.path.dirname('f.txt')",  # "" contre "."
+            "os.path.exists('')",  # faux contre vrai
+            "os.path.isdir('')",
+            "os.path.getsize('')",
+            "os.path.join('a', '')",  # "a/" contre "a"
+            "os.path.basename('a/')",
+            "os.path.join(__file__, 'a/b')",  # separateur conserve par ntpath.join
+            "os.path.isabs('/a')",  # absolu pour ntpath, pas pour PureWindowsPath
+            "os.path.exists(b'data')",
+            "os.path.exists(3)",
+            "os.path.isfile(os.path.join(chemin, b'a'))",
+            "os.path.getsize(chemin)",
+            "os.path.dirname(__file__)",
+            "os.path.expanduser('~')",
+        ]
+        for appel in appels:
+            code = f"import os\n{appel}\n"
+            assert convertir(code) == code, appel
+        # __file__ reaffecte : valeur inconnue, getsize n'est pas converti
+        code = "import os\n__file__ = ''\nos.path.getsize(__file__)\n"
+        assert convertir(code) == code
+
+    def test_gros_fichier(self):
+        """Un gros fichier est converti en une passe (cout lineaire)."""
+        ligne = (
+            "x{i} = os.path.isfile(os.path.join(os.path.dirname(__file__), 'f{i}')) "
+            "if os.path.exists('d') else 0\n"
+        )
+        code = "import os\n" + "".join(ligne.format(i=i) for i in range(5_000))
+        debut = time.perf_counter()
+        resultat = convertir(code)
+        assert time.perf_counter() - debut < 30
+        assert "os.path" not in resultat.split("\n", 2)[2]
+        assert resultat.count("Path('d').exists()") == 5_000
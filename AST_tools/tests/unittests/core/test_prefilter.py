@@ -0,0 +1,131 @@
+# tests/unittests/core/test_prefilter.py
+"""
+Tests unitaires pour le prefiltre d'applicabilite des plugins
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.base.prefilter import Prefilter, prefilter_matches
+from core.transformation_loader import TransformationLoader
+
+
+class TestPrefilter:
+    """Tests de l'evaluation des criteres."""
+
+    def test_sous_chaine(self):
+        """Une sous-chaine brute suffit a retenir le fichier."""
+        prefilter = Prefilter(substrings=["os.path"])
+        assert prefilter.matches("import os\nos.path.join('a', 'b')\n")
+        assert not prefilter.matches("import os\nos.getcwd()\n")
+
+    def test_token_identifiant_entier(self):
+        """Un token ne correspond qu'a un identifiant complet."""
+        prefilter = Prefilter(tokens=["print"])
+        assert prefilter.matches("print('a')\n")
+        assert not prefilter.matches("reprint = blueprint\n")
+
+    def test_regex_multiligne(self):
+        """La regex est evaluee en mode multiligne."""
+        prefilter = Prefilter(regex=r"^class\s")
+        assert prefilter.matches("x = 1\nclass A:\n    pass\n")
+        assert not prefilter.matches("x = 'class A'\n")
+
+    def test_imports(self):
+        """Les formes import / from ... import sont reconnues, pas une simple mention."""
+        prefilter = Prefilter(imports=["os"])
+        assert prefilter.matches("import sys, os\n")
+        assert prefilter.matches("import os.path as osp\n")
+        assert prefilter.matches("    from os.path import join\n")
+        assert not prefilter.matches("import osmium\nx = 'os'\n")
+
+    def test_un_critere_suffit(self):
+        """Les criteres sont combines en OU (prefiltre conservateur)."""
+        prefilter = Prefilter(substrings=["zzz"], tokens=["def"])
+        assert prefilter.matches("def f(): pass\n")
+        assert not prefilter.matches("x = 1\n")
+
+    def test_prefiltre_vide_ou_absent(self):
+        """Sans critere, tout fichier est retenu."""
+        assert Prefilter().matches("")
+        assert prefilter_matches(None, "")
+
+    def test_aller_retour_dict(self):
+        """to_dict/from_dict conservent les criteres ; une cle inconnue est refusee."""
+        prefilter = Prefilter(tokens=["def"], imports=["os"])
+        assert prefilter.to_dict() == {"tokens": ["def"], "imports": ["os"]}
+        assert Prefilter.from_dict(prefilter.to_dict()).matches("import os\n")
+        with pytest.raises(ValueError):
+            Prefilter.from_dict({"motifs": ["x"]})
+
+
+class TestPrefilterPlugins:
+    """Tests du prefiltre des artisans via le manifeste et l'orchestrateur."""
+
+    def test_prefiltre_lu_depuis_le_manifeste(self, tmp_path):
+        """Le prefiltre est disponible sans importer le plugin."""
+        manifest_path = tmp_path / "manifest.json"
+        TransformationLoader(manifest_path=manifest_path)
+
+        loader = TransformationLoader(manifest_path=manifest_path)
+        prefilter = loader.get_prefilter("pathlib_transformer_optimized")
+        assert not loader.is_loaded("pathlib_transformer_optimized")
+        assert prefilter.matches("os.path.join(a, b)")
+        assert not prefilter.matches("x = 1")
+        assert loader.get_prefilter("ruff_wrapper") is None
+
+    def test_can_transform_par_defaut(self, tmp_path):
+        """can_transform evalue le prefiltre declare par le plugin."""
+        loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+        transformer = loader.get_transformation("print_to_logging_transform")
+        assert transformer.can_transform("print('a')\n")
+        assert not transformer.can_transform("x = 1\n")
+
+    def test_orchestrateur_ignore_les_fichiers_non_concernes(self, tmp_path, monkeypatch):
+        """Le plugin n'est appele que sur les fichiers retenus par le prefiltre."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        orchestrateur = OrchestrateurAST()
+        classe = orchestrateur.transformation_loader._get_class("print_to_logging_transform")
+        vus = []
+        transform = classe.transform
+
+        def transform_trace(self, code_source):
+            vus.append(code_source)
+            return transform(self, code_source)
+
+        monkeypatch.setattr(classe, "transform", transform_trace)
+
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps(
+                {
+                    "name": "Print",
+                    "description": "print -> logging",
+                    "transformations": [
+                        {
+                            "type": "appel_plugin",
+                            "description": "print -> logging",
+                            "plugin_name": "print_to_logging_transform",
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        avec = tmp_path / "avec.py"
+        avec.write_text('print("a")\n', encoding="utf-8")
+        sans = tmp_path / "sans.py"
+        sans.write_text("x = 1\n", encoding="utf-8")
+
+        assert orchestrateur.executer_plan(str(plan_path), [str(avec), str(sans)])
+
+        assert vus == ['print("a")\n']
+        assert "logging.info" in avec.read_text(encoding="utf-8")
+        assert sans.read_text(encoding="utf-8") == "x = 1\n"
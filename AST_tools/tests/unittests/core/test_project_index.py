@@ -0,0 +1,135 @@
+# tests/unittests/core/test_project_index.py
+"""
+Tests unitaires pour l'index SQLite des symboles d'un projet
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.project_index import ProjectIndex, extract_symbols
+
+SERVICE = """import os
+import json
+
+
+class BillingService:
+    def run(self):
+        print("facture")
+        return json.dumps({})
+
+
+def main():
+    print("ok")
+"""
+
+
+def creer_projet(racine):
+    (racine / "pkg").mkdir(parents=True)
+    (racine / "pkg" / "service.py").write_text(SERVICE, encoding="utf-8")
+    (racine / "outil.py").write_text(
+        "def print(*a):\n    pass\n\nprint('redefini')\n", encoding="utf-8"
+    )
+    (racine / "__pycache__").mkdir()
+    (racine / "__pycache__" / "ignore.py").write_text("class Ignore: pass\n", encoding="utf-8")
+
+
+class TestExtraction:
+    """Tests de l'extraction des symboles d'un code."""
+
+    def test_symboles_et_lignes(self):
+        """Definitions, imports (inutilises marques) et print builtin avec leur ligne."""
+        symboles = {(kind, name, line) for kind, name, line, _, _ in extract_symbols(SERVICE)}
+        assert ("class", "BillingService", 5) in symboles
+        assert ("function", "run", 6) in symboles and ("function", "main", 11) in symboles
+        assert ("print", "print", 7) in symboles and ("print", "print", 12) in symboles
+        details = {name: detail for kind, name, _, _, detail in extract_symbols(SERVICE)}
+        assert details["os"] == "unused" and details["json"] == ""
+
+
+class TestProjectIndex:
+    """Tests de l'indexation et des requetes."""
+
+    def test_indexation_et_requetes(self, tmp_path):
+        """Prints builtin, classes et recherche par sous-chaine sur tout le projet."""
+        racine = tmp_path / "projet"
+        creer_projet(racine)
+        with ProjectIndex(racine, db_path=tmp_path / "index.sqlite") as index:
+            stats = index.update()
+            assert stats == {"files": 2, "analysed": 2, "unchanged": 0, "removed": 0, "errors": 0}
+            service = str((racine / "pkg" / "service.py").resolve())
+            assert [(s["path"], s["line"]) for s in index.find(kind="print")] == [
+                (service, 7),
+                (service, 12),
+            ]
+            assert [s["name"] for s in index.find(kind="class")] == ["BillingService"]
+            run = index.find(kind="function", name="run")[0]
+            assert run["scope"] == "BillingService"
+            assert [s["name"] for s in index.search("service")] == ["BillingService"]
+            assert [s["name"] for s in index.search("ma", kind="function")] == ["main"]
+            assert index.counts()["files"] == 2
+
+    def test_mise_a_jour_incrementale(self, tmp_path):
+        """Seuls les fichiers modifies sont re-analyses ; les supprimes sont retires."""
+        racine = tmp_path / "projet"
+        creer_projet(racine)
+        db = tmp_path / "index.sqlite"
+        with ProjectIndex(racine, db_path=db) as index:
+            index.update()
+
+        service = racine / "pkg" / "service.py"
+        outil = racine / "outil.py"
+        # Date seule modifiee : relu mais pas re-analyse
+        stat = outil.stat()
+        os.utime(outil, (stat.st_atime, stat.st_mtime + 10))
+        service.write_text(SERVICE + "\nclass Autre:\n    pass\n", encoding="utf-8")
+        (racine / "casse.py").write_text("def (:\n", encoding="utf-8")
+
+        with ProjectIndex(racine, db_path=db) as index:
+            stats = index.update()
+            assert stats == {"files": 3, "analysed": 2, "unchanged": 1, "removed": 0, "errors": 1}
+            assert [s["name"] for s in index.find(kind="class")] == ["BillingService", "Autre"]
+            assert [Path(e["path"]).name for e in index.errors()] == ["casse.py"]
+
+            service.unlink()
+            stats = index.update()
+            assert stats["removed"] == 1 and stats["analysed"] == 0
+            assert index.find(kind="class") == [] and index.search("Billing") == []
+
+    def test_analyse_parallele(self, tmp_path):
+        """Au-dela du seuil, l'analyse passe par le pool de processus."""
+        racine = tmp_path / "projet"
+        racine.mkdir()
+        for i in range(40):
+            (racine / f"m{i:02d}.py").write_text(
+                f"class C{i}:\n    pass\n\nprint({i})\n", encoding="utf-8"
+            )
+        with ProjectIndex(racine, db_path=tmp_path / "index.sqlite", jobs=2) as index:
+            assert index.update()["analysed"] == 40
+            assert len(index.find(kind="print")) == 40
+            assert index.find(kind="class", name="C39")[0]["line"] == 1
+
+
+class TestModeProjetAnalyseur:
+    """Tests du mode projet de l'AnalyseurCode."""
+
+    def test_indexer_projet(self, tmp_path, monkeypatch):
+        """L'index est cree dans le cache et survit au reset() de l'analyse d'un code."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import AnalyseurCode
+
+        racine = tmp_path / "projet"
+        creer_projet(racine)
+        analyseur = AnalyseurCode()
+        assert analyseur.indexer_projet(racine)["analysed"] == 2
+        assert analyseur.index_projet.db_path.is_relative_to(tmp_path / "cache")
+
+        analyseur.analyser_code("x = 1\n")
+        assert [s["line"] for s in analyseur.lister_symboles("print")] == [7, 12]
+        assert analyseur.rechercher_symboles("Billing")[0]["kind"] == "class"
+        rapport = analyseur.obtenir_rapport_projet()
+        assert rapport["fichiers"] == 2 and rapport["print_calls"] == 2
+        assert analyseur.indexer_projet(racine)["unchanged"] == 2
+        analyseur.index_projet.close()
@@ -0,0 +1,130 @@
+# tests/unittests/core/test_replacement_engine.py
+"""
+Tests unitaires pour le moteur de remplacement multi-motifs (remplacement_simple)
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.replacement_engine import MultiReplacer, code_segments
+
+
+class TestMultiReplacer:
+    """Tests du remplacement en un seul parcours."""
+
+    def test_plus_long_motif_et_pas_de_reapplication(self):
+        """Le plus long litteral l'emporte ; le texte produit n'est pas reparcouru."""
+        replacer = MultiReplacer(
+            [
+                {"old": "foo", "new": "bar"},
+                {"old": "foobar", "new": "X"},
+                {"old": "bar", "new": "baz"},
+            ]
+        )
+        assert replacer.replace("foobar foo bar") == ("X bar baz", 3)
+
+    def test_mots_entiers_et_regex(self):
+        """word limite aux identifiants entiers ; les regex gardent leurs references."""
+        replacer = MultiReplacer(
+            [
+                {"old": "Client", "new": "HttpClient", "word": True},
+                {"old": r"v(?P<n>\d+)_", "new": r"version\g<n>_", "regex": True},
+                {"old": r"(\w+)\.old\(\)", "new": r"\1.new()", "regex": True},
+            ]
+        )
+        code, nombre = replacer.replace("c = Client(MyClient)\nv2_ = obj.old()\n")
+        assert code == "c = HttpClient(MyClient)\nversion2_ = obj.new()\n"
+        assert nombre == 3
+
+    def test_references_numerotees_propres_a_chaque_regle(self):
+        """\\1 designe le groupe de la regle, quelle que soit sa place dans le plan."""
+        seule = MultiReplacer([{"old": r"(\w)\1", "new": "<dbl>", "regex": True}])
+        assert seule.replace("xxy ab") == ("<dbl>y ab", 1)
+        apres_litteral = MultiReplacer(
+            [
+                {"old": "zz", "new": "q"},
+                {"old": r"(?:v(\d))?(\w)\2", "new": r"<\2\g<1>>", "regex": True},
+            ]
+        )
+        assert apres_litteral.replace("xxy v1aa zz") == ("<x>y <a1> q", 3)
+
+    def test_references_limitees_au_code(self):
+        """Avec code_only, un motif gourmand ne recopie pas le commentaire qui suit."""
+        replacer = MultiReplacer([{"old": r"(foo.*)", "new": r"[\1]", "regex": True}], True)
+        assert replacer.replace("x = foo  # foo comment")[0] == "x = [foo  ]# foo comment"
+
+    def test_code_only_ignore_chaines_et_commentaires(self):
+        """Les chaines (prefixees, triples) et commentaires ne sont pas modifies."""
+        code = 'foo = 1  # foo\ns = \'foo\' + rb"foo" + f\'{foo}\'\n"""\nfoo\n"""\nif"x": foo()\n'
+        replacer = MultiReplacer([{"old": "foo", "new": "bar"}], code_only=True)
+        assert replacer.replace(code)[0] == code.replace("foo = 1", "bar = 1").replace(
+            "foo()", "bar()"
+        )
+        court = "x = 'a'  # c\ny"
+        assert [court[a:b] for a, b in code_segments(court)] == ["x = ", "  ", "\ny"]
+
+    def test_regles_invalides(self):
+        """Une regle mal formee leve ValueError."""
+        with pytest.raises(ValueError):
+            MultiReplacer([{"old": "", "new": "x"}])
+        with pytest.raises(ValueError):
+            MultiReplacer([{"old": "(", "new": "x", "regex": True}])
+        with pytest.raises(ValueError):
+            MultiReplacer([{"old": "a", "nouveau": "b"}])
+        with pytest.raises(ValueError):
+            MultiReplacer([{"old": "(a)", "new": r"\2", "regex": True}])
+        with pytest.raises(ValueError):
+            MultiReplacer.from_params({"replacements": "a->b"})
+
+    def test_centaines_de_motifs_cout_lineaire(self):
+        """500 motifs sur un gros fichier : un parcours, pas un par motif."""
+        regles = [
+            {"old": f"api.call_{i}", "new": f"api.invoke_{i}", "word": True} for i in range(500)
+        ]
+        code = "".join(f"y{i} = api.call_{i % 700}(a, 'b')  # c\n" for i in range(20_000))
+        debut = time.perf_counter()
+        resultat, nombre = MultiReplacer(regles, code_only=True).replace(code)
+        assert time.perf_counter() - debut < 10
+        assert nombre == sum(1 for i in range(20_000) if i % 700 < 500)
+        assert "api.call_7(" not in resultat and "api.call_600(" in resultat
+
+
+class TestInstructionRemplacement:
+    """Tests de l'instruction remplacement_simple dans un plan."""
+
+    def test_plan_avec_remplacements(self, tmp_path, monkeypatch):
+        """L'instruction est executee par le plan sur les fichiers cibles."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps(
+                {
+                    "name": "Plan",
+                    "description": "renommage",
+                    "transformations": [
+                        {
+                            "type": "remplacement_simple",
+                            "description": "renommage d'API",
+                            "params": {
+                                "replacements": [{"old": "old_api", "new": "new_api"}],
+                                "code_only": True,
+                            },
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        cible = tmp_path / "cible.py"
+        cible.write_text('import old_api\nold_api.run("old_api")\n', encoding="utf-8")
+
+        assert OrchestrateurAST().executer_plan(str(plan_path), [str(cible)])
+        assert cible.read_text(encoding="utf-8") == 'import new_api\nnew_api.run("old_api")\n'
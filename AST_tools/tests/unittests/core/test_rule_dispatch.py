@@ -0,0 +1,210 @@
+# tests/unittests/core/test_rule_dispatch.py
+"""
+Tests unitaires pour le parcours unique multi-regles des artisans
+"""
+
+import ast
+import itertools
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.artisans.add_docstrings_transform import AddDocstringsTransform
+from core.plugins.artisans.print_to_logging_transform import PrintToLoggingTransform
+from core.plugins.artisans.unused_import_remover import UnusedImportRemover
+from core.plugins.base.cst_engine import EditConflictError
+from core.plugins.base.rule_dispatch import Rule, RuleDispatcher, apply_rules, supports_rules
+
+CODE = """import os
+import sys
+
+
+def f(x):
+    print(x)
+
+
+class A:
+    def m(self):
+        return sys.argv
+"""
+
+# Codes ou les regles interagissent : imports rendus inutiles, imports requis
+# deja presents, retires ou lies sous un autre nom
+CODES_INTERACTIONS = [
+    "import os\nx = os.path.exists(__file__)\n",
+    "import os\nimport sys\nimport logging\nfrom pathlib import Path\n\n\n"
+    "def f(x):\n    print(x)\n    return os.path.isfile(__file__)\n",
+    '"""Module."""\nimport json\nimport logging as log\nimport os\nprint(json)\n',
+    "import sys\nfrom pathlib import Path as P\nimport os\n\n\nclass A:\n"
+    "    def m(self):\n        print(os.path.basename(__file__))\n",
+]
+
+
+def artisans_livres(tmp_path):
+    """Instances de tous les artisans livres qui exposent une regle."""
+    from core.transformation_loader import TransformationLoader
+
+    loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+    noms = [nom for nom in loader.list_transformations() if loader.supports_rules(nom)]
+    return [loader.get_transformation(nom) for nom in sorted(noms)]
+
+
+class TestRuleDispatcher:
+    """Tests du parcours partage."""
+
+    def test_chaque_noeud_visite_une_fois(self):
+        """Tous les gestionnaires d'un type sont appeles lors du meme passage."""
+        tree = ast.parse(CODE)
+        vus = []
+        dispatcher = RuleDispatcher(
+            [
+                Rule({ast.FunctionDef: lambda n: vus.append(("a", n.name))}),
+                Rule(
+                    {(ast.FunctionDef, ast.ClassDef): lambda n: vus.append(("b", n.name))},
+                    finish=lambda: vus.append(("fin", None)),
+                ),
+            ]
+        )
+        dispatcher.run(tree)
+        assert vus == [("a", "f"), ("b", "f"), ("b", "A"), ("a", "m"), ("b", "m"), ("fin", None)]
+
+    def test_artisans_exposent_une_regle(self):
+        """Les artisans ast exposent make_rule, pas les plugins textuels."""
+        assert supports_rules(PrintToLoggingTransform)
+        assert supports_rules(UnusedImportRemover())
+        from core.plugins.artisans.hello_user_transform import HelloUserTransform
+
+        assert not supports_rules(HelloUserTransform)
+
+
+class TestApplyRules:
+    """Tests de l'application fusionnee."""
+
+    def test_fusion_equivalente_au_sequentiel(self):
+        """Trois artisans en un parcours donnent le meme code qu'en trois passes."""
+        transformers = [PrintToLoggingTransform(), AddDocstringsTransform(), UnusedImportRemover()]
+        sequentiel = CODE
+        for transformer in transformers:
+            sequentiel = transformer.transform(sequentiel)
+
+        assert apply_rules(CODE, transformers) == sequentiel
+        assert "import os" not in sequentiel
+
+    def test_fusion_equivalente_pour_tout_ordre(self, tmp_path):
+        """Pour les artisans livres, dans tout ordre, la fusion egale l'application une par une."""
+        artisans = artisans_livres(tmp_path)
+        assert len(artisans) >= 4
+        for code in CODES_INTERACTIONS:
+            for n in range(2, len(artisans) + 1):
+                for ordre in itertools.permutations(artisans, n):
+                    sequentiel = code
+                    for transformer in ordre:
+                        sequentiel = transformer.transform(sequentiel)
+                    noms = [type(t).__name__ for t in ordre]
+                    assert apply_rules(code, ordre) == sequentiel, (noms, code)
+
+    def test_import_rendu_inutile_par_une_regle_precedente(self):
+        """pathlib puis suppression des imports : l'import os devenu inutile disparait."""
+        from core.plugins.artisans.pathlib_transformer_optimized import PathlibTransformer
+
+        code = "import os\nx = os.path.exists(__file__)\n"
+        resultat = apply_rules(code, [PathlibTransformer(), UnusedImportRemover()])
+        assert resultat == "from pathlib import Path\nx = Path(__file__).exists()\n"
+
+    def test_import_requis_garde(self):
+        """Un import que le parcours rend utile n'est pas supprime."""
+        code = "import logging\nimport os\nprint('x')\n"
+        resultat = apply_rules(code, [UnusedImportRemover(), PrintToLoggingTransform()])
+        assert resultat == "import logging\nlogging.info('x')\n"
+
+    @pytest.mark.parametrize(
+        "entete",
+        ["import logging_config\n", "import logging as log\n", "from logging import info\n"],
+    )
+    def test_import_ajoute_si_nom_non_lie(self, entete):
+        """Un nom qui n'est pas lie au module attendu recoit son import."""
+        resultat = apply_rules(entete + "print('x')\n", [PrintToLoggingTransform()])
+        assert resultat == "import logging\n" + entete + "logging.info('x')\n"
+
+    def test_import_deja_lie_non_duplique(self):
+        """`import logging.handlers` lie deja `logging` : pas de second import."""
+        code = "import logging.handlers\nprint('x')\n"
+        assert apply_rules(code, [PrintToLoggingTransform()]) == (
+            "import logging.handlers\nlogging.info('x')\n"
+        )
+
+    def test_import_from_avec_alias(self):
+        """`from pathlib import Path as P` ne lie pas `Path`."""
+        from core.plugins.artisans.pathlib_transformer_optimized import PathlibTransformer
+
+        code = "import os\nfrom pathlib import Path as P\nx = os.path.exists(__file__)\n"
+        resultat = apply_rules(code, [PathlibTransformer()])
+        assert resultat.startswith("from pathlib import Path\n")
+        assert "x = Path(__file__).exists()" in resultat
+
+    def test_conflit_leve_une_erreur(self):
+        """Deux regles qui reecrivent le meme noeud sont en conflit."""
+
+        class Renomme:
+            def __init__(self, nom):
+                self.nom = nom
+
+            def make_rule(self, context):
+                return Rule({ast.Name: lambda n: context.rewriter.replace(n, self.nom)})
+
+        with pytest.raises(EditConflictError):
+            apply_rules("x = 1\n", [Renomme("y"), Renomme("z")])
+
+
+class TestOrchestrateurFusion:
+    """Tests de la fusion des instructions consecutives par l'orchestrateur."""
+
+    def test_plan_en_un_parcours(self, tmp_path, monkeypatch):
+        """Les artisans consecutifs sont regroupes et appliques en un seul parcours."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        import modificateur_interactif
+        from modificateur_interactif import OrchestrateurAST
+
+        appels = []
+        apply_original = modificateur_interactif.apply_rules
+
+        def apply_trace(code, transformers):
+            appels.append([type(t).__name__ for t in transformers])
+            return apply_original(code, transformers)
+
+        monkeypatch.setattr(modificateur_interactif, "apply_rules", apply_trace)
+
+        noms = ["print_to_logging_transform", "add_docstrings_transform", "unused_import_remover"]
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps(
+                {
+                    "name": "Artisans",
+                    "description": "Trois artisans",
+                    "transformations": [
+                        {"type": "appel_plugin", "description": nom, "plugin_name": nom}
+                        for nom in noms
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        fichier = tmp_path / "m.py"
+        fichier.write_text(CODE, encoding="utf-8")
+
+        orchestrateur = OrchestrateurAST()
+        plan = orchestrateur.charger_plan(str(plan_path))
+        assert [len(g) for g in orchestrateur._grouper_instructions(plan.transformations)] == [3]
+
+        assert orchestrateur.executer_plan(str(plan_path), [str(fichier)])
+        assert appels == [
+            ["PrintToLoggingTransform", "AddDocstringsTransform", "UnusedImportRemover"]
+        ]
+        resultat = fichier.read_text(encoding="utf-8")
+        assert "logging.info(x)" in resultat
+        assert '"""Fonction f."""' in resultat
+        assert "import os\n" not in resultat
@@ -0,0 +1,161 @@
+# tests/unittests/core/test_run_plan.py
+"""
+Tests unitaires pour l'execution d'un plan en ligne de commande (run_plan)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import run_plan
+
+PLAN_PRINT = {
+    "name": "Plan CLI",
+    "description": "Conversion print vers logging",
+    "transformations": [
+        {
+            "type": "appel_plugin",
+            "description": "print -> logging",
+            "plugin_name": "print_to_logging_transform",
+        }
+    ],
+}
+
+
+@pytest.fixture
+def projet(tmp_path, monkeypatch):
+    """Petit projet avec un plan, deux modules et un cache isole."""
+    monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps(PLAN_PRINT), encoding="utf-8")
+    src = tmp_path / "src"
+    (src / "pkg").mkdir(parents=True)
+    (src / "__pycache__").mkdir()
+    (src / "pkg" / "a.py").write_text('print("a")\n', encoding="utf-8")
+    (src / "pkg" / "b.py").write_text("x = 1\n", encoding="utf-8")
+    (src / "notes.txt").write_text("print\n", encoding="utf-8")
+    (src / "__pycache__" / "c.py").write_text('print("c")\n', encoding="utf-8")
+    return plan, src
+
+
+class TestCollectFiles:
+    """Tests de la selection des fichiers."""
+
+    def test_repertoire_avec_filtres(self, projet):
+        """Les repertoires exclus ne sont pas parcourus et seuls les *.py sont retenus."""
+        _, src = projet
+        files = run_plan.collect_files([str(src)], ["*.py"], run_plan.DEFAULT_EXCLUDE)
+        assert [Path(f).name for f in files] == ["a.py", "b.py"]
+
+        files = run_plan.collect_files([str(src)], ["*.py"], ["pkg/b.py", "__pycache__"])
+        assert [Path(f).name for f in files] == ["a.py"]
+
+    def test_motif_glob(self, projet):
+        """Un motif glob recursif est developpe et dedoublonne."""
+        _, src = projet
+        pattern = str(src / "pkg" / "**" / "*.py")
+        files = run_plan.collect_files([pattern, str(src / "pkg" / "a.py")], ["*.py"], [])
+        assert [Path(f).name for f in files] == ["a.py", "b.py"]
+
+
+class TestWorker:
+    """Tests de l'initialisation des processus de travail."""
+
+    def test_limite_outils_partagee_entre_jobs(self, projet, monkeypatch):
+        """Avec N jobs, chaque processus n'a qu'une part de la limite d'outils externes."""
+        from core import subprocess_executor
+
+        plan, _ = projet
+        monkeypatch.setenv(subprocess_executor.MAX_PROCESSES_ENV, "8")
+        try:
+            run_plan._init_worker(str(plan), True, jobs=4)
+            assert subprocess_executor.get_executor().max_workers == 2
+            run_plan._init_worker(str(plan), True, jobs=16)
+            assert subprocess_executor.get_executor().max_workers == 1
+        finally:
+            monkeypatch.delenv(subprocess_executor.MAX_PROCESSES_ENV)
+            subprocess_executor.configure_executor()
+            run_plan._worker.clear()
+
+
+class TestMain:
+    """Tests du point d'entree et des codes de sortie."""
+
+    def test_check_ndjson_sans_ecriture(self, projet, capsys):
+        """--check signale les fichiers a modifier sans les ecrire (code 3)."""
+        plan, src = projet
+        code = run_plan.main([str(plan), str(src), "--check", "--format", "ndjson", "-q"])
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert code == run_plan.EXIT_CHANGES_PENDING
+        assert lines[0]["path"].endswith("a.py") and lines[0]["changed"]
+        assert lines[-1]["summary"]["changed"] >= 1
+        assert (src / "pkg" / "a.py").read_text(encoding="utf-8") == 'print("a")\n'
+
+    def test_execution_json_et_rollback(self, projet, capsys):
+        """Un run ecrit les fichiers, produit un JSON valide et peut etre annule."""
+        plan, src = projet
+        code = run_plan.main([str(plan), str(src), "--format", "json", "-q"])
+
+        report = json.loads(capsys.readouterr().out)
+        assert code == run_plan.EXIT_OK
+        assert report["summary"]["written"] >= 1
+        assert "logging" in (src / "pkg" / "a.py").read_text(encoding="utf-8")
+
+        code = run_plan.main(["--rollback", report["summary"]["run_id"], "-q"])
+        assert code == run_plan.EXIT_OK
+        assert (src / "pkg" / "a.py").read_text(encoding="utf-8") == 'print("a")\n'
+
+    def test_plan_invalide(self, projet, tmp_path):
+        """Un plan invalide donne le code 2."""
+        _, src = projet
+        plan = tmp_path / "invalide.json"
+        plan.write_text(json.dumps({"name": "x"}), encoding="utf-8")
+        assert run_plan.main([str(plan), str(src), "-q"]) == run_plan.EXIT_USAGE
+
+    def test_plan_generator(self, projet, tmp_path, capsys):
+        """Les fichiers generes sont rendus une fois, listes en --check puis ecrits."""
+        _, src = projet
+        sortie = tmp_path / "genere"
+        plan = tmp_path / "generation.json"
+        plan.write_text(
+            json.dumps(
+                {
+                    "name": "Generation",
+                    "description": "modules",
+                    "transformations": [
+                        {
+                            "type": "generator",
+                            "description": "services",
+                            "plugin_name": "module_generator",
+                            "params": {
+                                "output_dir": str(sortie),
+                                "items": [{"name": "billing"}, {"name": "users"}],
+                            },
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        code = run_plan.main([str(plan), str(src), "--check", "--format", "json", "-q"])
+        report = json.loads(capsys.readouterr().out)
+        generes = [r for r in report["files"] if r.get("generated")]
+        assert code == run_plan.EXIT_CHANGES_PENDING
+        assert [Path(r["path"]).name for r in generes] == ["billing.py", "users.py"]
+        assert not sortie.exists()
+
+        # Plusieurs fichiers cibles et plusieurs jobs : une seule generation
+        code = run_plan.main([str(plan), str(src), "--jobs", "2", "--format", "json", "-q"])
+        report = json.loads(capsys.readouterr().out)
+        assert code == run_plan.EXIT_OK
+        assert report["summary"]["written"] == 2 and report["summary"]["errors"] == 0
+        assert sorted(p.name for p in sortie.glob("*.py")) == ["billing.py", "users.py"]
+
+        assert run_plan.main(["--rollback", report["summary"]["run_id"], "-q"]) == 0
+        assert list(sortie.glob("*.py")) == []
@@ -0,0 +1,155 @@
+# tests/unittests/core/test_run_report.py
+"""
+Tests unitaires pour les resultats par (fichier, etape) et le rapport de run
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.run_report import RunReport, StepResult, text_size
+
+
+def ecrire_plan(tmp_path, plugins):
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text(
+        json.dumps(
+            {
+                "name": "Plan",
+                "description": "rapport",
+                "transformations": [
+                    {"type": "appel_plugin", "description": nom, "plugin_name": nom}
+                    for nom in plugins
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return str(plan_path)
+
+
+class TestRunReport:
+    """Tests des agregats et classements."""
+
+    def test_step_result_vrai_si_reussi(self):
+        """Un StepResult est vrai s'il n'a pas d'erreur (pas parce que le tuple est non vide)."""
+        assert StepResult("a.py", "ruff_wrapper")
+        assert not StepResult("a.py", "ruff_wrapper", error="boom")
+        assert text_size("ete") == 3 and text_size("été") == 5
+
+    def test_classements_et_fusion(self):
+        """Etapes et fichiers sont classes par duree cumulee ; merge cumule deux rapports."""
+        premier = RunReport(run_id="r1")
+        premier.add(StepResult("a.py", "lent", elapsed=2.0, changed=True))
+        premier.add(StepResult("a.py", "rapide", elapsed=0.1))
+        second = RunReport()
+        second.add(StepResult("b.py", "lent", elapsed=3.0, error="echec"))
+        second.add(StepResult("b.py", "rapide", elapsed=0.2, skipped=True))
+        second.success_count = 1
+        second.write_stats["written"] = 1
+
+        premier.merge(second)
+        assert premier.run_id == "r1" and premier
+        assert [etape for etape, _ in premier.slowest_steps()] == ["lent", "rapide"]
+        assert premier.slowest_steps(1) == [("lent", 5.0)]
+        assert [path for path, _ in premier.slowest_files()] == ["b.py", "a.py"]
+        assert premier.step_totals()["lent"] == {
+            "elapsed": 5.0,
+            "files": 2,
+            "changed": 1,
+            "skipped": 0,
+            "errors": 1,
+        }
+        assert premier.changed_files == ["a.py"]
+        assert premier.to_dict()["write_stats"]["written"] == 1
+        assert not RunReport()
+
+
+class TestRapportOrchestrateur:
+    """Tests du rapport produit par executer_plan."""
+
+    def test_executer_plan_retourne_le_rapport(self, tmp_path, monkeypatch):
+        """Un resultat par fichier et par etape : modifie, ignore par le prefiltre, en erreur."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        avec = tmp_path / "avec.py"
+        avec.write_text('print("a")\n', encoding="utf-8")
+        sans = tmp_path / "sans.py"
+        sans.write_text("x = 1\n", encoding="utf-8")
+        absent = tmp_path / "absent.py"
+
+        orchestrateur = OrchestrateurAST()
+        rapport = orchestrateur.executer_plan(
+            ecrire_plan(tmp_path, ["print_to_logging_transform"]),
+            [str(avec), str(sans), str(absent)],
+        )
+        assert isinstance(rapport, RunReport) and rapport
+        assert rapport.run_id == orchestrateur.dernier_run_id
+        resultats = {(Path(r.file).name, r.step): r for r in rapport.results}
+        traite = resultats[("avec.py", "print_to_logging_transform")]
+        assert traite.changed and not traite.skipped and traite.bytes_out > traite.bytes_in
+        assert resultats[("sans.py", "print_to_logging_transform")].skipped
+        assert not resultats[("absent.py", "lecture")]
+        assert rapport.write_stats["written"] == 1
+        assert rapport.slowest_files(1)[0][0] == str(avec)
+
+    def test_etats_du_run_portes_par_le_rapport(self, tmp_path, monkeypatch):
+        """Plan invalide, rien a appliquer et dry_run donnent aussi un RunReport."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        cible = tmp_path / "a.py"
+        cible.write_text('print("a")\n', encoding="utf-8")
+        invalide = tmp_path / "invalide.json"
+        invalide.write_text("{", encoding="utf-8")
+        orchestrateur = OrchestrateurAST()
+
+        rapport = orchestrateur.executer_plan(str(invalide), [str(cible)])
+        assert isinstance(rapport, RunReport) and not rapport
+        assert rapport.plan_error and not rapport.results
+
+        generation = tmp_path / "generation.json"
+        generation.write_text(
+            json.dumps(
+                {
+                    "name": "Generation",
+                    "description": "generateurs seuls",
+                    "transformations": [
+                        {
+                            "type": "generator",
+                            "description": "module",
+                            "plugin_name": "module_generator",
+                            "params": {"output_dir": str(tmp_path), "items": [{"name": "b"}]},
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        rapport = orchestrateur.executer_plan(str(generation), [str(cible)], generateurs=False)
+        assert isinstance(rapport, RunReport) and rapport and rapport.empty
+
+        plan = ecrire_plan(tmp_path, ["print_to_logging_transform"])
+        rapport = orchestrateur.executer_plan(plan, [str(cible)], dry_run=True)
+        assert isinstance(rapport, RunReport) and rapport and rapport.dry_run
+        assert rapport.changed_files == [str(cible)] and rapport.diff_stats["added"] > 0
+        assert rapport.to_dict()["ok"] and cible.read_text(encoding="utf-8") == 'print("a")\n'
+
+    def test_transformation_modulaire_retourne_un_step_result(self, tmp_path, monkeypatch):
+        """appliquer_transformation_modulaire renvoie le resultat de l'etape."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        source = tmp_path / "a.py"
+        source.write_text('print("a")\n', encoding="utf-8")
+        orchestrateur = OrchestrateurAST()
+        resultat = orchestrateur.appliquer_transformation_modulaire(
+            str(source), str(source), "print_to_logging_transform"
+        )
+        assert resultat and resultat.changed
+        assert not orchestrateur.appliquer_transformation_modulaire(
+            str(source), str(source), "inexistant"
+        )
@@ -0,0 +1,73 @@
+# tests/unittests/core/test_source_buffer.py
+"""
+Tests unitaires pour le tampon de code source (index de lignes et modifications par lots)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.base.cst_engine import SourceRewriter
+from core.plugins.base.source_buffer import EditConflictError, SourceBuffer
+
+
+class TestSourceBuffer:
+    """Tests du tampon partage."""
+
+    def test_lignes_comme_split(self):
+        """Les lignes suivent str.split("\\n"), retour chariot compris."""
+        for code in ["", "a", "a\n", "a\r\nb\n\nc", "\n\n"]:
+            buffer = SourceBuffer(code)
+            assert [ligne for _, ligne in buffer.lines()] == code.split("\n")
+            assert buffer.line_count == len(code.split("\n"))
+
+    def test_position_d_un_indice(self):
+        """Un indice de la source donne sa ligne et sa colonne."""
+        buffer = SourceBuffer("ab\ncd\n")
+        assert buffer.position(0) == (1, 0)
+        assert buffer.position(4) == (2, 1)
+        assert buffer.position(6) == (3, 0)
+
+    def test_modifications_appliquees_en_une_passe(self):
+        """Remplacements et insertions sont appliques par rapport au texte d'origine."""
+        buffer = SourceBuffer("a = 1\nb = 2\nc = 3\n")
+        buffer.replace_line(3, "c = 30")
+        buffer.insert_lines(2, ["# b"])
+        buffer.replace_line(1, "a = 10")
+        buffer.insert(buffer.line_start(2), "# avant b\n")
+        assert buffer.source == "a = 1\nb = 2\nc = 3\n"
+        assert buffer.apply() == "a = 10\n# b\n# avant b\nb = 2\nc = 30\n"
+
+    def test_conflit_detecte(self):
+        """Deux remplacements qui se chevauchent levent EditConflictError."""
+        buffer = SourceBuffer("abcdef")
+        buffer.replace_span(0, 3, "x")
+        buffer.replace_span(2, 4, "y")
+        with pytest.raises(EditConflictError):
+            buffer.check_conflicts()
+        with pytest.raises(EditConflictError):
+            buffer.apply()
+
+    def test_rewriter_partage_le_tampon(self):
+        """SourceRewriter est un SourceBuffer : modifications ast et textuelles se combinent."""
+        rewriter = SourceRewriter("x = 1\nprint(x)\n")
+        rewriter.replace(rewriter.tree.body[1].value.func, "log")
+        rewriter.insert_lines(1, ["# debut"])
+        assert isinstance(rewriter, SourceBuffer)
+        assert rewriter.apply() == "# debut\nx = 1\nlog(x)\n"
+
+
+class TestHelloUserTransform:
+    """Tests de Hello User sur le tampon."""
+
+    def test_gros_fichier(self):
+        """Un gros fichier est transforme sans recopie ligne a ligne (cout lineaire)."""
+        from core.plugins.artisans.hello_user_transform import HelloUserTransform
+
+        code = "import os\n" + 'print("Fin du programme")\n' * 50_000
+        resultat = HelloUserTransform().transform(code)
+        assert resultat.count('print(f"Au revoir {nom_utilisateur}!")') == 49_999
+        assert resultat.startswith("import os\n\n# === Interaction utilisateur")
@@ -0,0 +1,70 @@
+# tests/unittests/core/test_subprocess_executor.py
+"""
+Tests unitaires pour l'executeur borne de sous-processus
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.subprocess_executor import SubprocessExecutor
+
+
+class TestSubprocessExecutor:
+    """Tests de SubprocessExecutor."""
+
+    def test_resultats_dans_l_ordre(self):
+        """map rend les resultats dans l'ordre d'entree, meme si les taches finissent dans le desordre."""
+        executor = SubprocessExecutor(max_workers=4)
+
+        def tache(i):
+            time.sleep(0.01 * (5 - i))
+            return i * i
+
+        assert list(executor.map(tache, range(5))) == [0, 1, 4, 9, 16]
+        executor.shutdown()
+
+    def test_limite_de_concurrence_et_back_pressure(self):
+        """Jamais plus de max_workers appels simultanes ni de max_pending taches soumises."""
+        executor = SubprocessExecutor(max_workers=2, max_pending=3)
+        actifs = []
+        maximum = [0]
+        consommes = []
+        verrou = threading.Lock()
+
+        def elements():
+            for i in range(10):
+                consommes.append(i)
+                yield i
+
+        def tache(i):
+            with verrou:
+                actifs.append(i)
+                maximum[0] = max(maximum[0], len(actifs))
+            time.sleep(0.01)
+            with verrou:
+                actifs.remove(i)
+            return i
+
+        resultats = executor.map(tache, elements())
+        assert next(resultats) == 0
+        # Le premier resultat est rendu des que 3 taches ont ete soumises
+        assert len(consommes) <= 4
+        assert list(resultats) == list(range(1, 10))
+        assert maximum[0] <= 2
+        executor.shutdown()
+
+    def test_delai_par_appel(self):
+        """Une commande qui depasse son delai leve TimeoutExpired."""
+        executor = SubprocessExecutor(max_workers=1, timeout=0.2)
+        with pytest.raises(subprocess.TimeoutExpired):
+            executor.run([sys.executable, "-c", "import time; time.sleep(5)"])
+
+        result = executor.run([sys.executable, "-c", "print('ok')"])
+        assert result.stdout.strip() == "ok"
@@ -0,0 +1,104 @@
+# tests/unittests/core/test_symbol_index.py
+"""
+Tests unitaires pour la table des symboles et le retrait des imports inutilises
+"""
+
+import ast
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.artisans.unused_import_remover import UnusedImportRemover
+from core.symbol_index import SymbolIndex, get_symbol_index
+
+
+def inutilises(code):
+    return sorted(binding.name for binding in SymbolIndex(ast.parse(code)).unused_imports())
+
+
+class TestSymbolIndex:
+    """Tests de la resolution des noms."""
+
+    def test_utilisations_reconnues(self):
+        """Racines d'attributs, __all__ et annotations en chaine sont des utilisations."""
+        code = (
+            "import os.path\n"
+            "from typing import Optional\n"
+            "from pathlib import Path\n"
+            "from json import dumps\n"
+            "import re\n"
+            "__all__ = ['dumps']\n"
+            "def f(p: 'Optional[Path]'):\n"
+            "    return os.path.join(p)\n"
+        )
+        assert inutilises(code) == ["re"]
+
+    def test_imports_imbriques_par_portee(self):
+        """Un import local n'est utilise que par sa propre fonction."""
+        code = "def f():\n    import json\n    return 1\ndef g():\n    return json.dumps({})\n"
+        index = SymbolIndex(ast.parse(code))
+        [binding] = index.unused_imports()
+        assert binding.name == "json" and binding.scope.name == "f"
+
+    def test_portee_de_classe_invisible_des_methodes(self):
+        """Un nom de la portee de classe n'est pas visible depuis ses methodes."""
+        code = "import os\nclass A:\n    os = None\n    def m(self):\n        return os.sep\n"
+        assert inutilises(code) == []
+
+    def test_global_et_builtin(self):
+        """global lie au module ; un nom non lie est un builtin."""
+        code = "def f():\n    global x\n    x = 1\n\ndef g():\n    print(x)\n"
+        index = SymbolIndex(ast.parse(code))
+        assert "x" in index.module.bindings
+        [appel] = index.calls["print"]
+        assert index.is_builtin_use(appel.func)
+        assert index.binding_at(appel.args[0]).scope is index.module
+
+    def test_cache_par_contenu(self):
+        """Le meme contenu renvoie le meme index."""
+        code = "import os\nos.getcwd()\n"
+        assert get_symbol_index(code) is get_symbol_index(code)
+        assert get_symbol_index(code) is not get_symbol_index(code + "\n")
+
+
+class TestUnusedImportRemover:
+    """Tests du retrait des imports inutilises a partir de l'index."""
+
+    def test_import_imbrique_retire(self):
+        """Les imports inutilises des fonctions sont retires aussi."""
+        code = "def f():\n    import json\n    import os\n    return os.sep\n"
+        assert (
+            UnusedImportRemover().transform(code) == "def f():\n    import os\n    return os.sep\n"
+        )
+
+    def test_bloc_vide_remplace_par_pass(self):
+        """Un bloc qui ne contenait que des imports inutilises garde un pass."""
+        code = "import sys\nif sys.argv:\n    import json\n    import re\nx = 1\n"
+        assert (
+            UnusedImportRemover().transform(code) == "import sys\nif sys.argv:\n    pass\nx = 1\n"
+        )
+
+    def test_imports_conserves(self):
+        """Imports optionnels, re-exports et noms de __all__ sont gardes."""
+        code = (
+            "try:\n"
+            "    import ujson\n"
+            "except ImportError:\n"
+            "    ujson = None\n"
+            "from .models import Model as Model\n"
+            "from .api import client\n"
+            "__all__ = ['client']\n"
+        )
+        assert UnusedImportRemover().transform(code) == code
+
+    def test_print_redefini_non_converti(self):
+        """L'AnalyseurCode ne compte que les appels au print builtin."""
+        from modificateur_interactif import AnalyseurCode
+
+        analyseur = AnalyseurCode()
+        assert analyseur.analyser_code("import os\ndef print(x):\n    pass\nprint(1)\n")
+        rapport = analyseur.obtenir_rapport()
+        assert rapport["print_calls"] == 0
+        assert rapport["fonctions"] == 1
+        assert rapport["imports_inutilises"] == 1
@@ -0,0 +1,110 @@
+# tests/unittests/core/test_tool_probe.py
+"""
+Tests unitaires pour la resolution et le cache de sondage des outils externes
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core import tool_probe
+from core.tool_probe import ToolNotFoundError, resolve_tool
+
+FAUX_OUTIL = """#!/bin/sh
+if [ "$1" = "--version" ]; then echo "faux-outil 1.2.3"; exit 0; fi
+echo "Usage: faux-outil [--fix] [--line-length N] FILE"
+"""
+
+
+@pytest.fixture
+def faux_outil(tmp_path, monkeypatch):
+    """Un outil factice seul dans le PATH, avec un cache isole."""
+    if os.name == "nt":
+        pytest.skip("script shell non executable sous Windows")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    outil = bin_dir / "faux-outil"
+    outil.write_text(FAUX_OUTIL, encoding="utf-8")
+    outil.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    tool_probe.clear_memory_cache()
+    yield outil
+    tool_probe.clear_memory_cache()
+
+
+class TestResolveTool:
+    """Tests de resolve_tool."""
+
+    def test_sondage(self, faux_outil):
+        """Chemin absolu, version et options sont extraits."""
+        info = resolve_tool("faux-outil")
+        assert info["path"] == str(faux_outil)
+        assert info["version"] == "1.2.3"
+        assert info["flags"] == ["--fix", "--line-length"]
+
+    def test_cache_disque_puis_invalidation(self, faux_outil, tmp_path, monkeypatch):
+        """Le cache disque evite un nouveau sondage tant que le binaire ne change pas."""
+        resolve_tool("faux-outil")
+        data = json.loads((tmp_path / "cache" / "tool_probes.json").read_text(encoding="utf-8"))
+        assert len(data["tools"]) == 1
+
+        sondages = []
+        probe = tool_probe.probe_tool
+        monkeypatch.setattr(tool_probe, "probe_tool", lambda *a: sondages.append(a) or probe(*a))
+        tool_probe.clear_memory_cache()
+        resolve_tool("faux-outil")
+        assert sondages == []
+
+        os.utime(faux_outil, (1, 1))
+        resolve_tool("faux-outil")
+        assert len(sondages) == 1
+
+    def test_outil_manquant(self, faux_outil):
+        """Un outil absent retourne None, ou leve ToolNotFoundError si requis."""
+        assert resolve_tool("outil-inexistant") is None
+        with pytest.raises(ToolNotFoundError):
+            resolve_tool("outil-inexistant", required=True)
+
+    def test_outil_manquant_en_cache_par_path(self, faux_outil, tmp_path, monkeypatch):
+        """Un outil absent n'est cherche qu'une fois par PATH."""
+        sondages = []
+        probe = tool_probe.probe_tool
+        monkeypatch.setattr(tool_probe, "probe_tool", lambda *a: sondages.append(a) or probe(*a))
+        for _ in range(3):
+            with pytest.raises(ToolNotFoundError):
+                resolve_tool("outil-inexistant", required=True)
+        assert len(sondages) == 1
+
+        monkeypatch.setenv("PATH", f"{faux_outil.parent}{os.pathsep}{tmp_path}")
+        assert resolve_tool("outil-inexistant") is None
+        assert len(sondages) == 2
+
+    def test_plan_echoue_immediatement(self, faux_outil, tmp_path):
+        """Un plan qui utilise un wrapper dont l'outil est absent est refuse au chargement."""
+        from modificateur_interactif import OrchestrateurAST
+
+        plan = tmp_path / "plan.json"
+        plan.write_text(
+            json.dumps(
+                {
+                    "name": "Plan",
+                    "description": "pyupgrade",
+                    "transformations": [
+                        {
+                            "type": "appel_plugin",
+                            "description": "Modernisation",
+                            "plugin_name": "pyupgrade_wrapper",
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        orchestrateur = OrchestrateurAST()
+        assert orchestrateur.charger_plan(str(plan)) is None
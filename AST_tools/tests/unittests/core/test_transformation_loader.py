@@ -0,0 +1,117 @@
+# tests/unittests/core/test_transformation_loader.py
+"""
+Tests unitaires pour le TransformationLoader et son manifeste persiste
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.transformation_loader import MANIFEST_VERSION, TransformationLoader
+
+
+class TestManifest:
+    """Tests du manifeste de decouverte des plugins."""
+
+    def test_manifest_cree_au_premier_scan(self, tmp_path):
+        """Le premier scan ecrit un manifeste avec classes et metadonnees."""
+        manifest_path = tmp_path / "manifest.json"
+        loader = TransformationLoader(manifest_path=manifest_path)
+
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+        assert data["version"] == MANIFEST_VERSION
+        entry = data["plugins"]["artisans/print_to_logging_transform.py"]
+        assert entry["class_name"] == "PrintToLoggingTransform"
+        assert entry["metadata"]["name"] == "Print to Logging"
+        assert "print_to_logging_transform" in loader.list_transformations("artisans")
+
+    def test_wrappers_resolvent_leur_propre_classe(self, tmp_path):
+        """Les wrappers pointent sur leur classe et non sur BaseWrapper importee."""
+        loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+
+        assert "base_wrapper" not in loader.list_transformations()
+        assert (
+            loader.transformation_types["wrappers"]["ruff_wrapper"]["class_name"] == "RuffWrapper"
+        )
+        assert type(loader.get_transformation("ruff_wrapper")).__name__ == "RuffWrapper"
+
+    def test_second_scan_sans_import(self, tmp_path):
+        """Un manifeste a jour permet de lister les plugins sans les importer."""
+        manifest_path = tmp_path / "manifest.json"
+        TransformationLoader(manifest_path=manifest_path)
+
+        loader = TransformationLoader(manifest_path=manifest_path)
+        assert not loader.is_loaded("add_docstrings_transform")
+        assert loader.get_transformation_metadata("add_docstrings_transform")["name"]
+
+        instance = loader.get_transformation("add_docstrings_transform")
+        assert instance is not None
+        assert loader.is_loaded("add_docstrings_transform")
+
+    def test_entree_modifiee_reconstruite(self, tmp_path):
+        """Une entree dont le mtime ne correspond plus est reconstruite."""
+        manifest_path = tmp_path / "manifest.json"
+        TransformationLoader(manifest_path=manifest_path)
+
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+        entry = data["plugins"]["artisans/unused_import_remover.py"]
+        entry["mtime"] = 0
+        entry["class_name"] = "Obsolete"
+        manifest_path.write_text(json.dumps(data), encoding="utf-8")
+
+        loader = TransformationLoader(manifest_path=manifest_path)
+        assert loader.transformation_types["artisans"]["unused_import_remover"]["class_name"] == (
+            "UnusedImportRemover"
+        )
+
+    def test_plugin_inconnu(self, tmp_path):
+        """Un plugin inconnu retourne None."""
+        loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+        assert loader.get_transformation("plugin_inexistant") is None
+
+
+class TestPool:
+    """Tests du pool d'instances reutilisables."""
+
+    def test_instance_reutilisable_partagee(self, tmp_path):
+        """Un plugin reutilisable renvoie la meme instance dans un meme thread."""
+        loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+        first = loader.get_transformation("print_to_logging_transform")
+        second = loader.get_transformation("print_to_logging_transform")
+        assert first is second
+
+    def test_instance_par_thread(self, tmp_path, monkeypatch):
+        """Chaque thread de travail obtient sa propre instance."""
+        loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+        main_instance = loader.get_transformation("pathlib_transformer_optimized")
+        setups = []
+        monkeypatch.setattr(
+            type(main_instance), "setup", lambda self: setups.append(self), raising=False
+        )
+
+        results = []
+        worker = threading.Thread(
+            target=lambda: results.append(
+                loader.get_transformation("pathlib_transformer_optimized")
+            )
+        )
+        worker.start()
+        worker.join()
+
+        assert results[0] is not main_instance
+        assert setups == [results[0]]  # setup() appele
+
+    def test_shutdown_appelle_teardown(self, tmp_path):
+        """shutdown() appelle teardown sur les instances en pool puis vide le pool."""
+        loader = TransformationLoader(manifest_path=tmp_path / "manifest.json")
+        instance = loader.get_transformation("add_docstrings_transform")
+        calls = []
+        instance.teardown = lambda: calls.append("teardown")
+
+        loader.shutdown()
+
+        assert calls == ["teardown"]
+        assert loader.get_transformation("add_docstrings_transform") is not instance
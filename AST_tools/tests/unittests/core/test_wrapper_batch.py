@@ -0,0 +1,183 @@
+# tests/unittests/core/test_wrapper_batch.py
+"""
+Tests unitaires pour le mode lot (transform_many) et le streaming stdin des wrappers
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.plugins.wrappers.pyupgrade_wrapper import PyupgradeWrapper
+from core.plugins.wrappers.ruff_wrapper import RuffWrapper
+
+requires_ruff = pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff non installe")
+
+
+@pytest.fixture
+def compteur_appels(monkeypatch):
+    """Compte les appels a subprocess.run (outils deja resolus et sondes)."""
+    RuffWrapper().get_tool_info()
+    appels = []
+    run = subprocess.run
+
+    def run_compte(cmd, *args, **kwargs):
+        appels.append(cmd)
+        return run(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", run_compte)
+    return appels
+
+
+class TestTransformMany:
+    """Tests de transform_many."""
+
+    @requires_ruff
+    def test_un_seul_appel_pour_le_lot(self, compteur_appels):
+        """Ruff est lance une fois sur le repertoire et chaque resultat revient a sa place."""
+        sources = ["x  =  1\n", "def f( a ):\n  return a\n", "y=[1,2]\n"]
+        resultats = RuffWrapper().transform_many(sources, {"command": "format"})
+
+        assert resultats == ["x = 1\n", "def f(a):\n    return a\n", "y = [1, 2]\n"]
+        assert len(compteur_appels) == 1
+
+    @requires_ruff
+    def test_repli_fichier_par_fichier_en_cas_d_echec(self, compteur_appels):
+        """Un code invalide fait echouer le lot : repli par fichier, original conserve."""
+        sources = ["x  =  1\n", "def (:\n"]
+        resultats = RuffWrapper().transform_many(sources, {"command": "format"})
+
+        assert resultats == ["x = 1\n", "def (:\n"]
+        assert len(compteur_appels) == 1 + len(sources)
+
+    def test_commande_de_lot_liste_les_fichiers(self):
+        """Un outil qui n'accepte pas de repertoire recoit la liste des fichiers."""
+        wrapper = PyupgradeWrapper()
+        cmd = wrapper._build_batch_command("/tmp/lot", ["/tmp/lot/a.py", "/tmp/lot/b.py"], {})
+        assert Path(cmd[0]).stem == "pyupgrade"
+        assert cmd[1:] == ["--py36-plus", "/tmp/lot/a.py", "/tmp/lot/b.py"]
+
+        cmd = RuffWrapper()._build_batch_command(
+            "/tmp/lot", ["/tmp/lot/a.py"], {"command": "format"}
+        )
+        assert Path(cmd[0]).stem == "ruff"
+        assert cmd[1:] == ["format", "/tmp/lot"]
+
+    @requires_ruff
+    def test_orchestrateur_par_lot(self, tmp_path, monkeypatch, compteur_appels):
+        """executer_plan appelle le wrapper une fois pour tout un lot de fichiers."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps(
+                {
+                    "name": "Format",
+                    "description": "ruff format",
+                    "transformations": [
+                        {
+                            "type": "appel_plugin",
+                            "description": "Formatage",
+                            "plugin_name": "ruff_wrapper",
+                            "params": {"command": "format"},
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        fichiers = []
+        for i in range(4):
+            fichier = tmp_path / f"m{i}.py"
+            fichier.write_text(f"x  =  {i}\n", encoding="utf-8")
+            fichiers.append(str(fichier))
+
+        assert OrchestrateurAST().executer_plan(str(plan_path), fichiers)
+
+        assert len(compteur_appels) == 1
+        assert Path(fichiers[2]).read_text(encoding="utf-8") == "x = 2\n"
+
+    @requires_ruff
+    def test_progression_par_fichier_et_arret(self, tmp_path, monkeypatch, compteur_appels):
+        """Un seul executer_plan signale chaque fichier ; False arrete le run apres le lot."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps(
+                {
+                    "name": "Format",
+                    "description": "ruff format",
+                    "transformations": [
+                        {
+                            "type": "appel_plugin",
+                            "description": "Formatage",
+                            "plugin_name": "ruff_wrapper",
+                            "params": {"command": "format"},
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        fichiers = []
+        for i in range(5):
+            fichier = tmp_path / f"m{i}.py"
+            fichier.write_text(f"x  =  {i}\n", encoding="utf-8")
+            fichiers.append(str(fichier))
+
+        vus = []
+
+        def progression(fichier, erreurs, reussites):
+            vus.append((Path(fichier).name, erreurs, reussites))
+            return len(vus) < 2
+
+        OrchestrateurAST().executer_plan(
+            str(plan_path), fichiers, batch_size=2, progression=progression
+        )
+
+        # Premier lot traite en un appel, arret demande pendant ce lot
+        assert vus == [("m0.py", [], 1), ("m1.py", [], 1)]
+        assert len(compteur_appels) == 1
+        assert Path(fichiers[1]).read_text(encoding="utf-8") == "x = 1\n"
+        assert Path(fichiers[2]).read_text(encoding="utf-8") == "x  =  2\n"
+
+
+class TestStreaming:
+    """Tests du passage par stdin/stdout."""
+
+    @requires_ruff
+    def test_format_par_stdin_sans_fichier_temporaire(self, compteur_appels, monkeypatch):
+        """ruff format passe par un pipe : aucun fichier temporaire n'est cree."""
+
+        def interdit(*args, **kwargs):
+            raise AssertionError("fichier temporaire inattendu")
+
+        monkeypatch.setattr("tempfile.NamedTemporaryFile", interdit)
+        resultat = RuffWrapper().transform("x  =  1\n", {"command": "format"})
+
+        assert resultat == "x = 1\n"
+        assert [cmd[1:] for cmd in compteur_appels] == [["format", "-"]]
+
+    @requires_ruff
+    def test_check_fix_par_stdin(self):
+        """ruff check --fix par stdin garde les corrections malgre les violations restantes."""
+        code = "import os\nprint(inconnu)\n"
+        params = {"command": "check", "fix": True, "select": ["F401", "F821"]}
+        assert RuffWrapper().transform(code, params) == "print(inconnu)\n"
+
+    def test_capacite_selon_les_parametres(self):
+        """Seules les commandes qui renvoient du code peuvent etre streamees."""
+        wrapper = RuffWrapper()
+        assert wrapper._can_stream({"command": "format"})
+        assert not wrapper._can_stream({"command": "format", "diff": True})
+        assert not wrapper._can_stream({"command": "check"})
+        assert not wrapper._can_stream({"command": "format", "_stdin": False})
+        assert not PyupgradeWrapper()._can_stream({})
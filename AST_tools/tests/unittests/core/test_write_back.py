@@ -0,0 +1,166 @@
+# tests/unittests/core/test_write_back.py
+"""
+Tests unitaires pour l'ecriture atomique journalisee et le rollback d'un run
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from core.write_back import (
+    AtomicWriteBack,
+    WriteBackJournal,
+    atomic_write_text,
+    list_runs,
+    prune_runs,
+    rollback_run,
+)
+
+
+class TestAtomicWrite:
+    """Tests de l'ecriture atomique."""
+
+    def test_ecriture_sans_fichier_temporaire_residuel(self, tmp_path):
+        """Le contenu est remplace et aucun fichier temporaire ne subsiste."""
+        cible = tmp_path / "module.py"
+        cible.write_text("a = 1\n", encoding="utf-8")
+
+        atomic_write_text(cible, "a = 2\n")
+
+        assert cible.read_text(encoding="utf-8") == "a = 2\n"
+        assert [p.name for p in tmp_path.iterdir()] == ["module.py"]
+
+    def test_contenu_inchange_non_ecrit(self, tmp_path):
+        """Un fichier dont le contenu ne change pas n'est ni journalise ni reecrit."""
+        cible = tmp_path / "module.py"
+        cible.write_text("a = 1\n", encoding="utf-8")
+        journal = WriteBackJournal(journal_dir=tmp_path / "journals")
+
+        with AtomicWriteBack(journal=journal) as write_back:
+            assert not write_back.stage(cible, "a = 1\n", "a = 1\n")
+            # Sans contenu original fourni, la comparaison se fait sur disque
+            write_back.stage(cible, "a = 1\n")
+
+        assert write_back.stats == {"written": 0, "unchanged": 2, "failed": 0}
+        assert journal.read_entries() == []
+
+
+class TestJournal:
+    """Tests du journal et du rollback."""
+
+    def test_rollback_restaure_les_originaux(self, tmp_path):
+        """Un run ecrit par lots peut etre annule entierement."""
+        journal_dir = tmp_path / "journals"
+        fichiers = []
+        for i in range(5):
+            fichier = tmp_path / f"f{i}.py"
+            fichier.write_text(f"x = {i}\n", encoding="utf-8")
+            fichiers.append(fichier)
+
+        journal = WriteBackJournal(journal_dir=journal_dir, description="test")
+        with AtomicWriteBack(journal=journal, batch_size=2) as write_back:
+            for i, fichier in enumerate(fichiers):
+                write_back.stage(fichier, f"x = {i + 10}\n", f"x = {i}\n")
+
+        assert write_back.stats["written"] == 5
+        assert fichiers[3].read_text(encoding="utf-8") == "x = 13\n"
+        assert len(journal.read_entries()) == 5
+        assert list_runs(journal_dir) == [journal.run_id]
+
+        result = rollback_run(journal.run_id, journal_dir=journal_dir)
+
+        assert len(result["restored"]) == 5
+        assert [f.read_text(encoding="utf-8") for f in fichiers] == [f"x = {i}\n" for i in range(5)]
+
+    def test_rollback_ignore_fichier_modifie_depuis(self, tmp_path):
+        """Un fichier modifie apres le run n'est pas ecrase par le rollback."""
+        journal_dir = tmp_path / "journals"
+        cible = tmp_path / "module.py"
+        cible.write_text("a = 1\n", encoding="utf-8")
+
+        journal = WriteBackJournal(journal_dir=journal_dir)
+        with AtomicWriteBack(journal=journal) as write_back:
+            write_back.stage(cible, "a = 2\n", "a = 1\n")
+        cible.write_text("a = 3\n", encoding="utf-8")
+
+        result = rollback_run(journal.run_id, journal_dir=journal_dir)
+
+        assert result["skipped"] == [str(cible)]
+        assert cible.read_text(encoding="utf-8") == "a = 3\n"
+
+    def test_rollback_depuis_un_autre_repertoire(self, tmp_path, monkeypatch):
+        """Les chemins relatifs sont journalises en absolu ; le journal et les blobs sont purges."""
+        journal_dir = tmp_path / "journals"
+        projet = tmp_path / "projet"
+        (projet / "src").mkdir(parents=True)
+        cible = projet / "src" / "a.py"
+        cible.write_text("a = 1\n", encoding="utf-8")
+
+        monkeypatch.chdir(projet)
+        journal = WriteBackJournal(journal_dir=journal_dir)
+        with AtomicWriteBack(journal=journal) as write_back:
+            write_back.stage("src/a.py", "a = 2\n", "a = 1\n")
+        assert journal.read_entries()[0]["path"] == str(cible.resolve())
+        assert len(list((journal_dir / "blobs").iterdir())) == 1
+
+        monkeypatch.chdir(tmp_path)
+        result = rollback_run(journal.run_id, journal_dir=journal_dir)
+
+        assert result["restored"] == [str(cible.resolve())]
+        assert cible.read_text(encoding="utf-8") == "a = 1\n"
+        assert list_runs(journal_dir) == []
+        assert list((journal_dir / "blobs").iterdir()) == []
+
+    def test_purge_des_anciens_runs(self, tmp_path):
+        """Seuls les runs les plus recents sont gardes, avec les blobs qu'ils citent."""
+        journal_dir = tmp_path / "journals"
+        cible = tmp_path / "module.py"
+        runs = []
+        for i in range(3):
+            cible.write_text(f"a = {i}\n", encoding="utf-8")
+            journal = WriteBackJournal(run_id=f"run{i}", journal_dir=journal_dir)
+            with AtomicWriteBack(journal=journal) as write_back:
+                write_back.stage(cible, f"a = {i + 10}\n")
+            os.utime(journal.path, (i, i))
+            runs.append(journal)
+
+        assert prune_runs(1, journal_dir) == ["run1", "run0"]
+        assert list_runs(journal_dir) == ["run2"]
+        blobs = [p.stem for p in (journal_dir / "blobs").iterdir()]
+        assert blobs == [runs[2].read_entries()[0]["original"]]
+
+    def test_orchestrateur_journalise_et_annule(self, tmp_path, monkeypatch):
+        """executer_plan ecrit via le journal et annuler_execution restaure."""
+        monkeypatch.setenv("AST_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+        from modificateur_interactif import OrchestrateurAST
+
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps(
+                {
+                    "name": "Plan",
+                    "description": "print vers logging",
+                    "transformations": [
+                        {
+                            "type": "appel_plugin",
+                            "description": "print -> logging",
+                            "plugin_name": "print_to_logging_transform",
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        cible = tmp_path / "cible.py"
+        cible.write_text('print("hello")\n', encoding="utf-8")
+
+        orchestrateur = OrchestrateurAST()
+        assert orchestrateur.executer_plan(str(plan_path), [str(cible)])
+        assert "logging.info" in cible.read_text(encoding="utf-8")
+
+        result = orchestrateur.annuler_execution()
+        assert result["restored"] == [str(cible)]
+        assert cible.read_text(encoding="utf-8") == 'print("hello")\n'